@@ -1,19 +1,140 @@
-from django.contrib import admin
-from .models import JobPost, Candidate, Application
+from django.conf import settings
+from django.contrib import admin, messages
+from .models import JobPost, Candidate, Application, ExtractedText, LLMResponse, VocabularyTerm, VocabularyVersion
 
 
 @admin.register(JobPost)
 class JobPostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'created_at')
+    list_display = ('title', 'is_open', 'created_at')
+    list_filter = ('is_open',)
+    list_editable = ('is_open',)
+    actions = ['rescore_candidates', 'ai_score_shortlist']
+
+    @admin.action(description='Rescore all candidates of the selected jobs')
+    def rescore_candidates(self, request, queryset):
+        from .tasks import rescore_job_candidates
+
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            # Without a broker .delay() would rescore every candidate inside this request
+            self.message_user(
+                request,
+                'Rescoring needs a Celery broker (CELERY_BROKER_URL); run "manage.py rescore_job <job_id>" instead.',
+                messages.ERROR,
+            )
+            return
+        for job_id in queryset.values_list('pk', flat=True):
+            rescore_job_candidates.delay(job_id)
+        self.message_user(request, f'Rescoring queued for {queryset.count()} job(s).', messages.SUCCESS)
+
+    @admin.action(description='Run AI analysis for the semantically closest candidates of the selected jobs')
+    def ai_score_shortlist(self, request, queryset):
+        from .tasks import ai_score_shortlist
+
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            # Without a broker .delay() would rank and AI-analyse inside this request
+            self.message_user(
+                request,
+                'AI analysis needs a Celery broker (CELERY_BROKER_URL); '
+                'run "manage.py rank_candidates <job_id> --ai N" instead.',
+                messages.ERROR,
+            )
+            return
+        for job_id in queryset.values_list('pk', flat=True):
+            ai_score_shortlist.delay(job_id)
+        self.message_user(
+            request,
+            f'AI analysis queued for the top {settings.AI_SHORTLIST_SIZE} candidates of {queryset.count()} job(s).',
+            messages.SUCCESS,
+        )
 
 
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
-    list_display = ('name', 'email', 'score', 'created_at')
+    list_display = ('name', 'email', 'score', 'score_tier', 'vocab_version', 'duplicate_of', 'created_at')
+    list_filter = ('score_tier', 'vocab_version', ('duplicate_of', admin.EmptyFieldListFilter))
     search_fields = ('name', 'email')
+    raw_id_fields = ('duplicate_of',)
+    actions = ['run_ai_analysis']
+
+    @admin.action(description='Run AI analysis for the selected candidates')
+    def run_ai_analysis(self, request, queryset):
+        from .tasks import ai_score_candidates
+
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            # Without a broker .delay() would call the LLM for every candidate inside this request
+            self.message_user(
+                request,
+                'AI analysis needs a Celery broker (CELERY_BROKER_URL); '
+                'run "manage.py rank_candidates <job_id> --ai N" instead.',
+                messages.ERROR,
+            )
+            return
+        candidate_ids = list(queryset.values_list('pk', flat=True))
+        ai_score_candidates.delay(candidate_ids)
+        self.message_user(request, f'AI analysis queued for {len(candidate_ids)} candidate(s).', messages.SUCCESS)
 
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
     list_display = ('candidate', 'job', 'status', 'created_at')
-    list_filter = ('status', 'job')
\ No newline at end of file
+    list_filter = ('status', 'job')
+
+
+@admin.register(ExtractedText)
+class ExtractedTextAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'byte_size', 'pages', 'extract_seconds', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'byte_size', 'pages', 'extract_seconds', 'hits', 'created_at', 'last_used_at')
+
+
+
+@admin.register(LLMResponse)
+class LLMResponseAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'model', 'hits', 'created_at', 'expires_at', 'last_used_at')
+    list_filter = ('model',)
+    search_fields = ('fingerprint',)
+    readonly_fields = ('fingerprint', 'model', 'hits', 'created_at', 'last_used_at')
+
+
+@admin.register(VocabularyTerm)
+class VocabularyTermAdmin(admin.ModelAdmin):
+    list_display = ('term', 'priority', 'canonical')
+    list_filter = ('priority',)
+    list_editable = ('priority', 'canonical')
+    search_fields = ('term', 'canonical')
+    actions = ['publish_vocabulary']
+
+    @admin.action(description='Publish the vocabulary (all terms) and rescore affected candidates')
+    def publish_vocabulary(self, request, queryset):
+        from .vocabulary import publish_vocabulary
+
+        # Without a broker the on-commit .delay() would rescore inside this request
+        eager = settings.CELERY_TASK_ALWAYS_EAGER
+        version = publish_vocabulary(note=f'Published by {request.user}', rescore=not eager)
+        if version is None:
+            self.message_user(request, 'Nothing changed since the latest vocabulary version.', messages.INFO)
+            return
+        if eager:
+            self.message_user(
+                request,
+                f'Published vocabulary v{version.number} ({len(version.changed_terms)} changed terms). '
+                f'Rescoring needs a Celery broker (CELERY_BROKER_URL); '
+                f'run "manage.py publish_vocabulary --rescore-only" instead.',
+                messages.WARNING,
+            )
+            return
+        self.message_user(
+            request,
+            f'Published vocabulary v{version.number} ({len(version.changed_terms)} changed terms); '
+            f'rescoring of affected candidates queued.',
+            messages.SUCCESS,
+        )
+
+
+@admin.register(VocabularyVersion)
+class VocabularyVersionAdmin(admin.ModelAdmin):
+    list_display = ('number', 'note', 'created_at', 'rescored_at')
+    readonly_fields = ('number', 'entries', 'changed_terms', 'note', 'created_at', 'rescored_at')
+
+    def has_add_permission(self, request):
+        return False
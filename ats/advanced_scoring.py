@@ -4,10 +4,19 @@ Provides enhanced keyword matching and AI-powered semantic analysis
 """
 import re
 import json
+import heapq
+import string
+from collections import Counter
 from difflib import SequenceMatcher
 from openai import OpenAI
 from django.conf import settings
 
+from .circuit_breaker import CircuitOpenError, openrouter_breaker, stage_timeout
+from .llm_cache import get_cached_response, prompt_fingerprint, store_response
+from .metrics import span
+from .scoring import score_resume
+from .vocabulary import get_vocabulary
+
 
 # Initialize OpenRouter client with timeout
 client = OpenAI(
@@ -77,7 +86,9 @@ def tokenize_and_filter(text):
 # ENHANCEMENT #2: SKILL SYNONYMS & NORMALIZATION
 # ============================================================================
 
-# Mapping of skill variations to their canonical form
+# Built-in mapping of skill variations to their canonical form. The live
+# vocabulary is the VocabularyTerm table (see ats/vocabulary.py); these
+# constants seed it and apply until a version is published.
 SKILL_SYNONYMS = {
     # JavaScript variations
     'js': 'javascript',
@@ -174,6 +185,10 @@ SKILL_SYNONYMS = {
     'fullstack': 'fullstack',
     'full-stack': 'fullstack',
     'full stack': 'fullstack',
+    
+    # Punctuated language names
+    'c++': 'cpp',
+    'c#': 'csharp',
 }
 
 
@@ -187,7 +202,7 @@ def normalize_skill(token):
     Returns:
         Normalized skill name, or original token if no mapping exists
     """
-    return SKILL_SYNONYMS.get(token, token)
+    return get_vocabulary().canonical_terms.get(token, token)
 
 
 def normalize_tokens(tokens):
@@ -200,13 +215,17 @@ def normalize_tokens(tokens):
     Returns:
         List of normalized tokens
     """
-    return [normalize_skill(token) for token in tokens]
+    canonical_terms = get_vocabulary().canonical_terms
+    return [canonical_terms.get(token, token) for token in tokens]
 
 
 # ============================================================================
 # ENHANCEMENT #3: WEIGHTED SCORING
 # ============================================================================
 
+# Built-in skill priorities; like SKILL_SYNONYMS, only defaults for the
+# VocabularyTerm table.
+
 # High priority technical skills (3x weight)
 HIGH_PRIORITY_SKILLS = {
     'python', 'javascript', 'typescript', 'java', 'c++', 'cpp', 'csharp', 'c#',
@@ -241,15 +260,136 @@ def get_skill_weight(token):
     Returns:
         Weight multiplier (3, 2, or 1)
     """
-    if token in HIGH_PRIORITY_SKILLS:
-        return 3
-    elif token in MEDIUM_PRIORITY_SKILLS:
-        return 2
-    else:
-        return 1
+    return get_vocabulary().weight(token)
+
+
+# ============================================================================
+# SINGLE-PASS TERM EXTRACTION
+# ============================================================================
+
+# ASCII punctuation becomes whitespace, except the characters inside tech
+# names ('c++', 'c#', 'node.js', 'front-end') and '_', which \w+ keeps
+TERM_SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation if char not in '+#.-_'})
+WORD_RE = re.compile(r'\w+')
+
+
+def _match_phrases(words, matched, phrase_index):
+    """
+    Append the canonical term of every vocabulary phrase in words to matched
+    and return the words not consumed by a phrase.
+    """
+    remaining = []
+    i = 0
+    while i < len(words):
+        for rest, canonical in phrase_index.get(words[i], ()):
+            end = i + 1 + len(rest)
+            # A phrase may end a sentence ('... machine learning.')
+            if tuple(word.rstrip('.-') for word in words[i + 1:end]) == rest:
+                matched.append(canonical)
+                i = end
+                break
+        else:
+            remaining.append(words[i])
+            i += 1
+    return remaining
+
+
+def extract_terms(text, vocabulary=None):
+    """
+    Canonical scoring terms of a text in a single pass.
+    
+    Equivalent to set(normalize_tokens(tokenize_and_filter(text))) except
+    that tech names with punctuation ('c++', 'c#', 'node.js') stay whole and
+    multi-word vocabulary terms ('google cloud', 'unit test') match. Text is
+    split with str.translate/str.split instead of a regex; each distinct
+    word then costs one dict lookup.
+    
+    Args:
+        text: Input text string
+        vocabulary: CompiledVocabulary (default: the live one, get_vocabulary())
+        
+    Returns:
+        set: Normalized terms (stop words removed)
+    """
+    if not text:
+        return set()
+    vocabulary = vocabulary or get_vocabulary()
+    canonical_terms = vocabulary.canonical_terms
+    words = text.lower().translate(TERM_SEPARATORS).split()
+    tokens = set(words)
+    terms = set()
+    if not tokens.isdisjoint(vocabulary.phrase_index):
+        phrases = []
+        tokens = set(_match_phrases(words, phrases, vocabulary.phrase_index))
+        terms.update(phrases)
+
+    for token in tokens:
+        term = canonical_terms.get(token)
+        if term is not None:
+            terms.add(term)
+        elif token.isalnum():
+            if token not in STOP_WORDS:
+                terms.add(token)
+        else:
+            terms.update(_split_token(token, canonical_terms))
+    return terms
 
 
-def weighted_score_resume(resume_text, job_description):
+def extract_term_counts(text, vocabulary=None):
+    """
+    Canonical scoring terms of a text with their number of occurrences.
+    
+    Same tokenization as extract_terms (the keys equal extract_terms(text)),
+    used where term frequency matters, e.g. the hashed vectors in
+    ats/embeddings.py.
+    
+    Args:
+        text: Input text string
+        vocabulary: CompiledVocabulary (default: the live one, get_vocabulary())
+        
+    Returns:
+        Counter: {term: occurrences}
+    """
+    counts = Counter()
+    if not text:
+        return counts
+    vocabulary = vocabulary or get_vocabulary()
+    canonical_terms = vocabulary.canonical_terms
+    words = text.lower().translate(TERM_SEPARATORS).split()
+    if not vocabulary.phrase_index.keys().isdisjoint(words):
+        phrases = []
+        words = _match_phrases(words, phrases, vocabulary.phrase_index)
+        counts.update(phrases)
+
+    for token, occurrences in Counter(words).items():
+        term = canonical_terms.get(token)
+        if term is not None:
+            counts[term] += occurrences
+        elif token.isalnum():
+            if token not in STOP_WORDS:
+                counts[token] += occurrences
+        else:
+            for term in _split_token(token, canonical_terms):
+                counts[term] += occurrences
+    return counts
+
+
+def _split_token(token, canonical_terms):
+    """Terms of a word with leftover punctuation ('c++.', 'end-user', unicode quotes)."""
+    term = canonical_terms.get(token.strip('.-'))
+    if term is not None:
+        return [term]
+    terms = []
+    for word in WORD_RE.findall(token):
+        term = canonical_terms.get(word)
+        if term is not None:
+            terms.append(term)
+        elif word not in STOP_WORDS:
+            terms.append(word)
+    return terms
+
+
+def weighted_score_resume(resume_text, job_description, profile=None, resume_terms=None):
     """
     Calculate weighted resume match score.
     Skills are weighted by importance: High (3x), Medium (2x), Low (1x)
@@ -257,33 +397,35 @@ def weighted_score_resume(resume_text, job_description):
     Args:
         resume_text: Full text of the resume
         job_description: Job posting description text
+        profile: Optional compiled job profile (see compile_job_profile)
+        resume_terms: Optional precomputed extract_terms(resume_text)
         
     Returns:
         tuple: (score, matched_keywords, missing_keywords, details)
     """
-    # Tokenize, filter, and normalize
-    job_tokens = normalize_tokens(tokenize_and_filter(job_description))
-    resume_tokens = normalize_tokens(tokenize_and_filter(resume_text))
+    if profile is None:
+        profile = compile_job_profile(job_description)
+    job_weights = profile['weights']
     
-    job_tokens_set = set(job_tokens)
-    resume_tokens_set = set(resume_tokens)
+    # Tokenize, filter, and normalize
+    resume_tokens_set = set(resume_terms) if resume_terms is not None else extract_terms(resume_text)
     
     # Calculate matches
-    matched = job_tokens_set & resume_tokens_set
-    missing = job_tokens_set - resume_tokens_set
+    matched = resume_tokens_set.intersection(job_weights)
+    missing = set(job_weights) - matched
     
-    if not job_tokens_set:
+    if not job_weights:
         return 0, [], [], {}
     
     # Calculate weighted score
-    total_weight = sum(get_skill_weight(token) for token in job_tokens_set)
-    matched_weight = sum(get_skill_weight(token) for token in matched)
+    total_weight = profile['total_weight']
+    matched_weight = sum(job_weights[token] for token in matched)
     
     score = int(100 * matched_weight / total_weight) if total_weight > 0 else 0
     
     # Prepare detailed breakdown
     details = {
-        'total_keywords': len(job_tokens_set),
+        'total_keywords': len(job_weights),
         'matched_count': len(matched),
         'missing_count': len(missing),
         'total_weight': total_weight,
@@ -311,7 +453,68 @@ def calculate_similarity(word1, word2):
     return SequenceMatcher(None, word1, word2).ratio()
 
 
-def find_fuzzy_matches(job_tokens, resume_tokens, threshold=0.85):
+class FuzzyIndex:
+    """
+    Length-bucketed index over resume tokens for fuzzy matching.
+    
+    SequenceMatcher.ratio() is 2*M/(len(a)+len(b)), so it can never exceed
+    2*min(len)/(len(a)+len(b)). Buckets whose length makes that bound fall
+    below the threshold are skipped outright, then quick_ratio() (another
+    upper bound) prunes most of what is left before the exact ratio() is
+    computed. Candidates are visited in the original token order, so the
+    result is identical to comparing against every token.
+    """
+    
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.by_length = {}
+        for position, token in enumerate(self.tokens):
+            self.by_length.setdefault(len(token), []).append((position, token))
+        # One matcher per resume token: SequenceMatcher caches its analysis of seq2
+        self._matchers = {}
+    
+    def _matcher(self, token):
+        matcher = self._matchers.get(token)
+        if matcher is None:
+            matcher = self._matchers[token] = SequenceMatcher(None, '', token)
+        return matcher
+    
+    def _candidates(self, token, threshold):
+        """Resume tokens whose length allows a ratio >= threshold, in original order."""
+        length = len(token)
+        buckets = [
+            bucket for other_length, bucket in self.by_length.items()
+            if 2.0 * min(length, other_length) / (length + other_length) >= threshold
+        ]
+        if len(buckets) == 1:
+            return buckets[0]
+        return heapq.merge(*buckets)
+    
+    def best_match(self, token, threshold):
+        """
+        Return (best_token, similarity) for the most similar token with
+        similarity >= threshold (first one wins ties), or (None, 0).
+        """
+        best_match = None
+        best_score = 0
+        length = len(token)
+        for _, candidate in self._candidates(token, threshold):
+            total = length + len(candidate)
+            if 2.0 * min(length, len(candidate)) / total <= best_score:
+                continue
+            matcher = self._matcher(candidate)
+            matcher.set_seq1(token)
+            bound = matcher.quick_ratio()
+            if bound < threshold or bound <= best_score:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= threshold and similarity > best_score:
+                best_match = candidate
+                best_score = similarity
+        return best_match, best_score
+
+
+def find_fuzzy_matches(job_tokens, resume_tokens, threshold=0.85, index=None):
     """
     Find fuzzy matches between job and resume tokens.
     
@@ -319,26 +522,21 @@ def find_fuzzy_matches(job_tokens, resume_tokens, threshold=0.85):
         job_tokens: Set of job requirement tokens
         resume_tokens: Set of resume tokens
         threshold: Minimum similarity ratio (0.85 = 85% similar)
+        index: Optional prebuilt FuzzyIndex over resume_tokens
         
     Returns:
         dict: Mapping of job tokens to their fuzzy matched resume tokens
     """
     fuzzy_matches = {}
+    if index is None:
+        index = FuzzyIndex(resume_tokens)
     
     for job_token in job_tokens:
         if job_token in resume_tokens:
             # Exact match, skip fuzzy
             continue
-            
-        best_match = None
-        best_score = 0
-        
-        for resume_token in resume_tokens:
-            similarity = calculate_similarity(job_token, resume_token)
-            if similarity >= threshold and similarity > best_score:
-                best_match = resume_token
-                best_score = similarity
         
+        best_match, best_score = index.best_match(job_token, threshold)
         if best_match:
             fuzzy_matches[job_token] = {
                 'matched_to': best_match,
@@ -348,7 +546,25 @@ def find_fuzzy_matches(job_tokens, resume_tokens, threshold=0.85):
     return fuzzy_matches
 
 
-def fuzzy_score_resume(resume_text, job_description, fuzzy_threshold=0.85):
+def similarity_credit(similarity):
+    """
+    Fuzzy credit of a similarity in integer hundredths, rounded to two
+    places as find_fuzzy_matches reports it (0.8571 -> 86).
+    """
+    return round(round(similarity, 2) * 100)
+
+
+def keyword_percentage(matched_hundredths, total_weight):
+    """
+    0-100 keyword score from the matched weight in hundredths (weight x
+    credit, exact matches earning 100). Integer arithmetic, so every scorer
+    (fuzzy_score_resume, rescoring.score_token_sets, the job index) truncates
+    the same way whatever order the weights are added in.
+    """
+    return int(matched_hundredths // total_weight) if total_weight > 0 else 0
+
+
+def fuzzy_score_resume(resume_text, job_description, fuzzy_threshold=0.85, profile=None, resume_terms=None):
     """
     Calculate weighted resume score with fuzzy matching support.
     Allows partial credit for similar words (e.g., "developer" ~ "development")
@@ -357,53 +573,58 @@ def fuzzy_score_resume(resume_text, job_description, fuzzy_threshold=0.85):
         resume_text: Full text of the resume
         job_description: Job posting description text
         fuzzy_threshold: Minimum similarity for fuzzy match (default 0.85 = 85%)
+        profile: Optional compiled job profile (see compile_job_profile); when
+            given, job_description is not re-tokenized
+        resume_terms: Optional precomputed extract_terms(resume_text), e.g.
+            Candidate.resume_terms; when given, resume_text is not re-tokenized
         
     Returns:
         tuple: (score, matched_keywords, missing_keywords, fuzzy_matches, details)
     """
-    # Tokenize, filter, and normalize
-    job_tokens = normalize_tokens(tokenize_and_filter(job_description))
-    resume_tokens = normalize_tokens(tokenize_and_filter(resume_text))
+    if profile is None:
+        profile = compile_job_profile(job_description)
+    job_weights = profile['weights']
     
-    job_tokens_set = set(job_tokens)
-    resume_tokens_set = set(resume_tokens)
+    # Tokenize, filter, and normalize
+    if resume_terms is not None:
+        resume_tokens_set = set(resume_terms)
+    else:
+        with span('tokenize'):
+            resume_tokens_set = extract_terms(resume_text)
     
     # Find exact matches
-    exact_matched = job_tokens_set & resume_tokens_set
-    missing = job_tokens_set - exact_matched
+    exact_matched = resume_tokens_set.intersection(job_weights)
+    missing = set(job_weights) - exact_matched
     
     # Find fuzzy matches for missing keywords
-    fuzzy_matches = find_fuzzy_matches(missing, resume_tokens_set, fuzzy_threshold)
+    with span('fuzzy_match', missing=len(missing)):
+        fuzzy_matches = find_fuzzy_matches(missing, resume_tokens_set, fuzzy_threshold)
     
-    # Calculate weighted score
-    total_weight = 0
+    # Calculate weighted score, in hundredths of a weight
+    total_weight = profile['total_weight']
     matched_weight = 0
     
-    for token in job_tokens_set:
-        weight = get_skill_weight(token)
-        total_weight += weight
-        
+    for token, weight in job_weights.items():
         if token in exact_matched:
             # Full credit for exact match
-            matched_weight += weight
+            matched_weight += weight * 100
         elif token in fuzzy_matches:
             # Partial credit for fuzzy match (similarity * weight)
-            similarity = fuzzy_matches[token]['similarity']
-            matched_weight += weight * similarity
+            matched_weight += weight * similarity_credit(fuzzy_matches[token]['similarity'])
     
-    score = int(100 * matched_weight / total_weight) if total_weight > 0 else 0
+    score = keyword_percentage(matched_weight, total_weight)
     
     # Update missing to only include items without fuzzy match
     truly_missing = [token for token in missing if token not in fuzzy_matches]
     
     # Prepare detailed breakdown
     details = {
-        'total_keywords': len(job_tokens_set),
+        'total_keywords': len(job_weights),
         'exact_matches': len(exact_matched),
         'fuzzy_matches': len(fuzzy_matches),
         'missing_count': len(truly_missing),
         'total_weight': total_weight,
-        'matched_weight': round(matched_weight, 2),
+        'matched_weight': matched_weight / 100,
         'weighted_score': score,
     }
     
@@ -411,31 +632,70 @@ def fuzzy_score_resume(resume_text, job_description, fuzzy_threshold=0.85):
 
 
 # ============================================================================
-# ENHANCEMENT #5: AI SEMANTIC MATCHING
+# COMPILED JOB PROFILES
 # ============================================================================
 
-def ai_semantic_match(resume_text, job_description, candidate_name="Candidate"):
+# Bump when tokenization, normalization or weighting code changes so stored
+# profiles are rebuilt (see ats/job_profiles.py); vocabulary edits are
+# tracked by the vocabulary version instead
+PROFILE_VERSION = 2
+
+
+def compile_job_profile(job_description, vocabulary=None):
     """
-    Use AI to perform deep semantic analysis of candidate-job fit.
-    Evaluates beyond keywords to understand context, transferable skills, etc.
+    Precompute the job-side half of keyword scoring so it can be reused for
+    every candidate scored against the same job.
     
     Args:
-        resume_text: Full text of the resume
         job_description: Job posting description text
-        candidate_name: Name of candidate for personalized analysis
+        vocabulary: CompiledVocabulary (default: the live one, get_vocabulary())
         
     Returns:
         dict: {
-            'technical_skills_score': 0-100,
-            'experience_level_score': 0-100,
-            'overall_score': 0-100,
-            'grade': 'A'/'B'/'C'/'D'/'F',
-            'reasoning': str,
-            'strengths': list,
-            'concerns': list,
-            'recommendation': str
+            'version': PROFILE_VERSION,
+            'vocab_version': vocabulary version the profile was compiled with,
+            'weights': {normalized_token: weight},
+            'total_weight': sum of weights,
+            'legacy_tokens': sorted raw tokens used by scoring.score_resume
         }
     """
+    vocabulary = vocabulary or get_vocabulary()
+    job_tokens_set = extract_terms(job_description, vocabulary)
+    weights = {token: vocabulary.weight(token) for token in sorted(job_tokens_set)}
+    
+    return {
+        'version': PROFILE_VERSION,
+        'vocab_version': vocabulary.version,
+        'weights': weights,
+        'total_weight': sum(weights.values()),
+        'legacy_tokens': sorted(set(tokenize(job_description))),
+    }
+
+
+# ============================================================================
+# ENHANCEMENT #5: AI SEMANTIC MATCHING
+# ============================================================================
+
+SEMANTIC_MATCH_MODEL = 'tngtech/deepseek-r1t2-chimera:free'  # DeepSeek R1 reasoning model (FREE)
+
+
+SEMANTIC_MATCH_PARAMS = {'max_tokens': 800, 'temperature': 0.3}
+SEMANTIC_MATCH_FIELDS = ['technical_skills_score', 'experience_level_score', 
+                         'overall_score', 'grade', 'reasoning', 'strengths', 
+                         'concerns', 'recommendation']
+
+
+def build_semantic_match_messages(resume_text, job_description):
+    """
+    Build the chat messages for an AI semantic match request.
+    
+    Args:
+        resume_text: Full text of the resume
+        job_description: Job posting description text
+        
+    Returns:
+        list: Chat messages for SEMANTIC_MATCH_MODEL
+    """
     # Truncate texts to fit in prompt
     resume_snippet = resume_text[:8000] if resume_text else "No resume text available"
     job_snippet = job_description[:4000] if job_description else "No job description"
@@ -469,70 +729,153 @@ Consider:
 
 Be fair but honest. Similar technologies should count (e.g., Flask experience helps with Django).
 """
+    return [{'role': 'user', 'content': prompt}]
 
-    try:
-        # Use OpenRouter with DeepSeek R1 T2 Chimera (FREE version - advanced reasoning)
-        response = client.chat.completions.create(
-            model='tngtech/deepseek-r1t2-chimera:free',  # DeepSeek R1 reasoning model (FREE)
-            messages=[{'role': 'user', 'content': prompt}],
-            max_tokens=800,
-            temperature=0.3,
-            timeout=40,  # 40 second timeout for this specific call
-            extra_headers={
-                "HTTP-Referer": settings.OPENROUTER_APP_NAME,
-                "X-Title": settings.OPENROUTER_APP_NAME,
-            }
-        )
-        
-        response_text = response.choices[0].message.content.strip()
-        
-        # Try to parse JSON response
-        # Sometimes AI wraps JSON in markdown code blocks
-        if '```json' in response_text:
-            response_text = response_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in response_text:
-            response_text = response_text.split('```')[1].split('```')[0].strip()
-        
-        result = json.loads(response_text)
+
+def extract_json_text(response_text):
+    """Strip the markdown code fences models sometimes wrap JSON in."""
+    response_text = response_text.strip()
+    if '```json' in response_text:
+        response_text = response_text.split('```json')[1].split('```')[0].strip()
+    elif '```' in response_text:
+        response_text = response_text.split('```')[1].split('```')[0].strip()
+    return response_text
+
+
+def parse_semantic_match_response(response_text):
+    """
+    Parse an AI semantic match reply, filling in any missing fields.
+    
+    Raises:
+        ValueError: The reply is not valid JSON
+    """
+    result = json.loads(response_text)
+    
+    # Validate required fields
+    for field in SEMANTIC_MATCH_FIELDS:
+        if field not in result:
+            result[field] = get_default_value(field)
+    
+    return result
+
+
+def semantic_match_error_result(error):
+    """Default analysis returned when the AI call fails."""
+    error_type = type(error).__name__
+    error_msg = str(error)
+    
+    # Provide user-friendly error message
+    if 'timeout' in error_msg.lower() or 'timed out' in error_msg.lower():
+        reasoning = 'AI analysis timed out (server busy). Keyword scoring still available.'
+    elif 'api' in error_msg.lower() or 'key' in error_msg.lower():
+        reasoning = 'AI API unavailable. Please check API key configuration.'
+    else:
+        reasoning = 'AI analysis unavailable. Using keyword scoring only.'
+    
+    return {
+        'technical_skills_score': 0,
+        'experience_level_score': 0,
+        'overall_score': 0,
+        'grade': 'N/A',
+        'reasoning': reasoning,
+        'strengths': [],
+        'concerns': ['AI analysis unavailable - manual review recommended'],
+        'recommendation': 'Manual review required',
+        'error': f'{error_type}: {error_msg[:100]}'  # Truncate long errors
+    }
+
+
+def ai_semantic_match(resume_text, job_description, candidate_name="Candidate", use_cache=True):
+    """
+    Use AI to perform deep semantic analysis of candidate-job fit.
+    Evaluates beyond keywords to understand context, transferable skills, etc.
+    
+    For scoring many candidates concurrently see ats/ai_client.py.
+    
+    Args:
+        resume_text: Full text of the resume
+        job_description: Job posting description text
+        candidate_name: Name of candidate for personalized analysis
+        use_cache: Answer identical requests from the LLM response cache and
+            store new responses in it (False bypasses the cache entirely)
         
-        # Validate required fields
-        required_fields = ['technical_skills_score', 'experience_level_score', 
-                          'overall_score', 'grade', 'reasoning', 'strengths', 
-                          'concerns', 'recommendation']
+    Returns:
+        dict: {
+            'technical_skills_score': 0-100,
+            'experience_level_score': 0-100,
+            'overall_score': 0-100,
+            'grade': 'A'/'B'/'C'/'D'/'F',
+            'reasoning': str,
+            'strengths': list,
+            'concerns': list,
+            'recommendation': str
+        }
+    """
+    with span('ai_match') as stage:
+        return _ai_semantic_match(resume_text, job_description, use_cache, stage)
+
+
+def _ai_semantic_match(resume_text, job_description, use_cache, stage):
+    messages = build_semantic_match_messages(resume_text, job_description)
+    params = SEMANTIC_MATCH_PARAMS
+    fingerprint = prompt_fingerprint(SEMANTIC_MATCH_MODEL, messages, **params)
+
+    try:
+        response_text = get_cached_response(fingerprint) if use_cache else None
+        cache_hit = response_text is not None
+        if not cache_hit:
+            # Use OpenRouter with DeepSeek R1 T2 Chimera (FREE version - advanced reasoning);
+            # skipped while the circuit is open
+            response = openrouter_breaker.call(
+                client.chat.completions.create,
+                model=SEMANTIC_MATCH_MODEL,
+                messages=messages,
+                timeout=stage_timeout('semantic_match'),  # this stage's share of the LLM latency budget
+                extra_headers={
+                    "HTTP-Referer": settings.OPENROUTER_APP_NAME,
+                    "X-Title": settings.OPENROUTER_APP_NAME,
+                },
+                **params
+            )
+            
+            # Sometimes AI wraps JSON in markdown code blocks
+            response_text = extract_json_text(response.choices[0].message.content)
         
-        for field in required_fields:
-            if field not in result:
-                result[field] = get_default_value(field)
+        result = parse_semantic_match_response(response_text)
+        if cache_hit:
+            stage.outcome = 'cached'
+        elif use_cache:
+            store_response(fingerprint, SEMANTIC_MATCH_MODEL, response_text)
         
         return result
         
     except Exception as e:
-        # Return default structure if AI call fails
-        error_type = type(e).__name__
-        error_msg = str(e)
-        
         # Log the error for debugging
-        print(f"AI semantic match error ({error_type}): {error_msg}")
-        
-        # Provide user-friendly error message
-        if 'timeout' in error_msg.lower() or 'timed out' in error_msg.lower():
-            reasoning = 'AI analysis timed out (server busy). Keyword scoring still available.'
-        elif 'api' in error_msg.lower() or 'key' in error_msg.lower():
-            reasoning = 'AI API unavailable. Please check API key configuration.'
-        else:
-            reasoning = 'AI analysis unavailable. Using keyword scoring only.'
+        stage.outcome = 'skipped' if isinstance(e, CircuitOpenError) else 'fallback'
+        print(f"AI semantic match error ({type(e).__name__}): {e}")
+        return semantic_match_error_result(e)
+
+
+def summarize_ai_analysis(ai_analysis):
+    """
+    Build the readable reasoning summary stored on a Candidate.
+    
+    Args:
+        ai_analysis: Result dict from ai_semantic_match
         
-        return {
-            'technical_skills_score': 0,
-            'experience_level_score': 0,
-            'overall_score': 0,
-            'grade': 'N/A',
-            'reasoning': reasoning,
-            'strengths': [],
-            'concerns': ['AI analysis unavailable - manual review recommended'],
-            'recommendation': 'Manual review required',
-            'error': f'{error_type}: {error_msg[:100]}'  # Truncate long errors
-        }
+    Returns:
+        str: Reasoning, strengths, concerns and recommendation joined by " | "
+    """
+    reasoning_parts = []
+    if ai_analysis.get('reasoning'):
+        reasoning_parts.append(ai_analysis['reasoning'])
+    if ai_analysis.get('strengths'):
+        reasoning_parts.append(f"Strengths: {', '.join(ai_analysis['strengths'][:3])}")
+    if ai_analysis.get('concerns'):
+        reasoning_parts.append(f"Concerns: {', '.join(ai_analysis['concerns'][:3])}")
+    if ai_analysis.get('recommendation'):
+        reasoning_parts.append(f"Recommendation: {ai_analysis['recommendation']}")
+    return " | ".join(reasoning_parts)
 
 
 def get_default_value(field):
@@ -555,7 +898,7 @@ def get_default_value(field):
 # ============================================================================
 
 def advanced_score_resume(resume_text, job_description, candidate_name="Candidate", 
-                         use_ai=True, fuzzy_threshold=0.85):
+                         use_ai=True, fuzzy_threshold=0.85, use_cache=True, profile=None):
     """
     Perform complete advanced scoring with all enhancements.
     Returns both keyword-based and AI-based scores.
@@ -566,13 +909,15 @@ def advanced_score_resume(resume_text, job_description, candidate_name="Candidat
         candidate_name: Name for personalized AI analysis
         use_ai: Whether to include AI semantic analysis (slower)
         fuzzy_threshold: Similarity threshold for fuzzy matching
+        use_cache: Reuse cached AI analysis for identical requests
+        profile: Optional compiled job profile for job_description
         
     Returns:
         dict: Complete scoring results with all metrics
     """
     # Phase 1: Enhanced keyword scoring (fast)
     keyword_score, exact_matches, missing, fuzzy_matches, details = fuzzy_score_resume(
-        resume_text, job_description, fuzzy_threshold
+        resume_text, job_description, fuzzy_threshold, profile=profile
     )
     
     result = {
@@ -585,7 +930,7 @@ def advanced_score_resume(resume_text, job_description, candidate_name="Candidat
     
     # Phase 2: AI semantic analysis (slower, optional)
     if use_ai and settings.OPENROUTER_API_KEY:
-        ai_result = ai_semantic_match(resume_text, job_description, candidate_name)
+        ai_result = ai_semantic_match(resume_text, job_description, candidate_name, use_cache=use_cache)
         result['ai_analysis'] = ai_result
         result['ai_score'] = ai_result.get('overall_score', 0)
         result['ai_grade'] = ai_result.get('grade', 'N/A')
@@ -597,6 +942,105 @@ def advanced_score_resume(resume_text, job_description, candidate_name="Candidat
     return result
 
 
+# ============================================================================
+# TIERED SCORING CASCADE (cheapest first, with early exit)
+# ============================================================================
+
+# Tiers in cost order; each tier's threshold is the score needed to run the next
+SCORE_TIERS = ('legacy', 'weighted', 'fuzzy', 'ai')
+
+
+def next_tier_allowed(tier, score, thresholds):
+    """
+    Whether a score at one tier is high enough to run the next.
+    
+    Args:
+        tier: 'legacy', 'weighted' or 'fuzzy'
+        score: The score (0-100) that tier produced
+        thresholds: {tier: minimum score}; missing tiers always continue
+        
+    Returns:
+        bool
+    """
+    return score >= (thresholds or {}).get(tier, 0)
+
+
+def cascade_score_resume(resume_text, job_description, thresholds=None, candidate_name="Candidate",
+                         use_ai=True, fuzzy_threshold=0.85, use_cache=True, profile=None,
+                         resume_terms=None, resume_tokens=None):
+    """
+    Score a resume tier by tier, stopping as soon as a tier scores below
+    its threshold: legacy score_resume -> weighted_score_resume ->
+    fuzzy_score_resume -> ai_semantic_match.
+    
+    A poor keyword fit is decided in microseconds instead of waiting for
+    the LLM. With no thresholds every tier runs, as in advanced_score_resume.
+    
+    Args:
+        resume_text: Full text of the resume (may be None when resume_terms
+            and resume_tokens are given and use_ai is False)
+        job_description: Job posting description text
+        thresholds: {'legacy': int, 'weighted': int, 'fuzzy': int} minimum
+            score at each tier to continue (see JobPost.get_cascade_thresholds)
+        candidate_name: Name for personalized AI analysis
+        use_ai: Whether the AI tier may run
+        fuzzy_threshold: Similarity threshold for fuzzy matching
+        use_cache: Reuse cached AI analysis for identical requests
+        profile: Optional compiled job profile for job_description
+        resume_terms: Optional precomputed extract_terms(resume_text)
+        resume_tokens: Optional precomputed raw tokens (legacy tier)
+        
+    Returns:
+        dict: 'score_tier' (the tier that decided), 'legacy_score',
+        'matched_keywords', 'missing_keywords' (legacy tier), 'keyword_score'
+        (score of the last keyword tier run), 'fuzzy_matches', and, when the
+        AI tier ran, 'ai_analysis', 'ai_score' and 'ai_grade'
+    """
+    if profile is None:
+        profile = compile_job_profile(job_description)
+    if resume_terms is None:
+        resume_terms = extract_terms(resume_text)
+    
+    # Tier 1: raw token overlap
+    legacy_score, matched, missing = score_resume(
+        resume_text, job_description, job_tokens=profile['legacy_tokens'], resume_tokens=resume_tokens
+    )
+    result = {
+        'score_tier': 'legacy',
+        'legacy_score': legacy_score,
+        'matched_keywords': matched,
+        'missing_keywords': missing,
+        'keyword_score': legacy_score,
+        'fuzzy_matches': {},
+        'ai_analysis': None,
+        'ai_score': None,
+        'ai_grade': None,
+    }
+    if not next_tier_allowed('legacy', legacy_score, thresholds):
+        return result
+    
+    # Tier 2: weighted exact matches of normalized terms
+    weighted_score, _, _, _ = weighted_score_resume(None, job_description, profile=profile, resume_terms=resume_terms)
+    result.update(score_tier='weighted', keyword_score=weighted_score)
+    if not next_tier_allowed('weighted', weighted_score, thresholds):
+        return result
+    
+    # Tier 3: weighted matches with fuzzy partial credit
+    keyword_score, _, _, fuzzy_matches, _ = fuzzy_score_resume(
+        None, job_description, fuzzy_threshold, profile=profile, resume_terms=resume_terms
+    )
+    result.update(score_tier='fuzzy', keyword_score=keyword_score, fuzzy_matches=fuzzy_matches)
+    if not (use_ai and settings.OPENROUTER_API_KEY) or not next_tier_allowed('fuzzy', keyword_score, thresholds):
+        return result
+    
+    # Tier 4: LLM semantic match; a failed call leaves the fuzzy tier in charge
+    ai_result = ai_semantic_match(resume_text, job_description, candidate_name, use_cache=use_cache)
+    result['ai_analysis'] = ai_result
+    if 'error' not in ai_result:
+        result.update(score_tier='ai', ai_score=ai_result.get('overall_score', 0), ai_grade=ai_result.get('grade', 'N/A'))
+    return result
+
+
 # ============================================================================
 # BASIC SCORING (with stop words filtering)
 # ============================================================================
@@ -613,11 +1057,8 @@ def basic_score_resume(resume_text, job_description):
         tuple: (score, matched_keywords, missing_keywords)
     """
     # Tokenize, filter stop words, and normalize both texts
-    job_tokens = normalize_tokens(tokenize_and_filter(job_description))
-    resume_tokens = normalize_tokens(tokenize_and_filter(resume_text))
-    
-    job_tokens = set(job_tokens)
-    resume_tokens = set(resume_tokens)
+    job_tokens = extract_terms(job_description)
+    resume_tokens = extract_terms(resume_text)
     
     # Calculate matches
     matched = job_tokens & resume_tokens
@@ -0,0 +1,226 @@
+"""
+Concurrent AI semantic matching.
+
+``ai_semantic_match`` makes one blocking call at a time and gives up on the
+first error. For bulk scoring, AsyncSemanticMatchClient sends many requests
+at once through ``AsyncOpenAI`` (same OPENROUTER_BASE_URL, prompt and
+response parsing) and adds:
+
+* an in-flight limit (AI_MAX_IN_FLIGHT concurrent requests);
+* a token bucket (AI_REQUESTS_PER_SECOND, bursts of AI_RATE_BURST);
+* retries with jittered exponential backoff on 429, 5xx and connection
+  errors, honouring Retry-After;
+* coalescing: identical requests in flight share one API call;
+* the persistent LLM response cache (ats/llm_cache.py);
+* the shared OpenRouter circuit breaker (ats/circuit_breaker.py).
+
+Use ``semantic_match_batch`` from synchronous code (Celery tasks).
+"""
+import asyncio
+import copy
+import random
+import time
+
+import openai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .advanced_scoring import (
+    SEMANTIC_MATCH_MODEL, SEMANTIC_MATCH_PARAMS, build_semantic_match_messages,
+    extract_json_text, parse_semantic_match_response, semantic_match_error_result,
+)
+from .circuit_breaker import openrouter_breaker, stage_timeout
+from .llm_cache import get_cached_response, prompt_fingerprint, store_response
+from .metrics import span
+
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: ``rate`` tokens per second, holding at most
+    ``capacity``. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _retry_after(error):
+    """Seconds requested by a Retry-After header, if any."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncSemanticMatchClient:
+    """
+    Rate-limited, retrying, coalescing AI semantic match client.
+
+    Create one per event loop. Settings supply every default; pass
+    ``base_url`` to point at another OpenAI-compatible server.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_in_flight=None, requests_per_second=None,
+                 burst=None, max_retries=None, retry_base_delay=None, retry_max_delay=None,
+                 timeout=None, use_cache=True):
+        self.max_retries = settings.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = settings.AI_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.retry_max_delay = settings.AI_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        self.use_cache = use_cache
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key or settings.OPENROUTER_API_KEY,
+            base_url=base_url or settings.OPENROUTER_BASE_URL,
+            timeout=timeout or stage_timeout('semantic_match'),
+            max_retries=0,  # retries are handled here, with backoff and rate limiting
+        )
+        self._semaphore = asyncio.Semaphore(max_in_flight or settings.AI_MAX_IN_FLIGHT)
+        self._bucket = TokenBucket(
+            settings.AI_REQUESTS_PER_SECOND if requests_per_second is None else requests_per_second,
+            burst or settings.AI_RATE_BURST,
+        )
+        self._in_flight = {}
+        self.stats = {'requests': 0, 'retries': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.client.close()
+
+    def _retry_delay(self, attempt, error):
+        """Full-jitter exponential backoff, or the server's Retry-After."""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    async def _complete(self, messages):
+        """One chat completion, retried on rate limits and server errors."""
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self._bucket.acquire()
+                openrouter_breaker.check()
+                self.stats['requests'] += 1
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=SEMANTIC_MATCH_MODEL,
+                        messages=messages,
+                        extra_headers={
+                            "HTTP-Referer": settings.OPENROUTER_APP_NAME,
+                            "X-Title": settings.OPENROUTER_APP_NAME,
+                        },
+                        **SEMANTIC_MATCH_PARAMS
+                    )
+                except RETRYABLE_ERRORS as e:
+                    if attempt >= self.max_retries:
+                        # One failure per abandoned request: retries of a single
+                        # request must not open the breaker on their own
+                        openrouter_breaker.record_failure()
+                        raise
+                    delay = self._retry_delay(attempt, e)
+                    print(f"⏳ AI request {type(e).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                except Exception as e:
+                    openrouter_breaker.record_error(e)
+                    raise
+                else:
+                    openrouter_breaker.record_success()
+                    return response.choices[0].message.content
+            # Back off without holding an in-flight slot
+            await asyncio.sleep(delay)
+            attempt += 1
+            self.stats['retries'] += 1
+
+    async def _fetch(self, fingerprint, messages):
+        try:
+            response_text = extract_json_text(await self._complete(messages))
+            result = parse_semantic_match_response(response_text)
+            if self.use_cache:
+                await sync_to_async(store_response)(fingerprint, SEMANTIC_MATCH_MODEL, response_text)
+            return result
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"AI semantic match error ({type(e).__name__}): {e}")
+            return semantic_match_error_result(e)
+
+    async def match(self, resume_text, job_description, candidate_name="Candidate"):
+        """
+        Async counterpart of ai_semantic_match (same result dict, including
+        the fallback with an 'error' key).
+        """
+        messages = build_semantic_match_messages(resume_text, job_description)
+        fingerprint = prompt_fingerprint(SEMANTIC_MATCH_MODEL, messages, **SEMANTIC_MATCH_PARAMS)
+
+        with span('ai_match', concurrent=True) as stage:
+            if self.use_cache:
+                cached = await sync_to_async(get_cached_response)(fingerprint)
+                if cached is not None:
+                    try:
+                        result = parse_semantic_match_response(cached)
+                        self.stats['cache_hits'] += 1
+                        stage.outcome = 'cached'
+                        return result
+                    except ValueError:
+                        pass
+
+            task = self._in_flight.get(fingerprint)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(fingerprint, messages))
+                self._in_flight[fingerprint] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(fingerprint, None))
+            else:
+                self.stats['coalesced'] += 1
+            # shield: a cancelled caller must not cancel the request others are waiting on
+            result = copy.deepcopy(await asyncio.shield(task))
+            if 'error' in result:
+                stage.outcome = 'fallback'
+            return result
+
+    async def match_many(self, items):
+        """
+        Score many (resume_text, job_description, candidate_name) items
+        concurrently. Results are returned in input order.
+        """
+        return await asyncio.gather(*(self.match(*item) for item in items))
+
+
+async def semantic_match_many(items, **client_kwargs):
+    """Score items with a fresh client; see AsyncSemanticMatchClient.match_many."""
+    async with AsyncSemanticMatchClient(**client_kwargs) as client:
+        results = await client.match_many(items)
+    print(f"🤖 AI scored {len(results)} item(s): {client.stats}")
+    return results
+
+
+def semantic_match_batch(items, **client_kwargs):
+    """
+    Synchronous entry point: score (resume_text, job_description,
+    candidate_name) items concurrently and return the results in order.
+    """
+    return asyncio.run(semantic_match_many(list(items), **client_kwargs))
@@ -1,4 +1,7 @@
 from django.apps import AppConfig
 class AtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ats'
\ No newline at end of file
+    name = 'ats'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,350 @@
+"""
+Offline benchmarks for the scoring code.
+
+Run through ``manage.py benchmark_fuzzy`` (indexed vs naive fuzzy matching)
+and ``manage.py benchmark_scoring`` (every scorer over a synthetic corpus,
+with baseline files for regression checks; BASELINE_PATH is the committed
+one). LLM calls are stubbed and the run is isolated (see isolated_run()):
+it uses the built-in vocabulary and leaves the database, the LLM cache and
+the circuit breaker untouched.
+"""
+import json
+import logging
+import platform
+import random
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import transaction
+
+from . import advanced_scoring, vocabulary
+from .advanced_scoring import (
+    SKILL_SYNONYMS, advanced_score_resume, basic_score_resume, cascade_score_resume, extract_terms,
+    find_fuzzy_matches, fuzzy_score_resume, weighted_score_resume,
+)
+from .scoring import score_resume
+from .utils import compute_score
+
+
+# General resume/job vocabulary mixed with the skill dictionary so that both
+# exact and near-miss (fuzzy) matches occur
+GENERAL_WORDS = [
+    'developer', 'development', 'developed', 'engineer', 'engineering', 'engineered',
+    'manage', 'managed', 'management', 'manager', 'design', 'designed', 'designing',
+    'system', 'systems', 'service', 'services', 'scalable', 'scalability', 'build',
+    'building', 'built', 'deploy', 'deployed', 'deployment', 'lead', 'leadership',
+    'team', 'teams', 'product', 'products', 'customer', 'customers', 'architecture',
+    'architect', 'performance', 'performant', 'optimize', 'optimized', 'optimization',
+    'analysis', 'analytics', 'analyst', 'communication', 'communicate', 'project',
+    'projects', 'experience', 'experienced', 'automation', 'automated', 'pipeline',
+    'pipelines', 'monitoring', 'monitored', 'security', 'secure', 'integration',
+]
+
+
+def synthetic_text(n_words, rng, vocabulary_size=None):
+    """Random resume/job-like text drawn from skill and general vocabularies."""
+    vocabulary = sorted(set(SKILL_SYNONYMS) | set(GENERAL_WORDS))
+    if vocabulary_size:
+        vocabulary = vocabulary[:vocabulary_size]
+    # Invented tokens give the long tail of distinct words real resumes have
+    tail = [f"{rng.choice(GENERAL_WORDS)}{rng.randint(0, n_words)}" for _ in range(n_words // 10)]
+    return ' '.join(rng.choices(vocabulary + tail, k=n_words))
+
+
+def naive_find_fuzzy_matches(job_tokens, resume_tokens, threshold=0.85):
+    """The original O(J x R) SequenceMatcher loop, kept as the reference."""
+    fuzzy_matches = {}
+    for job_token in job_tokens:
+        if job_token in resume_tokens:
+            continue
+        best_match = None
+        best_score = 0
+        for resume_token in resume_tokens:
+            similarity = SequenceMatcher(None, job_token, resume_token).ratio()
+            if similarity >= threshold and similarity > best_score:
+                best_match = resume_token
+                best_score = similarity
+        if best_match:
+            fuzzy_matches[job_token] = {'matched_to': best_match, 'similarity': round(best_score, 2)}
+    return fuzzy_matches
+
+
+def _time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def benchmark_fuzzy_matcher(resume_sizes=(200, 1000, 3000), job_words=400, threshold=0.85,
+                            repeat=3, seed=42):
+    """
+    Compare naive and indexed fuzzy matching across resume sizes.
+
+    Returns:
+        list of dicts: resume_words, resume_tokens, job_tokens, naive_ms,
+        indexed_ms, speedup and identical (results equal)
+    """
+    rng = random.Random(seed)
+    job_tokens = extract_terms(synthetic_text(job_words, rng))
+    rows = []
+    for size in resume_sizes:
+        resume_tokens = extract_terms(synthetic_text(size, rng))
+        missing = job_tokens - resume_tokens
+        naive_time, naive = _time(lambda: naive_find_fuzzy_matches(missing, resume_tokens, threshold), repeat)
+        indexed_time, indexed = _time(lambda: find_fuzzy_matches(missing, resume_tokens, threshold), repeat)
+        rows.append({
+            'resume_words': size,
+            'resume_tokens': len(resume_tokens),
+            'job_tokens': len(missing),
+            'naive_ms': round(naive_time * 1000, 2),
+            'indexed_ms': round(indexed_time * 1000, 2),
+            'speedup': round(naive_time / indexed_time, 1) if indexed_time else float('inf'),
+            'identical': naive == indexed,
+        })
+    return rows
+
+
+# ============================================================================
+# SCORING BENCHMARK SUITE
+# ============================================================================
+
+def generate_corpus(resume_sizes=(200, 1000, 3000), vocabulary_sizes=(60, None), job_sizes=(100, 400), seed=42):
+    """
+    Synthetic resume/job pairs for every combination of resume length,
+    vocabulary size (None = full vocabulary) and job length.
+
+    Returns:
+        list of dicts: name, resume_words, vocabulary_size, job_words, resume, job
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for resume_words in resume_sizes:
+        for vocabulary_size in vocabulary_sizes:
+            for job_words in job_sizes:
+                corpus.append({
+                    'name': f"r{resume_words}-v{vocabulary_size or 'all'}-j{job_words}",
+                    'resume_words': resume_words,
+                    'vocabulary_size': vocabulary_size,
+                    'job_words': job_words,
+                    'resume': synthetic_text(resume_words, rng, vocabulary_size),
+                    'job': synthetic_text(job_words, rng, vocabulary_size),
+                })
+    return corpus
+
+
+def _compute_score_inputs(case):
+    """JobPost/parsed-resume stand-ins for utils.compute_score."""
+    skills = lambda text: sorted({SKILL_SYNONYMS[t] for t in text.lower().split() if t in SKILL_SYNONYMS})
+    job = SimpleNamespace(required_skills=skills(case['job']))
+    parsed = {
+        'skills': skills(case['resume']),
+        'total_experience_years': case['resume_words'] // 200,
+        'education': ['Bachelor of Science', 'Master of Engineering'],
+    }
+    return job, parsed
+
+
+# name -> callable(case); advanced_score_resume runs with the LLM stubbed
+SCORERS = {
+    'score_resume': lambda case: score_resume(case['resume'], case['job']),
+    'basic_score_resume': lambda case: basic_score_resume(case['resume'], case['job']),
+    'weighted_score_resume': lambda case: weighted_score_resume(case['resume'], case['job']),
+    'fuzzy_score_resume': lambda case: fuzzy_score_resume(case['resume'], case['job']),
+    'compute_score': lambda case: compute_score(*_compute_score_inputs(case)),
+    'advanced_score_resume': lambda case: advanced_score_resume(
+        case['resume'], case['job'], use_ai=True, use_cache=False
+    ),
+    'cascade_score_resume': lambda case: cascade_score_resume(
+        case['resume'], case['job'], settings.SCORE_CASCADE_THRESHOLDS, use_ai=True, use_cache=False
+    ),
+}
+
+STUB_AI_RESPONSE = json.dumps({
+    'technical_skills_score': 70, 'experience_level_score': 60, 'overall_score': 65, 'grade': 'B',
+    'reasoning': 'Offline benchmark stub.', 'strengths': [], 'concerns': [], 'recommendation': 'Consider',
+})
+
+
+class _StubCompletions:
+    def create(self, **kwargs):
+        message = SimpleNamespace(content=STUB_AI_RESPONSE)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@contextmanager
+def swapped(target, **attributes):
+    """Set attributes of a module (or the settings) for the duration of a block."""
+    missing = object()
+    previous = {name: getattr(target, name, missing) for name in attributes}
+    for name, value in attributes.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is missing:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+
+
+@contextmanager
+def stub_llm(stub_client=None):
+    """Answer every OpenRouter call with stub_client (default: a canned response), offline."""
+    stub_client = stub_client or SimpleNamespace(chat=SimpleNamespace(completions=_StubCompletions()))
+    with swapped(advanced_scoring, client=stub_client), swapped(settings, OPENROUTER_API_KEY='offline-benchmark'):
+        yield
+
+
+class _PassThroughBreaker:
+    """Stands in for openrouter_breaker so stubbed calls don't change its shared state."""
+
+    def call(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+@contextmanager
+def isolated_run():
+    """
+    Keep a benchmark off shared state: the LLM is stubbed, the circuit
+    breaker and LLM cache are bypassed, the built-in vocabulary (version 0)
+    is pinned so baselines don't depend on the database's vocabulary, and
+    anything still written to the database is rolled back.
+    """
+    pinned = vocabulary.CompiledVocabulary(0, vocabulary.default_entries())
+    with ExitStack() as stack:
+        stack.enter_context(stub_llm())
+        stack.enter_context(swapped(
+            advanced_scoring,
+            openrouter_breaker=_PassThroughBreaker(),
+            get_cached_response=lambda fingerprint: None,
+            store_response=lambda *args, **kwargs: None,
+        ))
+        stack.enter_context(swapped(vocabulary, _vocabulary=pinned, _checked_at=float('inf')))
+        stack.enter_context(transaction.atomic())
+        try:
+            yield
+        finally:
+            transaction.set_rollback(True)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, case, iterations=20, warmup=2):
+    """
+    Time func(case) and measure its peak traced memory.
+
+    Returns:
+        dict: ops_per_sec, p50_ms, p99_ms, peak_kib
+    """
+    for _ in range(warmup):
+        func(case)
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func(case)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    # Memory in a separate run: tracemalloc would distort the timings
+    tracemalloc.start()
+    try:
+        func(case)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ops_per_sec': round(len(latencies) / sum(latencies), 1) if sum(latencies) else float('inf'),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def benchmark_scorers(corpus=None, scorers=None, iterations=20):
+    """
+    Run every scorer over every corpus case with the LLM stubbed, isolated
+    from shared state (isolated_run()).
+
+    Args:
+        corpus: Cases from generate_corpus() (default corpus if None)
+        scorers: Names from SCORERS (default: all)
+        iterations: Timed calls per scorer and case
+
+    Returns:
+        list of dicts: scorer, case plus the measure() fields
+    """
+    corpus = corpus if corpus is not None else generate_corpus()
+    results = []
+    # Spans still run (they are part of the cost); only their log lines are muted
+    metrics_logger = logging.getLogger('ats.metrics')
+    previous_level = metrics_logger.level
+    metrics_logger.setLevel(logging.WARNING)
+    try:
+        with isolated_run():
+            for name in scorers or SCORERS:
+                for case in corpus:
+                    results.append({'scorer': name, 'case': case['name'], **measure(SCORERS[name], case, iterations)})
+    finally:
+        metrics_logger.setLevel(previous_level)
+    return results
+
+
+# Reference results of 'manage.py benchmark_scoring' with the default corpus
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+
+
+def save_baseline(results, path):
+    """Write results as a baseline JSON file."""
+    baseline = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as fh:
+        json.dump(baseline, fh, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare_to_baseline(results, baseline, threshold=0.25):
+    """
+    Find scorer/case pairs whose p50 latency grew by more than threshold
+    (0.25 = 25%) over the baseline.
+
+    Returns:
+        list of dicts: scorer, case, baseline_p50_ms, p50_ms, slowdown
+    """
+    previous = {(row['scorer'], row['case']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['scorer'], row['case']))
+        if not before or not before['p50_ms']:
+            continue
+        slowdown = row['p50_ms'] / before['p50_ms'] - 1
+        if slowdown > threshold:
+            regressions.append({
+                'scorer': row['scorer'],
+                'case': row['case'],
+                'baseline_p50_ms': before['p50_ms'],
+                'p50_ms': row['p50_ms'],
+                'slowdown': round(slowdown, 3),
+            })
+    return regressions
@@ -0,0 +1,159 @@
+"""
+Circuit breaker and latency budget for OpenRouter calls.
+
+Resume parsing (ats/parsers.py), AI semantic matching
+(ats/advanced_scoring.py) and the async client (ats/ai_client.py) all go
+through ``openrouter_breaker``:
+
+* closed: calls go through; consecutive failures (timeouts, connection
+  errors, 429/5xx) are counted; other errors (400, 401, 404...) mean
+  OpenRouter answered and do not count, see is_outage_error();
+* open: after AI_BREAKER_FAILURE_THRESHOLD failures calls are skipped
+  immediately, and callers fall back to keyword scoring, for
+  AI_BREAKER_RESET_TIMEOUT seconds;
+* half-open: after the cool-down one probe call is let through; success
+  closes the breaker, failure opens it again.
+
+State lives in the Django cache so web and Celery processes share it
+(with the default local-memory cache it is per process).
+
+Each upload gets LLM_LATENCY_BUDGET seconds of LLM time, split between
+stages by LLM_STAGE_BUDGET_SHARES; see stage_timeout().
+"""
+import time
+
+import openai
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CircuitOpenError(Exception):
+    """The breaker is open; the call was skipped."""
+
+
+def is_outage_error(error):
+    """
+    True if error means OpenRouter is unavailable (timeout, connection error,
+    429 or 5xx) rather than that it rejected this request (bad request,
+    authentication, not found...).
+    """
+    if isinstance(error, (openai.APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a half-open probe.
+
+    Args:
+        name: Cache key namespace and display name
+        failure_threshold: Consecutive failures that open the breaker
+        reset_timeout: Seconds to stay open before probing
+    """
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        prefix = f'ats:breaker:{name}:'
+        self._failures_key = prefix + 'failures'
+        self._open_until_key = prefix + 'open_until'
+        self._probe_key = prefix + 'probe'
+
+    @property
+    def failure_threshold(self):
+        return self._failure_threshold or settings.AI_BREAKER_FAILURE_THRESHOLD
+
+    @property
+    def reset_timeout(self):
+        return self._reset_timeout or settings.AI_BREAKER_RESET_TIMEOUT
+
+    def _open(self):
+        cache.set(self._open_until_key, time.time() + self.reset_timeout, None)
+        cache.delete(self._probe_key)
+        print(f"⚡ Circuit '{self.name}' opened for {self.reset_timeout}s")
+
+    @property
+    def state(self):
+        open_until = cache.get(self._open_until_key)
+        if open_until is None:
+            return 'closed'
+        return 'open' if time.time() < open_until else 'half_open'
+
+    def allow_request(self):
+        """True if a call may go out now (closed, or the half-open probe)."""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'open':
+            return False
+        # Half-open: exactly one caller gets the probe; it expires if the prober dies
+        return cache.add(self._probe_key, 1, self.reset_timeout)
+
+    def record_success(self):
+        if self.state != 'closed':
+            print(f"✅ Circuit '{self.name}' closed")
+        cache.delete_many([self._failures_key, self._open_until_key, self._probe_key])
+
+    def record_failure(self):
+        if self.state != 'closed':
+            self._open()  # the probe failed
+            return
+        cache.add(self._failures_key, 0, None)
+        try:
+            failures = cache.incr(self._failures_key)
+        except ValueError:
+            failures = 1
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def record_error(self, error):
+        """
+        Record a failed call: a failure if it was an outage, otherwise a
+        success (OpenRouter answered, so a half-open probe closes the breaker).
+        """
+        if is_outage_error(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"OpenRouter circuit '{self.name}' is open; skipping AI call")
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker; outage exceptions count as failures."""
+        self.check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success()
+        return result
+
+    def status(self):
+        """Breaker state for the health endpoint."""
+        open_until = cache.get(self._open_until_key)
+        return {
+            'name': self.name,
+            'state': self.state,
+            'consecutive_failures': cache.get(self._failures_key, 0),
+            'failure_threshold': self.failure_threshold,
+            'reset_timeout': self.reset_timeout,
+            'retry_in': max(0.0, round(open_until - time.time(), 1)) if open_until else 0.0,
+        }
+
+
+openrouter_breaker = CircuitBreaker('openrouter')
+
+
+def stage_timeout(stage):
+    """
+    Seconds an LLM stage ('parse' or 'semantic_match') may take: its share
+    of LLM_LATENCY_BUDGET.
+    """
+    return settings.LLM_LATENCY_BUDGET * settings.LLM_STAGE_BUDGET_SHARES[stage]
@@ -0,0 +1,244 @@
+"""
+Duplicate-applicant detection.
+
+The same person often applies to several jobs, sometimes with a lightly
+edited resume. A new candidate is linked (Candidate.duplicate_of) to an
+earlier one when:
+
+* their normalized email or phone number is the same, or
+* the estimated Jaccard similarity of their resume texts' word 3-shingles
+  is at least DUPLICATE_SIMILARITY_THRESHOLD.
+
+Similarity is estimated from NUM_PERM-value MinHash signatures stored on
+Candidate.minhash. Signatures are split into BANDS bands of ROWS values
+(locality-sensitive hashing); every band hash, and the contact keys, is a
+DuplicateKey row. A lookup is one indexed ``key IN (...)`` query for the
+18 keys of the new resume, followed by a signature comparison with the few
+candidates it returns, so its cost does not grow with the candidate table.
+With 16 bands of 8 rows, pairs at 0.8 similarity share a band with
+probability ~0.95, pairs at 0.5 with ~0.06.
+
+A candidate whose resume matches its original's (resume_matches()) reuses
+the original's parse results (and, for the same job, its AI analysis)
+instead of paying for the LLM again. One linked by email or phone alone
+may have sent a different resume, so it is still parsed and scored.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+
+from .models import Candidate, DuplicateKey
+
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+EMAIL_BAND = -1
+PHONE_BAND = -2
+
+# Candidate fields copied from an original instead of parsing the resume again
+PARSED_FIELDS = ['email', 'phone', 'skills', 'experience_years', 'education']
+
+# Universal hash functions (a * x + b) mod p; a fixed seed keeps signatures
+# comparable across processes and deploys
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+WORD_RE = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Distinct word SHINGLE_SIZE-grams of the lowercased text."""
+    words = WORD_RE.findall((text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of a text's shingles.
+
+    Returns:
+        np.ndarray: NUM_PERM uint32 values, or None for text without words
+    """
+    shingle_set = shingles(text)
+    if not shingle_set:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    # uint64 products wrap silently; the permutation only has to be consistent
+    values = (np.outer(hashes, _A) + _B) % _PRIME & _MAX_HASH
+    return values.min(axis=0).astype(np.uint32)
+
+
+def signature_from_bytes(data):
+    return np.frombuffer(data, dtype=np.uint32)
+
+
+def estimated_similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures (fraction of equal values)."""
+    return float(np.count_nonzero(signature == other)) / NUM_PERM
+
+
+def _key(value):
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'big', signed=True)
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    """Last ten digits, so '+1 (555) 010-9999' and '555.010.9999' match; '' below seven digits."""
+    digits = ''.join(char for char in (phone or '') if char.isdigit())
+    return digits[-10:] if len(digits) >= 7 else ''
+
+
+def lookup_keys(signature=None, email=None, phone=None):
+    """[(band, key)] for a signature's LSH bands and the contact details."""
+    keys = []
+    if signature is not None:
+        for band in range(BANDS):
+            keys.append((band, _key(signature[band * ROWS:(band + 1) * ROWS].tobytes())))
+    email = normalize_email(email)
+    if email:
+        keys.append((EMAIL_BAND, _key(b'email:' + email.encode('utf-8'))))
+    phone = normalize_phone(phone)
+    if phone:
+        keys.append((PHONE_BAND, _key(b'phone:' + phone.encode('utf-8'))))
+    return keys
+
+
+def find_duplicate(signature=None, email=None, phone=None, before_id=None, threshold=None):
+    """
+    Best earlier match for a resume signature and contact details.
+
+    Args:
+        signature: minhash_signature() of the resume text, or None
+        email, phone: Contact details, if known
+        before_id: Only consider candidates with a smaller primary key
+        threshold: Minimum estimated similarity (default DUPLICATE_SIMILARITY_THRESHOLD)
+
+    Returns:
+        dict: {'candidate_id', 'similarity', 'reason'} ('email', 'phone' or
+        'resume'), or None. Contact matches win over resume matches; ties go
+        to the earliest candidate.
+    """
+    threshold = settings.DUPLICATE_SIMILARITY_THRESHOLD if threshold is None else threshold
+    keys = lookup_keys(signature, email, phone)
+    if not keys:
+        return None
+    wanted = set(keys)
+    hits = {}  # candidate_id -> bands shared
+    rows = DuplicateKey.objects.filter(key__in=[key for _, key in keys])
+    if before_id is not None:
+        rows = rows.filter(candidate_id__lt=before_id)
+    for candidate_id, band, key in rows.values_list('candidate_id', 'band', 'key'):
+        if (band, key) in wanted:
+            hits.setdefault(candidate_id, set()).add(band)
+    if not hits:
+        return None
+
+    signatures = {}
+    if signature is not None:
+        stored = Candidate.objects.filter(pk__in=hits, minhash__isnull=False).values_list('id', 'minhash')
+        signatures = {candidate_id: signature_from_bytes(data) for candidate_id, data in stored}
+
+    best = None
+    for candidate_id in sorted(hits):
+        bands = hits[candidate_id]
+        similarity = estimated_similarity(signature, signatures[candidate_id]) if candidate_id in signatures else 0.0
+        if EMAIL_BAND in bands:
+            reason = 'email'
+        elif PHONE_BAND in bands:
+            reason = 'phone'
+        elif similarity >= threshold:
+            reason = 'resume'
+        else:
+            continue  # LSH false positive
+        rank = (reason != 'resume', similarity)
+        if best is None or rank > best[0]:
+            best = (rank, {'candidate_id': candidate_id, 'similarity': round(similarity, 3), 'reason': reason})
+    return best[1] if best else None
+
+
+def original_id(candidate_id):
+    """Follow duplicate_of to the first candidate of a group."""
+    linked = Candidate.objects.filter(pk=candidate_id).values_list('duplicate_of_id', flat=True).first()
+    return linked or candidate_id
+
+
+def index_duplicate_keys(candidates):
+    """
+    Replace the DuplicateKey rows of candidates from their stored minhash,
+    email and phone.
+    """
+    rows = []
+    for candidate in candidates:
+        signature = signature_from_bytes(candidate.minhash) if candidate.minhash is not None else None
+        rows.extend(
+            DuplicateKey(candidate_id=candidate.pk, band=band, key=key)
+            for band, key in lookup_keys(signature, candidate.email, candidate.phone)
+        )
+    DuplicateKey.objects.filter(candidate_id__in=[c.pk for c in candidates]).delete()
+    DuplicateKey.objects.bulk_create(rows, batch_size=1000)
+
+
+def link_duplicate(candidate):
+    """
+    Compute the candidate's signature if missing, link it to an earlier
+    duplicate (unless already linked) and index its keys. Saves minhash and
+    duplicate_of.
+
+    Returns:
+        dict: find_duplicate() result, or None
+    """
+    if candidate.minhash is None and candidate.resume_text:
+        signature = minhash_signature(candidate.resume_text)
+        candidate.minhash = signature.tobytes() if signature is not None else None
+    match = None
+    if candidate.duplicate_of_id is None:
+        signature = signature_from_bytes(candidate.minhash) if candidate.minhash is not None else None
+        # Only earlier candidates: a group always points at its first member
+        match = find_duplicate(signature, candidate.email, candidate.phone, before_id=candidate.pk)
+        if match:
+            candidate.duplicate_of_id = original_id(match['candidate_id'])
+    Candidate.objects.filter(pk=candidate.pk).update(minhash=candidate.minhash, duplicate_of=candidate.duplicate_of_id)
+    index_duplicate_keys([candidate])
+    return match
+
+
+def resume_matches(candidate, original):
+    """
+    True if the candidates' resume signatures are at least
+    DUPLICATE_SIMILARITY_THRESHOLD similar, i.e. original's parse results
+    and AI analysis are reusable for candidate.
+    """
+    if candidate.minhash is None or original.minhash is None:
+        return False
+    similarity = estimated_similarity(signature_from_bytes(candidate.minhash), signature_from_bytes(original.minhash))
+    return similarity >= settings.DUPLICATE_SIMILARITY_THRESHOLD
+
+
+def reusable_parse(candidate_id):
+    """
+    Parsed fields of a candidate as parse_resume_text() would return them,
+    or None if it has not been parsed yet.
+    """
+    original = Candidate.objects.filter(pk=candidate_id).values(*PARSED_FIELDS).first()
+    if not original or not (original['skills'] or original['email'] or original['education']):
+        return None
+    return {
+        'email': original['email'],
+        'phone': original['phone'],
+        'skills': original['skills'],
+        'experience': original['experience_years'],
+        'education': original['education'],
+    }
@@ -0,0 +1,188 @@
+"""
+Local semantic pre-ranking.
+
+ai_semantic_match costs one LLM call per candidate, which does not scale to
+thousands of applicants. This module ranks a job's candidates on the CPU,
+offline, so that only the leading few are sent to the LLM:
+
+* every resume and job scoring text becomes a hashed term-frequency vector:
+  the canonical terms of extract_term_counts (synonyms folded, stop words
+  removed, multi-word skills kept whole) are hashed into EMBEDDING_DIM
+  signed buckets with a sublinear 1 + log(tf) weight;
+* vectors are quantized to int8 (EMBEDDING_SCALE steps per unit, 512
+  bytes) and stored on Candidate.embedding (next to the term sets, see
+  ats/resume_terms.py) and JobPost.embedding;
+* rank_candidates() loads a job's vectors into one matrix, weights every
+  bucket by its IDF over that candidate pool and takes the cosine
+  similarity to the job vector with a matrix-vector product and an
+  argpartition top-k.
+
+IDF is computed at ranking time from the pool being ranked, so stored
+vectors never go stale as the corpus grows.
+"""
+import hashlib
+import math
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from .advanced_scoring import PROFILE_VERSION, extract_term_counts
+from .metrics import span
+from .models import Candidate, JobPost
+from .vocabulary import get_vocabulary
+
+
+# Bump when hashing, weighting or EMBEDDING_DIM changes so stored vectors are
+# rebuilt (a PROFILE_VERSION bump rebuilds them with the term sets)
+EMBEDDING_VERSION = 1
+EMBEDDING_DIM = 512  # power of two
+EMBEDDING_DTYPE = np.int8
+# Quantization steps per unit of weight: a single occurrence is 16, weights
+# up to ~7.9 (about 1,000 occurrences) fit before clipping
+EMBEDDING_SCALE = 16
+
+# Rows weighted and normalized at a time, to bound float32 scratch memory
+_RANK_CHUNK_ROWS = 8192
+
+
+@lru_cache(maxsize=65536)
+def _feature(term):
+    """(bucket, sign) of a term. crc32 is stable across processes, unlike hash()."""
+    h = zlib.crc32(term.encode('utf-8'))
+    return h & (EMBEDDING_DIM - 1), (1.0 if h & 0x80000000 else -1.0)
+
+
+def term_vector(counts):
+    """Hashed sublinear term-frequency vector (float32) of {term: occurrences}."""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for term, count in counts.items():
+        bucket, sign = _feature(term)
+        vector[bucket] += sign * (1.0 + math.log(count))
+    return vector
+
+
+def embed_text(text):
+    return term_vector(extract_term_counts(text))
+
+
+def to_bytes(vector):
+    return np.clip(np.rint(vector * EMBEDDING_SCALE), -127, 127).astype(EMBEDDING_DTYPE).tobytes()
+
+
+def from_bytes(data):
+    # Left in quantized units: cosine similarity ignores the scale
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE).astype(np.float32)
+
+
+def compute_embedding(text):
+    """
+    Candidate field values for a resume text.
+
+    Returns:
+        dict: {'embedding': vector bytes (None without text),
+        'embedding_version': EMBEDDING_VERSION}
+    """
+    return {
+        'embedding': to_bytes(embed_text(text)) if text else None,
+        'embedding_version': EMBEDDING_VERSION,
+    }
+
+
+def embedding_source_hash(scoring_text):
+    key = f"{PROFILE_VERSION}:{EMBEDDING_VERSION}:{get_vocabulary().version}:{scoring_text}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def get_job_embedding(job):
+    """
+    Vector of a JobPost's scoring text, rebuilt and stored when the text
+    (or a version, including the vocabulary's) has changed since it was
+    computed.
+    """
+    source_hash = embedding_source_hash(job.get_scoring_text())
+    if job.embedding is None or job.embedding_hash != source_hash:
+        job.embedding = to_bytes(embed_text(job.get_scoring_text()))
+        job.embedding_hash = source_hash
+        JobPost.objects.filter(pk=job.pk).update(embedding=job.embedding, embedding_hash=source_hash)
+    return from_bytes(job.embedding)
+
+
+def cosine_top_k(matrix, query, k=None):
+    """
+    Rows of matrix most similar to query, by cosine similarity after
+    weighting every dimension with its IDF over the matrix rows.
+
+    Args:
+        matrix: (n, EMBEDDING_DIM) array of stored vectors
+        query: (EMBEDDING_DIM,) vector
+        k: Rows to return (None for all)
+
+    Returns:
+        (rows, similarities): int64 row numbers and float32 similarities,
+        most similar first
+    """
+    n = len(matrix)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = (np.log((1 + n) / (1 + document_frequency)) + 1).astype(np.float32)
+    query = query.astype(np.float32) * idf
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+
+    similarities = np.empty(n, dtype=np.float32)
+    for start in range(0, n, _RANK_CHUNK_ROWS):
+        block = matrix[start:start + _RANK_CHUNK_ROWS].astype(np.float32)
+        block *= idf
+        norms = np.sqrt(np.einsum('ij,ij->i', block, block))
+        similarities[start:start + len(block)] = (block @ query) / np.maximum(norms, 1e-12)
+
+    if k is None or k >= n:
+        rows = np.argsort(-similarities, kind='stable')
+    else:
+        # Sorted first so ties keep row (primary key) order, as in the full sort
+        rows = np.sort(np.argpartition(-similarities, k - 1)[:k])
+        rows = rows[np.argsort(-similarities[rows], kind='stable')]
+    return rows, similarities[rows]
+
+
+def load_embeddings(queryset):
+    """
+    (candidate ids, (n, EMBEDDING_DIM) int8 matrix) of the current
+    stored vectors in a Candidate queryset, in primary key order.
+    """
+    rows = list(
+        queryset
+        .filter(embedding_version=EMBEDDING_VERSION, embedding__isnull=False)
+        .order_by('pk')
+        .values_list('id', 'embedding')
+    )
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    # One join and one frombuffer: no per-row array objects
+    matrix = np.frombuffer(b''.join(row[1] for row in rows), dtype=EMBEDDING_DTYPE)
+    return ids, matrix.reshape(len(rows), EMBEDDING_DIM)
+
+
+def rank_candidates(job, top_k=None, queryset=None):
+    """
+    Rank a job's candidates by semantic similarity to its scoring text.
+
+    Candidates without a current vector get one first (refresh_resume_terms),
+    so older rows need no separate backfill.
+
+    Args:
+        job: JobPost
+        top_k: Candidates to return (None for all)
+        queryset: Candidates to rank (default: the job's candidates)
+
+    Returns:
+        list of (candidate_id, cosine similarity), most similar first
+    """
+    from .resume_terms import refresh_resume_terms
+
+    queryset = Candidate.objects.filter(job_id=job.pk) if queryset is None else queryset
+    refresh_resume_terms(queryset)
+    with span('semantic_rank', job_id=job.pk):
+        ids, matrix = load_embeddings(queryset)
+        rows, similarities = cosine_top_k(matrix, get_job_embedding(job), top_k)
+    return [(int(ids[row]), round(float(similarity), 4)) for row, similarity in zip(rows, similarities)]
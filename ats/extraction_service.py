@@ -0,0 +1,177 @@
+"""
+Process-pool PDF extraction service.
+
+pdfminer is pure Python and CPU-bound, so extraction is fanned out over a
+long-lived ProcessPoolExecutor sized to the available cores instead of
+running on the web or Celery worker's single core (or starting a fresh
+interpreter per file):
+
+* workers are started from a forkserver, import only ats.pdf_extract and
+  are recycled after PDF_EXTRACT_POOL_MAX_TASKS_PER_CHILD files to cap
+  memory growth;
+* each worker's address space is capped (PDF_EXTRACT_MEMORY_MB) and each
+  file gets PDF_EXTRACT_TIMEOUT seconds, enforced inside the worker;
+* at most one file per worker is submitted at a time (callers block for a
+  free slot), so nothing queues inside the pool and a file's time limit
+  only counts time it spends running;
+* files on disk are passed by path; in-memory PDFs go through a
+  SharedMemory block rather than being pickled.
+
+The pool is off by default (PDF_EXTRACT_POOL): a pool per web process would
+oversubscribe the cores. Enable it where extraction actually runs, e.g. in
+the environment of a Celery worker started with ``--pool=threads`` or
+``--pool=solo``. Daemonic processes (Celery prefork workers) can't start a
+pool; there parsers._extract_pdf_text falls back to one sandboxed
+subprocess per file.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from django.conf import settings
+
+from .pdf_extract import init_pool_worker, pool_extract
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def can_use_process_pool():
+    """False inside daemonic processes, which may not have children."""
+    if multiprocessing.current_process().daemon:
+        return False
+    try:
+        import billiard  # Celery's multiprocessing fork
+    except ImportError:
+        return True
+    return not billiard.current_process().daemon
+
+
+def _failure(error):
+    return {'text': '', 'pages': 0, 'truncated': False, 'elapsed': 0.0, 'error': error}
+
+
+class ExtractionService:
+    """
+    Bounded PDF extraction on a process pool, with sync and async APIs.
+
+    Args:
+        max_workers: Pool size (default: PDF_EXTRACT_POOL_WORKERS or the available cores)
+        max_tasks_per_child: Files a worker handles before it is replaced
+    """
+
+    def __init__(self, max_workers=None, max_tasks_per_child=None):
+        self.max_workers = max_workers or settings.PDF_EXTRACT_POOL_WORKERS or available_cores()
+        self.max_tasks_per_child = max_tasks_per_child or settings.PDF_EXTRACT_POOL_MAX_TASKS_PER_CHILD
+        self.timeout = settings.PDF_EXTRACT_TIMEOUT
+        self._executor = None
+        self._lock = threading.Lock()
+        # One slot per worker: a submitted file starts running straight away
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=init_pool_worker,
+                    initargs=(settings.PDF_EXTRACT_MEMORY_MB,),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _restart(self):
+        """Replace a broken pool; the executor has already stopped its workers."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, source):
+        """Submit once a worker is free; the slot is released when the future is done."""
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(
+                pool_extract, source, settings.PDF_EXTRACT_MAX_CHARS, settings.PDF_EXTRACT_MAX_PAGES, self.timeout
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_path(self, path):
+        """Queue a PDF on disk; returns a Future of the extraction result dict."""
+        return self._submit(('path', os.fspath(path)))
+
+    def submit_bytes(self, data):
+        """Queue in-memory PDF bytes through shared memory; returns a Future."""
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        block.buf[:len(data)] = data
+        try:
+            future = self._submit(('shm', block.name, len(data)))
+        except Exception:
+            block.close()
+            block.unlink()
+            raise
+
+        def release(_):
+            block.close()
+            block.unlink()
+
+        future.add_done_callback(release)
+        return future
+
+    def wait(self, future):
+        """
+        Result of a submitted extraction. Workers enforce the time limit
+        themselves; if one overruns it anyway (e.g. stuck in C code) the
+        file is reported as timed out and the worker is left to finish.
+        Killing it would break the whole pool, and every other file on it.
+        """
+        try:
+            return future.result(timeout=self.timeout + 5)
+        except FutureTimeoutError:
+            return _failure(f'Timed out after {self.timeout}s')
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); the next submit gets a fresh pool
+            self._restart()
+            return _failure(f'Extraction worker died: {e}')
+
+    def extract_path(self, path):
+        return self.wait(self.submit_path(path))
+
+    def extract_bytes(self, data):
+        return self.wait(self.submit_bytes(data))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_extraction_service():
+    """The process-wide ExtractionService (created on first use)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExtractionService()
+            atexit.register(_service.shutdown)
+        return _service
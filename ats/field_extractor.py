@@ -0,0 +1,161 @@
+"""
+Deterministic resume field extraction.
+
+Pulls email, phone, skills, years of experience and education out of resume
+text with regexes and the live skill vocabulary (ats/vocabulary.py) in a
+few milliseconds. Every field comes with a
+confidence between 0 and 1; parse_resume_text() (ats/parsers.py) only asks
+the LLM for fields below LOCAL_PARSE_MIN_CONFIDENCE.
+"""
+import re
+from datetime import date
+
+from .vocabulary import get_vocabulary
+
+
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}')
+PHONE_RE = re.compile(r'(?<![\w+])\+?\(?\d[\d\s().\-]{7,18}\d(?!\w)')
+
+# "5 years of experience", "7+ yrs professional experience", "Experience: 3 years"
+EXPERIENCE_RE = re.compile(
+    r'(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b(?:\s+of)?(?:\s+[a-z/\-]+){0,3}?\s+experience'
+    r'|experience\s*(?:of|:)?\s*(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b',
+    re.IGNORECASE,
+)
+# "2016 - 2020", "Jan 2018 – Present"
+DATE_RANGE_RE = re.compile(
+    r'\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*(?:[A-Za-z]{3,9}\.?\s+)?((?:19|20)\d{2}|present|current|now)\b',
+    re.IGNORECASE,
+)
+
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|doctor(?:ate)?|ph\.?\s?d|mba|associate'?s? degree|diploma|b\.?\s?tech|m\.?\s?tech)\b"
+    r"|\b(?:B\.S\.?|B\.Sc\.?|BSc|B\.A\.|M\.S\.?|M\.Sc\.?|MSc|M\.A\.|B\.E\.|M\.E\.)(?=\W|$)",
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r'\b(?:university|college|institute|school of|polytechnic|academy)\b', re.IGNORECASE)
+
+# Vocabulary terms that are also everyday words; only trusted inside skill lists
+AMBIGUOUS_SKILLS = {
+    'go', 'ai', 'ml', 'ci', 'cd', 'db', 'ts', 'py', 'rest', 'test', 'testing', 'unit', 'integration',
+    'express', 'swift', 'rust', 'amazon', 'windows', 'database', 'api', 'apis', 'agile', 'scrum',
+}
+SKILL_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.\-]*')
+
+FIELDS = ['email', 'phone', 'skills', 'experience', 'education']
+
+
+def extract_email(text):
+    emails = list(dict.fromkeys(match.lower() for match in EMAIL_RE.findall(text)))
+    if not emails:
+        return None, 0.0
+    return emails[0], 1.0 if len(emails) == 1 else 0.9
+
+
+def extract_phone(text):
+    phones = []
+    for match in PHONE_RE.findall(text):
+        digits = re.sub(r'\D', '', match)
+        if 10 <= len(digits) <= 15 and not DATE_RANGE_RE.search(match):
+            phones.append(match.strip())
+    if not phones:
+        return None, 0.0
+    return phones[0], 0.95 if len(set(phones)) == 1 else 0.8
+
+
+def _is_list_line(line):
+    """Lines like "Python, Django, Go" or "AWS | Docker | K8s"."""
+    return len(re.split(r'[,|•·;/]', line)) >= 3
+
+
+def extract_skills(text):
+    vocabulary = get_vocabulary()
+    skill_names = vocabulary.skill_names
+    skills = []
+    for line in text.lower().splitlines():
+        words = [word.rstrip('.') for word in SKILL_TOKEN_RE.findall(line)]
+        trusted = _is_list_line(line) or 'skills' in line
+        i = 0
+        while i < len(words):
+            # Longest vocabulary phrase starting here ("google cloud", "machine learning")
+            for size in range(min(vocabulary.max_phrase_words, len(words) - i), 0, -1):
+                phrase = ' '.join(words[i:i + size])
+                if phrase in skill_names and (trusted or phrase not in AMBIGUOUS_SKILLS):
+                    skills.append(skill_names[phrase])
+                    i += size
+                    break
+            else:
+                i += 1
+    skills = list(dict.fromkeys(skills))[:50]
+    if len(skills) >= 5:
+        confidence = 0.9
+    elif len(skills) >= 3:
+        confidence = 0.8
+    else:
+        confidence = 0.5 if skills else 0.0
+    return skills, confidence
+
+
+def extract_experience(text):
+    stated = [float(a or b) for a, b in EXPERIENCE_RE.findall(text)]
+    if stated:
+        return max(stated), 0.9
+
+    # Otherwise add up employment date ranges, skipping education lines
+    this_year = date.today().year
+    ranges = []
+    for line in text.splitlines():
+        if DEGREE_RE.search(line) or INSTITUTION_RE.search(line):
+            continue
+        for start, end in DATE_RANGE_RE.findall(line):
+            end = this_year if not end[0].isdigit() else int(end)
+            if int(start) <= end <= this_year:
+                ranges.append((int(start), end))
+    if not ranges:
+        return 0, 0.0
+    years = 0
+    covered_until = None
+    for start, end in sorted(ranges):
+        if covered_until is not None:
+            start = max(start, covered_until)
+        if end > start:
+            years += end - start
+        covered_until = max(end, covered_until or end)
+    return float(years), 0.8 if len(ranges) >= 2 else 0.6
+
+
+def extract_education(text):
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for i, line in enumerate(lines):
+        if not DEGREE_RE.search(line):
+            continue
+        education = line
+        if not INSTITUTION_RE.search(line) and i + 1 < len(lines) and INSTITUTION_RE.search(lines[i + 1]):
+            education = f'{line}, {lines[i + 1]}'
+        return education[:255], 0.9 if INSTITUTION_RE.search(education) else 0.8
+    for line in lines:
+        if INSTITUTION_RE.search(line):
+            return line[:255], 0.6
+    return '', 0.0
+
+
+def extract_resume_fields(text):
+    """
+    Extract the LLM parse fields locally.
+
+    Args:
+        text: Resume text
+
+    Returns:
+        tuple: (fields, confidence), fields in the parse_resume_with_openai
+        format and confidence as {field: 0.0-1.0}
+    """
+    text = text or ''
+    fields = {}
+    confidence = {}
+    fields['email'], confidence['email'] = extract_email(text)
+    fields['phone'], confidence['phone'] = extract_phone(text)
+    fields['skills'], confidence['skills'] = extract_skills(text)
+    fields['experience'], confidence['experience'] = extract_experience(text)
+    fields['education'], confidence['education'] = extract_education(text)
+    return fields, confidence
@@ -17,4 +17,25 @@ class CandidateUploadForm(forms.ModelForm):
         fields = ['job', 'name', 'email', 'phone', 'resume_file']
         widgets = {
             'job': forms.Select(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput(attrs={'class': 'form-control', 'accept': '.pdf,.zip'}))
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)]
+
+
+class BulkUploadForm(forms.Form):
+    job = forms.ModelChoiceField(queryset=JobPost.objects.all(), widget=forms.Select(attrs={'class': 'form-control'}))
+    resume_files = MultipleFileField(help_text='PDF resumes or ZIP archives of PDFs')
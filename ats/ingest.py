@@ -0,0 +1,286 @@
+"""
+Bulk resume ingestion.
+
+Resumes arrive as a directory, a ZIP archive or a multi-file upload. They are
+streamed into storage first, then text extraction and the LLM parse run
+concurrently on a bounded thread pool, and the resulting Candidates are
+written with ``bulk_create`` in batches as they finish, so a failure late in
+a large upload only loses the batch in progress. Scoring of each batch is
+handed to the Celery scoring pipeline.
+
+With the in-memory broker (CELERY_TASK_ALWAYS_EAGER) all of this runs in
+the calling process; bulk uploads through the web UI need a real broker
+(see INGEST_EAGER_MAX_FILES).
+
+Resumes that duplicate an earlier candidate (ats/duplicates.py) are linked
+to it and reuse its parse results instead of calling the LLM. Files within
+one batch are parsed concurrently and are not compared with each other.
+"""
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from .duplicates import find_duplicate, index_duplicate_keys, minhash_signature, original_id, reusable_parse
+from .models import Candidate
+from .parsers import extract_text_from_file, extract_text_from_upload, extraction_cache_stats, parse_resume_text
+from .resume_terms import compute_resume_terms
+from .search import index_candidates
+from .stats import bump_stat
+
+
+RESUME_EXTENSIONS = ('.pdf',)
+UPLOAD_DIR = 'resumes/'
+
+
+def is_resume_filename(filename):
+    basename = os.path.basename(filename)
+    return not basename.startswith('.') and basename.lower().endswith(RESUME_EXTENSIONS)
+
+
+def name_from_filename(filename):
+    """
+    Guess a candidate name from a resume filename, e.g. "jane_doe-cv.pdf" -> "Jane Doe Cv".
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    name = " ".join(stem.replace('_', ' ').replace('-', ' ').split())
+    return name.title() or 'Unknown Candidate'
+
+
+def check_zip_sizes(members):
+    """
+    Refuse archives whose resumes would expand past INGEST_ZIP_MAX_MEMBER_BYTES
+    each or INGEST_ZIP_MAX_TOTAL_BYTES together (zip bombs). zipfile never
+    returns more than a member's declared file_size, so the declared sizes
+    bound what is written to storage.
+
+    Raises:
+        ValueError: a limit is exceeded
+    """
+    total = 0
+    for info in members:
+        if info.file_size > settings.INGEST_ZIP_MAX_MEMBER_BYTES:
+            raise ValueError(f'{info.filename} is {info.file_size} bytes uncompressed; '
+                             f'the limit is {settings.INGEST_ZIP_MAX_MEMBER_BYTES}')
+        total += info.file_size
+    if total > settings.INGEST_ZIP_MAX_TOTAL_BYTES:
+        raise ValueError(f'ZIP archive resumes are {total} bytes uncompressed; '
+                         f'the limit is {settings.INGEST_ZIP_MAX_TOTAL_BYTES}')
+
+
+def iter_zip_resumes(zip_file):
+    """
+    Yield (filename, file_obj) for every resume inside an open ZIP archive.
+    Members are streamed, never fully read into memory; sizes are checked
+    (check_zip_sizes) before the first one is opened.
+
+    Raises:
+        ValueError: not a ZIP archive, or too large once uncompressed
+    """
+    try:
+        with zipfile.ZipFile(zip_file) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and is_resume_filename(info.filename)
+            ]
+            check_zip_sizes(members)
+            for info in members:
+                with archive.open(info) as member:
+                    yield os.path.basename(info.filename), member
+    except zipfile.BadZipFile as e:
+        raise ValueError(f'Invalid ZIP archive: {e}') from e
+
+
+def iter_resume_sources(path):
+    """
+    Yield (filename, file_obj) for every resume in a directory or ZIP archive.
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for filename in sorted(files):
+                if is_resume_filename(filename):
+                    with open(os.path.join(root, filename), 'rb') as fh:
+                        yield filename, fh
+    elif zipfile.is_zipfile(path):
+        with open(path, 'rb') as fh:
+            yield from iter_zip_resumes(fh)
+    else:
+        raise ValueError(f'{path} is neither a directory nor a ZIP archive')
+
+
+def iter_uploaded_resumes(uploaded_files):
+    """
+    Yield (filename, file_obj) for uploaded files, expanding any ZIP archives.
+    """
+    for upload in uploaded_files:
+        if upload.name.lower().endswith('.zip'):
+            yield from iter_zip_resumes(upload)
+        elif is_resume_filename(upload.name):
+            yield upload.name, upload
+
+
+def stage_resume_files(sources):
+    """
+    Stream resumes into default storage.
+
+    Args:
+        sources: Iterable of (filename, file_obj) pairs
+
+    Returns:
+        list: Storage names of the saved files, in input order
+
+    Files already saved are deleted again if a source fails (e.g. a ZIP
+    archive over the size limits).
+    """
+    stored = []
+    try:
+        for filename, file_obj in sources:
+            stored.append(default_storage.save(UPLOAD_DIR + filename, File(file_obj, name=filename)))
+    except BaseException:
+        for name in stored:
+            default_storage.delete(name)
+        raise
+    return stored
+
+
+def extract_stored_text(stored_name):
+    """
+    Cached text of a stored resume. Local files are passed to the
+    extraction pool by path; other storages are read into memory.
+    """
+    try:
+        path = default_storage.path(stored_name)
+    except NotImplementedError:
+        with default_storage.open(stored_name, 'rb') as fh:
+            return extract_text_from_upload(fh, stored_name)
+    return extract_text_from_file(path)
+
+
+def _parse_stored_resume(stored_name):
+    """Extract and parse one stored resume. Runs on a worker thread."""
+    try:
+        text = extract_stored_text(stored_name)
+        if not text:
+            raise ValueError('Failed to extract text from resume')
+        signature = minhash_signature(text)
+        match = find_duplicate(signature)
+        parsed = reusable_parse(original_id(match['candidate_id'])) if match else None
+        if parsed is None:
+            parsed = parse_resume_text(text)
+            if match is None:
+                match = find_duplicate(email=parsed.get('email'), phone=parsed.get('phone'))
+        parsed['text'] = text
+        parsed['minhash'] = signature.tobytes() if signature is not None else None
+        parsed['duplicate_of'] = original_id(match['candidate_id']) if match else None
+        return parsed
+    finally:
+        # The extraction cache queries the DB from this worker thread
+        connection.close()
+
+
+def _build_candidate(job, stored_name, parsed):
+    return Candidate(
+        job=job,
+        name=name_from_filename(stored_name),
+        email=parsed.get('email') or None,
+        phone=(parsed.get('phone') or '')[:50],
+        skills=parsed.get('skills') or [],
+        experience_years=parsed.get('experience') or 0,
+        education=parsed.get('education') or '',
+        resume_file=stored_name,
+        resume_text=parsed['text'],
+        processing_status='queued',
+        minhash=parsed.get('minhash'),
+        duplicate_of_id=parsed.get('duplicate_of'),
+        **compute_resume_terms(parsed['text']),
+    )
+
+
+def _save_candidates(candidates):
+    """Create a batch of Candidates, index them and queue their scoring."""
+    from .tasks import enqueue_scoring_pipeline
+
+    with transaction.atomic():
+        created = Candidate.objects.bulk_create(candidates)
+        candidate_ids = [c.pk for c in created]
+        # bulk_create skips post_save: index and count the new rows here
+        index_candidates(candidate_ids)
+        index_duplicate_keys(created)
+        bump_stat('total_candidates', len(candidate_ids))
+        for candidate_id in candidate_ids:
+            enqueue_scoring_pipeline(candidate_id)
+    return created
+
+
+def ingest_stored_resumes(job, stored_names, max_workers=None, batch_size=500):
+    """
+    Parse stored resumes concurrently and create their Candidates in bulk,
+    batch_size rows at a time as parses finish.
+
+    Args:
+        job: JobPost the resumes are applying to
+        stored_names: Storage names from stage_resume_files
+        max_workers: Size of the parse thread pool (default INGEST_MAX_WORKERS)
+        batch_size: Rows per bulk_create batch
+
+    Returns:
+        dict: {
+            'total': int, 'created': int, 'duplicates': int, 'failed': [(filename, error), ...],
+            'elapsed': seconds, 'files_per_sec': float, 'candidate_ids': list,
+            'extraction_cache': extraction_cache_stats()
+        }
+    """
+    max_workers = max_workers or settings.INGEST_MAX_WORKERS
+    started = time.perf_counter()
+    pending = []
+    created = []
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_parse_stored_resume, name): name for name in stored_names}
+        for future in as_completed(futures):
+            stored_name = futures[future]
+            try:
+                pending.append(_build_candidate(job, stored_name, future.result()))
+            except Exception as e:
+                failed.append((os.path.basename(stored_name), f'{type(e).__name__}: {e}'))
+                default_storage.delete(stored_name)
+            if len(pending) >= batch_size:
+                created.extend(_save_candidates(pending))
+                pending = []
+    if pending:
+        created.extend(_save_candidates(pending))
+    candidate_ids = [c.pk for c in created]
+
+    elapsed = time.perf_counter() - started
+    return {
+        'total': len(stored_names),
+        'created': len(candidate_ids),
+        'duplicates': sum(1 for c in created if c.duplicate_of_id),
+        'failed': sorted(failed),
+        'elapsed': round(elapsed, 3),
+        'files_per_sec': round(len(stored_names) / elapsed, 2) if elapsed > 0 else 0.0,
+        'candidate_ids': candidate_ids,
+        'extraction_cache': extraction_cache_stats(),
+    }
+
+
+def format_ingest_report(report):
+    """Human-readable summary lines for an ingest report."""
+    lines = [
+        f"📦 Ingested {report['created']}/{report['total']} resumes in {report['elapsed']}s "
+        f"({report['files_per_sec']} files/sec)"
+    ]
+    if report.get('duplicates'):
+        lines.append(f"♻️ {report['duplicates']} duplicate(s) of earlier candidates linked")
+    cache = report.get('extraction_cache')
+    if cache:
+        lines.append(f"🗂️ Extraction cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']} entries")
+    for filename, error in report['failed']:
+        lines.append(f"❌ {filename}: {error}")
+    return lines
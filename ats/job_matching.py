@@ -0,0 +1,219 @@
+"""
+Reverse matching: which open positions does a resume fit?
+
+Instead of one fuzzy_score_resume() call per JobPost, the compiled
+profiles of every open job are merged into a JobIndex:
+
+* an inverted index from normalized term to the jobs that weight it
+  (row numbers and weights as NumPy arrays);
+* a character-count index (rescoring.CharCountIndex) over the combined job
+  vocabulary for fuzzy matching.
+
+A resume is scored against all jobs in one pass: each vocabulary term gets
+a credit (1 for an exact match, otherwise its best fuzzy similarity, as in
+fuzzy_score_resume) and the credits are added into a per-job score vector
+through the postings. Credits and sums are integer hundredths
+(similarity_credit, keyword_percentage), so scores equal
+fuzzy_score_resume's keyword score.
+
+The index is rebuilt in-process when the open jobs' count or latest
+JobPost.updated_at (one aggregate query), or the vocabulary version,
+changes. Only the top few jobs are sent to the LLM. The candidate page's
+matches are cached (cached_match_jobs) under the resume terms and that
+same signature, so they are recomputed only when either changes.
+"""
+import hashlib
+import threading
+from difflib import SequenceMatcher
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .advanced_scoring import similarity_credit
+from .job_profiles import get_job_profile
+from .models import JobPost
+from .rescoring import CharCountIndex
+from .resume_terms import candidate_term_sets
+from .vocabulary import get_vocabulary
+
+
+class JobIndex:
+    """
+    Inverted index over the compiled profiles of many jobs.
+
+    Args:
+        jobs: JobPosts, in the order of the score vector
+        profiles: Their compiled profiles (see compile_job_profile)
+        key: Signature of the jobs and vocabulary the index was built from
+    """
+
+    def __init__(self, jobs, profiles, key=None):
+        self.key = key
+        self.job_ids = [job.pk for job in jobs]
+        self.titles = [job.title for job in jobs]
+        self.profiles = profiles
+        self.total_weights = np.array([profile['total_weight'] for profile in profiles], dtype=np.int64)
+
+        postings = {}
+        for row, profile in enumerate(profiles):
+            for term, weight in profile['weights'].items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(row)
+                postings[term][1].append(weight)
+        self.postings = {
+            term: (np.array(rows, dtype=np.int32), np.array(weights, dtype=np.int64))
+            for term, (rows, weights) in postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+        self._fuzzy_index = None
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @property
+    def fuzzy_index(self):
+        if self._fuzzy_index is None:
+            self._fuzzy_index = CharCountIndex(self.vocabulary)
+        return self._fuzzy_index
+
+    def term_credits(self, resume_terms, fuzzy_threshold=0.85):
+        """
+        {vocabulary term: credit in hundredths} for every job term the resume
+        covers: 100 for exact matches, otherwise the best similarity (rounded
+        to two places, as in find_fuzzy_matches) of any resume term at or
+        above the threshold.
+        """
+        credits = {term: 100 for term in resume_terms if term in self.postings}
+        if fuzzy_threshold is None or not self.vocabulary:
+            return credits
+        for resume_term in resume_terms:
+            for term in self.fuzzy_index.candidates(resume_term, fuzzy_threshold):
+                if term in resume_terms:
+                    continue  # exact matches get full credit
+                # ratio() is not symmetric: compare as find_fuzzy_matches does (job term first)
+                similarity = SequenceMatcher(None, term, resume_term).ratio()
+                if similarity >= fuzzy_threshold and similarity_credit(similarity) > credits.get(term, 0):
+                    credits[term] = similarity_credit(similarity)
+        return credits
+
+    def score(self, resume_terms, fuzzy_threshold=0.85):
+        """
+        Keyword scores (0-100 ints) of the resume against every job, in
+        job_ids order. Integer arithmetic, so the result does not depend on
+        summation order.
+        """
+        matched_weight = np.zeros(len(self.job_ids), dtype=np.int64)  # in hundredths
+        for term, credit in self.term_credits(resume_terms, fuzzy_threshold).items():
+            rows, weights = self.postings[term]
+            matched_weight[rows] += weights * credit
+        return matched_weight // np.maximum(self.total_weights, 1)
+
+    def top_k(self, resume_terms, k=10, fuzzy_threshold=0.85, exclude_job_ids=()):
+        """
+        The k best matching jobs.
+
+        Returns:
+            list of dicts: job_id, title, keyword_score, matched_terms
+            (exact matches, sorted), highest score first
+        """
+        resume_terms = set(resume_terms)
+        scores = self.score(resume_terms, fuzzy_threshold)
+        excluded = set(exclude_job_ids)
+        # Stable sort: equal scores keep job order
+        order = np.argsort(-scores, kind='stable')
+        results = []
+        for row in order:
+            if len(results) >= k:
+                break
+            if self.job_ids[row] in excluded:
+                continue
+            results.append({
+                'job_id': self.job_ids[row],
+                'title': self.titles[row],
+                'keyword_score': int(scores[row]),
+                'matched_terms': sorted(resume_terms.intersection(self.profiles[row]['weights'])),
+            })
+        return results
+
+
+_index = None
+_index_key = None
+_index_lock = threading.Lock()
+
+
+def get_job_index():
+    """
+    JobIndex over the open jobs, rebuilt when a job is opened, closed,
+    added, removed or edited (saves bump JobPost.updated_at; bulk
+    QuerySet.update() calls that change jobs must set it too), or a new
+    vocabulary version is published.
+    """
+    global _index, _index_key
+    open_jobs = JobPost.objects.filter(is_open=True)
+    signature = open_jobs.aggregate(count=Count('id'), updated_at=Max('updated_at'))
+    key = (signature['count'], signature['updated_at'], get_vocabulary().version)
+    with _index_lock:
+        if _index is not None and _index_key == key:
+            return _index
+    jobs = list(open_jobs.only('id', 'title', 'description', 'required_skills').order_by('pk'))
+    index = JobIndex(jobs, [get_job_profile(job) for job in jobs], key)
+    with _index_lock:
+        _index, _index_key = index, key
+    return index
+
+
+def match_jobs(resume_terms, top_k=10, fuzzy_threshold=0.85, exclude_job_ids=()):
+    """Top-k open jobs for a set of normalized resume terms (keyword scores only)."""
+    return get_job_index().top_k(resume_terms, top_k, fuzzy_threshold, exclude_job_ids)
+
+
+def cached_match_jobs(resume_terms, top_k=10, exclude_job_ids=()):
+    """
+    match_jobs through the Django cache, keyed by the resume terms and the
+    job index signature: a new vocabulary version, a job change or new
+    resume terms all give a new key, so entries never need invalidating.
+    """
+    index = get_job_index()
+    source = f"{index.key}:{top_k}:{sorted(exclude_job_ids)}:{' '.join(sorted(resume_terms))}"
+    key = f"ats:job_matches:{hashlib.sha256(source.encode('utf-8')).hexdigest()}"
+    return cache.get_or_set(key, lambda: index.top_k(resume_terms, top_k, exclude_job_ids=exclude_job_ids),
+                            settings.JOB_MATCHES_TTL)
+
+
+def match_candidate_to_jobs(candidate, top_k=10, ai_top_n=3, exclude_own_job=False):
+    """
+    Rank every open job for a candidate by keyword score, then run the AI
+    semantic match on the ai_top_n best only (concurrently, through
+    ats/ai_client.py).
+
+    Args:
+        candidate: Candidate with resume text
+        top_k: Jobs to return
+        ai_top_n: Leading jobs to analyse with the LLM (0 to skip)
+        exclude_own_job: Leave out the job the candidate applied to
+
+    Returns:
+        list of dicts as JobIndex.top_k; the first ai_top_n also carry
+        'ai_score', 'ai_grade' and 'ai_analysis'
+    """
+    resume_terms, _ = candidate_term_sets(candidate)
+    exclude = [candidate.job_id] if exclude_own_job and candidate.job_id else []
+    matches = match_jobs(resume_terms, top_k, exclude_job_ids=exclude)
+
+    shortlist = matches[:ai_top_n]
+    if shortlist and settings.OPENROUTER_API_KEY:
+        from .ai_client import semantic_match_batch
+
+        jobs = JobPost.objects.in_bulk([match['job_id'] for match in shortlist])
+        analyses = semantic_match_batch(
+            (candidate.resume_text, jobs[match['job_id']].get_scoring_text(), candidate.name)
+            for match in shortlist
+        )
+        for match, ai_analysis in zip(shortlist, analyses):
+            match['ai_analysis'] = ai_analysis
+            if 'error' not in ai_analysis:
+                match['ai_score'] = ai_analysis.get('overall_score', 0)
+                match['ai_grade'] = ai_analysis.get('grade', '')
+    return matches
@@ -0,0 +1,61 @@
+"""
+Compiled job scoring profiles.
+
+The job side of keyword scoring (tokenize, stop-word filter, synonym
+normalize, weight) only depends on the JobPost, so it is compiled once,
+stored in JobProfile and kept in a small in-process cache. A profile is
+rebuilt whenever the hash of the job's scoring text (or PROFILE_VERSION,
+or the skill vocabulary version) changes, so editing a job or publishing
+a vocabulary invalidates it automatically.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .advanced_scoring import PROFILE_VERSION, compile_job_profile
+from .models import JobProfile
+from .vocabulary import get_vocabulary
+
+
+# job_id -> (source_hash, profile), most recently used last
+_MAX_CACHED_PROFILES = 256
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def profile_source_hash(scoring_text, vocab_version=None):
+    vocab_version = get_vocabulary().version if vocab_version is None else vocab_version
+    return hashlib.sha256(f"{PROFILE_VERSION}:{vocab_version}:{scoring_text}".encode('utf-8')).hexdigest()
+
+
+def get_job_profile(job):
+    """
+    Return the compiled scoring profile for a JobPost, building and storing
+    it if missing or stale.
+    """
+    scoring_text = job.get_scoring_text()
+    vocabulary = get_vocabulary()
+    source_hash = profile_source_hash(scoring_text, vocabulary.version)
+
+    with _lock:
+        cached = _cache.get(job.pk)
+        if cached is not None and cached[0] == source_hash:
+            _cache.move_to_end(job.pk)
+            return cached[1]
+
+    stored = JobProfile.objects.filter(job_id=job.pk).first()
+    if stored is not None and stored.source_hash == source_hash:
+        profile = stored.data
+    else:
+        profile = compile_job_profile(scoring_text, vocabulary)
+        JobProfile.objects.update_or_create(
+            job_id=job.pk,
+            defaults={'source_hash': source_hash, 'data': profile},
+        )
+
+    with _lock:
+        _cache[job.pk] = (source_hash, profile)
+        _cache.move_to_end(job.pk)
+        while len(_cache) > _MAX_CACHED_PROFILES:
+            _cache.popitem(last=False)
+    return profile
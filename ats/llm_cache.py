@@ -0,0 +1,119 @@
+"""
+Persistent LLM response cache.
+
+Completions are stored in the LLMResponse table under a fingerprint of the
+model, the full prompt and the sampling parameters, so re-scoring a job or
+re-uploading a resume never calls OpenRouter twice for the same request.
+Entries expire after LLM_CACHE_TTL seconds and the least recently used are
+evicted past LLM_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import json
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LLMResponse
+
+
+# Per-process cache counters (see llm_cache_stats)
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def _count(outcome):
+    with _lock:
+        _counters[outcome] += 1
+
+
+def llm_cache_stats():
+    """
+    LLM cache hit/miss counters for this process, plus the stored entry
+    count (recounted at most every METRICS_COUNT_TTL seconds).
+    """
+    from .metrics import cached_count
+
+    with _lock:
+        stats = dict(_counters)
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / total, 3) if total else 0.0
+    stats['entries'] = cached_count('llm_cache_entries', LLMResponse.objects.all())
+    return stats
+
+
+def prompt_fingerprint(model, messages, **params):
+    """
+    Stable SHA-256 fingerprint of a chat completion request.
+
+    Args:
+        model: Model identifier
+        messages: Chat messages sent to the model
+        **params: Sampling parameters that change the output (temperature, max_tokens, ...)
+
+    Returns:
+        str: 64-character hex digest
+    """
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'params': params},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cached_response(fingerprint):
+    """
+    Return the cached completion text for a fingerprint, or None on a miss.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    now = timezone.now()
+    entry = (
+        LLMResponse.objects
+        .filter(fingerprint=fingerprint, expires_at__gt=now)
+        .only('pk', 'response')
+        .first()
+    )
+    if entry is None:
+        _count('misses')
+        return None
+    _count('hits')
+    LLMResponse.objects.filter(pk=entry.pk).update(last_used_at=now, hits=F('hits') + 1)
+    return entry.response
+
+
+def store_response(fingerprint, model, response, ttl=None):
+    """
+    Store a successful completion. Expired and least recently used entries
+    are evicted on the way.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return
+    now = timezone.now()
+    ttl = settings.LLM_CACHE_TTL if ttl is None else ttl
+    try:
+        with transaction.atomic():
+            LLMResponse.objects.update_or_create(
+                fingerprint=fingerprint,
+                defaults={
+                    'model': model,
+                    'response': response,
+                    'expires_at': now + timedelta(seconds=ttl),
+                    'last_used_at': now,
+                },
+            )
+    except IntegrityError:
+        return  # Stored concurrently by another worker
+    _evict(now)
+
+
+def _evict(now):
+    LLMResponse.objects.filter(expires_at__lte=now).delete()
+    overflow = LLMResponse.objects.count() - settings.LLM_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale = LLMResponse.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        LLMResponse.objects.filter(pk__in=list(stale)).delete()
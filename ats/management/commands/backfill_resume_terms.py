@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.models import Candidate, JobPost
+from ats.resume_terms import refresh_resume_terms
+
+
+class Command(BaseCommand):
+    help = 'Compute the stored scoring term sets and semantic vectors of candidates that are missing them or are out of date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Only candidates of this job')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Candidates loaded and written per batch')
+
+    def handle(self, *args, **options):
+        queryset = Candidate.objects.all()
+        if options['job'] is not None:
+            if not JobPost.objects.filter(pk=options['job']).exists():
+                raise CommandError(f"Job {options['job']} does not exist")
+            queryset = queryset.filter(job_id=options['job'])
+        updated = refresh_resume_terms(queryset, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"🔤 Built term sets for {updated} candidate(s)"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.benchmarks import benchmark_fuzzy_matcher
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the indexed fuzzy matcher against the naive SequenceMatcher loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000, 3000],
+                            help='Resume sizes in words')
+        parser.add_argument('--job-words', type=int, default=400)
+        parser.add_argument('--threshold', type=float, default=0.85)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = benchmark_fuzzy_matcher(
+            resume_sizes=options['sizes'],
+            job_words=options['job_words'],
+            threshold=options['threshold'],
+            repeat=options['repeat'],
+        )
+        self.stdout.write(f"{'words':>8} {'tokens':>8} {'job':>6} {'naive ms':>10} {'indexed ms':>11} {'speedup':>8}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['resume_words']:>8} {row['resume_tokens']:>8} {row['job_tokens']:>6} "
+                f"{row['naive_ms']:>10} {row['indexed_ms']:>11} {row['speedup']:>7}x"
+            )
+        if not all(row['identical'] for row in rows):
+            raise CommandError('Indexed fuzzy matcher results differ from the naive matcher')
+        self.stdout.write(self.style.SUCCESS('Results identical to the naive matcher'))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.benchmarks import (
+    BASELINE_PATH, SCORERS, benchmark_scorers, compare_to_baseline, generate_corpus, load_baseline, save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every scorer over a synthetic resume/job corpus (LLM stubbed, runs offline)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resume-words', type=int, nargs='+', default=[200, 1000, 3000])
+        parser.add_argument('--vocab-sizes', type=int, nargs='+', default=[60, 0],
+                            help='Vocabulary sizes; 0 for the full vocabulary')
+        parser.add_argument('--job-words', type=int, nargs='+', default=[100, 400])
+        parser.add_argument('--scorers', nargs='+', choices=sorted(SCORERS), help='Default: all scorers')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a baseline JSON file')
+        parser.add_argument('--baseline', metavar='PATH', nargs='?', const=str(BASELINE_PATH),
+                            help='Fail if p50 latency regressed against this baseline '
+                                 '(default: the committed ats/benchmark_baseline.json)')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed p50 slowdown against the baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        corpus = generate_corpus(
+            resume_sizes=options['resume_words'],
+            vocabulary_sizes=[size or None for size in options['vocab_sizes']],
+            job_sizes=options['job_words'],
+            seed=options['seed'],
+        )
+        results = benchmark_scorers(corpus, scorers=options['scorers'], iterations=options['iterations'])
+
+        self.stdout.write(f"{'scorer':<22} {'case':<18} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+        for row in results:
+            self.stdout.write(
+                f"{row['scorer']:<22} {row['case']:<18} {row['ops_per_sec']:>9} "
+                f"{row['p50_ms']:>9} {row['p99_ms']:>9} {row['peak_kib']:>9}"
+            )
+
+        if options['save_baseline']:
+            save_baseline(results, options['save_baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+
+        if options['baseline']:
+            regressions = compare_to_baseline(results, load_baseline(options['baseline']), options['threshold'])
+            for row in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f"{row['scorer']} {row['case']}: p50 {row['baseline_p50_ms']} -> {row['p50_ms']} ms "
+                    f"(+{row['slowdown']:.0%})"
+                ))
+            if regressions:
+                raise CommandError(f"{len(regressions)} benchmark(s) slower than the baseline by more than "
+                                   f"{options['threshold']:.0%}")
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.ingest import format_ingest_report, ingest_stored_resumes, iter_resume_sources, stage_resume_files
+from ats.models import JobPost
+
+
+class Command(BaseCommand):
+    help = 'Bulk-ingest resumes from a directory or ZIP archive for a job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', type=int)
+        parser.add_argument('path', help='Directory or ZIP archive of PDF resumes')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Concurrent parse workers (default: INGEST_MAX_WORKERS)')
+
+    def handle(self, *args, **options):
+        try:
+            job = JobPost.objects.get(pk=options['job_id'])
+        except JobPost.DoesNotExist:
+            raise CommandError(f"Job {options['job_id']} does not exist")
+
+        try:
+            stored_names = stage_resume_files(iter_resume_sources(options['path']))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        if not stored_names:
+            raise CommandError(f"No PDF resumes found in {options['path']}")
+
+        self.stdout.write(f'Staged {len(stored_names)} resumes for "{job.title}", parsing...')
+        report = ingest_stored_resumes(job, stored_names, max_workers=options['workers'])
+        lines = format_ingest_report(report)
+        self.stdout.write(self.style.SUCCESS(lines[0]))
+        for line in lines[1:]:
+            self.stderr.write(line)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.duplicates import link_duplicate
+from ats.models import Candidate, JobPost
+
+
+class Command(BaseCommand):
+    help = 'Compute MinHash signatures for candidates that have none and link them to earlier duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Only candidates of this job (still compared with every job)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Candidates loaded per batch')
+
+    def handle(self, *args, **options):
+        queryset = Candidate.objects.filter(minhash__isnull=True).exclude(resume_text='')
+        if options['job'] is not None:
+            if not JobPost.objects.filter(pk=options['job']).exists():
+                raise CommandError(f"Job {options['job']} does not exist")
+            queryset = queryset.filter(job_id=options['job'])
+        queryset = queryset.only('id', 'resume_text', 'email', 'phone', 'minhash', 'duplicate_of').order_by('pk')
+
+        indexed = linked = 0
+        # Primary key order: every candidate is compared with the already indexed earlier ones
+        for candidate in queryset.iterator(chunk_size=options['chunk_size']):
+            if link_duplicate(candidate):
+                linked += 1
+            indexed += 1
+        self.stdout.write(self.style.SUCCESS(f"♻️ Indexed {indexed} candidate(s), {linked} linked as duplicates"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.job_matching import match_candidate_to_jobs
+from ats.models import Candidate
+
+
+class Command(BaseCommand):
+    help = 'Rank every open job for a candidate; the AI semantic match runs on the top few only'
+
+    def add_arguments(self, parser):
+        parser.add_argument('candidate_id', type=int)
+        parser.add_argument('--top', type=int, default=10, help='Jobs to list')
+        parser.add_argument('--ai', type=int, default=3, help='Leading jobs to analyse with the LLM (0 to skip)')
+        parser.add_argument('--exclude-own-job', action='store_true',
+                            help='Leave out the job the candidate applied to')
+
+    def handle(self, *args, **options):
+        candidate = Candidate.objects.filter(pk=options['candidate_id']).first()
+        if candidate is None:
+            raise CommandError(f"Candidate {options['candidate_id']} does not exist")
+        matches = match_candidate_to_jobs(
+            candidate,
+            top_k=options['top'],
+            ai_top_n=options['ai'],
+            exclude_own_job=options['exclude_own_job'],
+        )
+        if not matches:
+            self.stdout.write('No open jobs.')
+            return
+        self.stdout.write(f"{'job':>6} {'keyword':>8} {'ai':>8}  title")
+        for match in matches:
+            ai = f"{match['ai_score']}{match['ai_grade']:>2}" if 'ai_score' in match else '-'
+            self.stdout.write(f"{match['job_id']:>6} {match['keyword_score']:>7}% {ai:>8}  {match['title']}")
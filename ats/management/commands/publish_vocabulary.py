@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from ats.models import VocabularyTerm
+from ats.tasks import rescore_vocabulary_candidates
+from ats.vocabulary import default_entries, publish_vocabulary
+
+
+class Command(BaseCommand):
+    help = 'Publish the VocabularyTerm table as a new skill vocabulary version and rescore affected candidates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--note', default='', help='Short description of the change')
+        parser.add_argument('--no-rescore', action='store_true',
+                            help='Only publish; rescore later with --rescore-only')
+        parser.add_argument('--rescore-only', action='store_true',
+                            help='Only rescore candidates stamped with an older version than the live one')
+        parser.add_argument('--seed', action='store_true',
+                            help='Add the built-in terms missing from the table first')
+
+    def handle(self, *args, **options):
+        if options['rescore_only']:
+            rescore_vocabulary_candidates()
+            return
+        if options['seed']:
+            existing = set(VocabularyTerm.objects.values_list('term', flat=True))
+            added = VocabularyTerm.objects.bulk_create(
+                VocabularyTerm(term=term, priority=priority, canonical=canonical)
+                for term, (priority, canonical) in default_entries().items() if term not in existing
+            )
+            self.stdout.write(f"🌱 Added {len(added)} built-in term(s)")
+        version = publish_vocabulary(note=options['note'], rescore=not options['no_rescore'])
+        if version is None:
+            self.stdout.write('Nothing changed since the latest vocabulary version')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"📚 Published vocabulary v{version.number}: {len(version.changed_terms)} changed term(s)"
+            + (f" ({', '.join(version.changed_terms[:20])})" if version.changed_terms else '')
+        ))
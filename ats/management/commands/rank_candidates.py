@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.embeddings import rank_candidates
+from ats.models import Candidate, JobPost
+
+
+class Command(BaseCommand):
+    help = "Rank a job's candidates by local semantic similarity; optionally AI-analyse the leading ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', type=int)
+        parser.add_argument('--top', type=int, default=20, help='Candidates to list')
+        parser.add_argument('--ai', type=int, default=0,
+                            help=f'Leading candidates to analyse with the LLM (0 to skip; '
+                                 f'AI_SHORTLIST_SIZE is {settings.AI_SHORTLIST_SIZE})')
+
+    def handle(self, *args, **options):
+        job = JobPost.objects.filter(pk=options['job_id']).first()
+        if job is None:
+            raise CommandError(f"Job {options['job_id']} does not exist")
+        ranked = rank_candidates(job, max(options['top'], options['ai']))
+        if not ranked:
+            self.stdout.write('No candidates with resume text.')
+            return
+        if options['ai']:
+            from ats.tasks import ai_score_candidates
+
+            ai_score_candidates([candidate_id for candidate_id, _ in ranked[:options['ai']]])
+
+        candidates = Candidate.objects.only('id', 'name', 'keyword_score', 'ai_score', 'ai_grade').in_bulk(
+            [candidate_id for candidate_id, _ in ranked]
+        )
+        self.stdout.write(f"{'id':>6} {'semantic':>8} {'keyword':>8} {'ai':>8}  name")
+        for candidate_id, similarity in ranked[:options['top']]:
+            candidate = candidates[candidate_id]
+            ai = f"{candidate.ai_score:g}{candidate.ai_grade:>2}" if candidate.ai_grade else '-'
+            self.stdout.write(
+                f"{candidate_id:>6} {similarity:>8.3f} {candidate.keyword_score:>7g}% {ai:>8}  {candidate.name}"
+            )
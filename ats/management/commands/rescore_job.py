@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.models import JobPost
+from ats.rescoring import rescore_job
+
+
+class Command(BaseCommand):
+    help = 'Recompute keyword scores for every candidate of a job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', type=int)
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Candidates loaded and written per batch')
+
+    def handle(self, *args, **options):
+        if not JobPost.objects.filter(pk=options['job_id']).exists():
+            raise CommandError(f"Job {options['job_id']} does not exist")
+        report = rescore_job(options['job_id'], chunk_size=options['chunk_size'])
+        if report['extracted']:
+            self.stdout.write(f"📄 Extracted text for {report['extracted']} resume(s)")
+        if report['terms_refreshed']:
+            self.stdout.write(f"🔤 Rebuilt term sets for {report['terms_refreshed']} resume(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"🔁 Rescored {report['candidates']} candidates ({report['updated']} changed) in {report['elapsed']}s "
+            f"({report['candidates_per_sec']} candidates/sec)"
+        ))
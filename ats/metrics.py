@@ -0,0 +1,211 @@
+"""
+Pipeline timing metrics.
+
+Each stage of the upload/scoring pipeline runs inside ``span(stage)``:
+
+    with span('extract') as s:
+        ...
+        s.outcome = 'cached'
+
+A span records its duration in a histogram per (stage, outcome) and writes
+one JSON log line to the ``ats.metrics`` logger. Exceptions mark the span
+'error' and propagate. ``render_prometheus`` formats the histograms, the
+extraction and LLM cache counters and the OpenRouter breaker state for the
+/metrics/ endpoint.
+
+Like the cache counters, histograms are per process: the web process
+reports uploads and eager pipeline runs, Celery workers keep their own.
+With METRICS_ENABLED off, span() returns a shared no-op object.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger('ats.metrics')
+
+STAGES = ('extract', 'dedup', 'local_parse', 'llm_parse', 'tokenize', 'fuzzy_match', 'semantic_rank', 'ai_match', 'save')
+OUTCOMES = ('ok', 'cached', 'skipped', 'fallback', 'error')
+
+# Upper bounds in seconds: fuzzy matching sits at the low end, LLM calls at the high end
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with '+Inf'."""
+        total = 0
+        pairs = []
+        for bound, count in zip(BUCKETS + ('+Inf',), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+_lock = threading.Lock()
+_histograms = {}  # (stage, outcome) -> Histogram
+
+
+def observe(stage, outcome, seconds):
+    """Record one stage duration."""
+    with _lock:
+        histogram = _histograms.get((stage, outcome))
+        if histogram is None:
+            histogram = _histograms[(stage, outcome)] = Histogram()
+        histogram.observe(seconds)
+
+
+def snapshot():
+    """{(stage, outcome): {'buckets', 'sum', 'count'}} for this process."""
+    with _lock:
+        return {
+            key: {'buckets': histogram.cumulative(), 'sum': histogram.sum, 'count': histogram.count}
+            for key, histogram in _histograms.items()
+        }
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+class Span:
+    """
+    Times one pipeline stage. ``outcome`` defaults to 'ok'; set it to
+    another value from OUTCOMES inside the block.
+    """
+
+    __slots__ = ('stage', 'outcome', 'fields', 'started', 'duration')
+
+    def __init__(self, stage, fields):
+        self.stage = stage
+        self.outcome = 'ok'
+        self.fields = fields
+        self.duration = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.outcome = 'error'
+        observe(self.stage, self.outcome, self.duration)
+        if logger.isEnabledFor(logging.INFO):
+            record = {'event': 'stage', 'stage': self.stage, 'outcome': self.outcome,
+                      'duration_ms': round(self.duration * 1000, 3), **self.fields}
+            if exc_type is not None:
+                record['error'] = exc_type.__name__
+            logger.info(json.dumps(record, default=str))
+        return False
+
+
+class _NoopSpan:
+    """Shared stand-in while metrics are disabled; attribute writes are ignored."""
+
+    __slots__ = ()
+    stage = None
+    outcome = 'ok'
+    fields = {}
+    duration = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage, **fields):
+    """
+    Context manager timing a pipeline stage (one of STAGES). Keyword
+    arguments such as candidate_id are added to the log line only, not to
+    the histogram labels.
+    """
+    if not settings.METRICS_ENABLED:
+        return _NOOP_SPAN
+    return Span(stage, fields)
+
+
+def cached_count(name, queryset):
+    """
+    queryset.count(), shared through the Django cache for METRICS_COUNT_TTL
+    seconds so a scrape doesn't run a COUNT(*) over a large table.
+    """
+    return cache.get_or_set(f'ats:metrics:count:{name}', queryset.count, settings.METRICS_COUNT_TTL)
+
+
+def _format_labels(**labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """Metrics of this process in the Prometheus text exposition format (0.0.4)."""
+    from .circuit_breaker import openrouter_breaker
+    from .llm_cache import llm_cache_stats
+    from .parsers import extraction_cache_stats
+
+    lines = [
+        '# HELP ats_stage_duration_seconds Duration of upload and scoring pipeline stages.',
+        '# TYPE ats_stage_duration_seconds histogram',
+    ]
+    for (stage, outcome), histogram in sorted(snapshot().items()):
+        for bound, count in histogram['buckets']:
+            le = bound if bound == '+Inf' else _format_value(bound)
+            lines.append(f'ats_stage_duration_seconds_bucket{_format_labels(stage=stage, outcome=outcome, le=le)} {count}')
+        labels = _format_labels(stage=stage, outcome=outcome)
+        lines.append(f'ats_stage_duration_seconds_sum{labels} {_format_value(histogram["sum"])}')
+        lines.append(f'ats_stage_duration_seconds_count{labels} {histogram["count"]}')
+
+    caches = (('extraction', 'PDF text extraction', extraction_cache_stats()),
+              ('llm', 'LLM response', llm_cache_stats()))
+    for cache_name, description, stats in caches:
+        metric = f'ats_{cache_name}_cache_requests_total'
+        lines.append(f'# HELP {metric} {description} cache lookups by result.')
+        lines.append(f'# TYPE {metric} counter')
+        lines.append(f'{metric}{_format_labels(result="hit")} {stats["hits"]}')
+        lines.append(f'{metric}{_format_labels(result="miss")} {stats["misses"]}')
+        metric = f'ats_{cache_name}_cache_entries'
+        lines.append(f'# HELP {metric} Stored {description} cache entries.')
+        lines.append(f'# TYPE {metric} gauge')
+        lines.append(f'{metric} {stats["entries"]}')
+
+    breaker = openrouter_breaker.status()
+    lines.append('# HELP ats_openrouter_circuit_state OpenRouter circuit breaker state (1 for the current state).')
+    lines.append('# TYPE ats_openrouter_circuit_state gauge')
+    for state in ('closed', 'half_open', 'open'):
+        lines.append(f'ats_openrouter_circuit_state{_format_labels(state=state)} {int(breaker["state"] == state)}')
+    lines.append('# HELP ats_openrouter_consecutive_failures Consecutive OpenRouter failures.')
+    lines.append('# TYPE ats_openrouter_consecutive_failures gauge')
+    lines.append(f'ats_openrouter_consecutive_failures {breaker["consecutive_failures"]}')
+    return '\n'.join(lines) + '\n'
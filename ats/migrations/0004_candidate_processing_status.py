@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0003_candidate_ai_grade_candidate_ai_reasoning_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='processing_error',
+            field=models.TextField(blank=True, help_text='Last pipeline error or AI fallback message'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='processing_status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('extracting', 'Extracting text'), ('parsing', 'Parsing resume'), ('scoring', 'Keyword scoring'), ('ai_scoring', 'AI analysis'), ('complete', 'Complete'), ('failed', 'Failed')], default='complete', max_length=20),
+        ),
+    ]
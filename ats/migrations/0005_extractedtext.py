@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0004_candidate_processing_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField(blank=True)),
+                ('byte_size', models.PositiveIntegerField(default=0, help_text='Size of the source file in bytes')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
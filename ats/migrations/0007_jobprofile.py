@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0006_llmresponse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(help_text='Hash of the scoring text and profile version', max_length=64)),
+                ('data', models.JSONField(default=dict)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='scoring_profile', to='ats.jobpost')),
+            ],
+        ),
+    ]
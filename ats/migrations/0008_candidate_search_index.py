@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:52
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index on Postgres, FTS5 table on SQLite; existing rows are indexed."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS ats_candidate_search_gin ON ats_candidate USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            "UPDATE ats_candidate SET search_vector = "
+            "setweight(to_tsvector('english', COALESCE(skills::text, '')), 'A') || "
+            "setweight(to_tsvector('english', COALESCE(education, '')), 'B') || "
+            "setweight(to_tsvector('english', COALESCE(resume_text, '')), 'C')"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS ats_candidate_fts "
+            "USING fts5(resume_text, skills, education, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            'INSERT INTO ats_candidate_fts (rowid, resume_text, skills, education) '
+            'SELECT id, resume_text, skills, education FROM ats_candidate'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS ats_candidate_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS ats_candidate_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0007_jobprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
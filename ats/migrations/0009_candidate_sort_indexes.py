@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0008_candidate_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-created_at', '-id'], name='cand_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='cand_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['name', 'id'], name='cand_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-keyword_score', '-id'], name='cand_keyword_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-score', '-id'], name='cand_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-ai_score', '-id'], name='cand_ai_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['job', '-keyword_score', '-id'], name='cand_job_keyword_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['job', 'status', '-keyword_score'], name='cand_job_status_score_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0009_candidate_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractedtext',
+            name='extract_seconds',
+            field=models.FloatField(default=0, help_text='Extraction wall-clock time'),
+        ),
+        migrations.AddField(
+            model_name='extractedtext',
+            name='pages',
+            field=models.PositiveIntegerField(default=0, help_text='Pages laid out before the text budget or page cap was reached'),
+        ),
+    ]
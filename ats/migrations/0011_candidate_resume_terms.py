@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0010_extractedtext_pages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_terms',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Sorted normalized terms (advanced scoring)'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_tokens',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Sorted raw tokens (legacy scoring)'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='terms_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='PROFILE_VERSION the term sets were built with'),
+        ),
+    ]
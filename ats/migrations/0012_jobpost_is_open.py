@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0011_candidate_resume_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='is_open',
+            field=models.BooleanField(db_index=True, default=True, help_text='Open positions take part in multi-job matching'),
+        ),
+    ]
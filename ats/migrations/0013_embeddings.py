@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0012_jobpost_is_open'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='embedding',
+            field=models.BinaryField(blank=True, help_text='Hashed term vector for semantic pre-ranking (ats/embeddings.py)', null=True),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='embedding_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='EMBEDDING_VERSION the vector was built with'),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='embedding_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the scoring text and embedding version', max_length=64),
+        ),
+    ]
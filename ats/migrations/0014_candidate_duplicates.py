@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0013_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier candidate with the same contact details or a near-identical resume', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='ats.candidate'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='minhash',
+            field=models.BinaryField(blank=True, help_text='MinHash signature of the resume text shingles', null=True),
+        ),
+        migrations.CreateModel(
+            name='DuplicateKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.SmallIntegerField(help_text='LSH band number; negative for contact keys')),
+                ('key', models.BigIntegerField(help_text='64-bit hash of the band or contact value')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_keys', to='ats.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'band'], name='dupkey_key_band_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0014_candidate_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='score_tier',
+            field=models.CharField(blank=True, choices=[('legacy', 'Legacy keyword'), ('weighted', 'Weighted keyword'), ('fuzzy', 'Fuzzy keyword'), ('ai', 'AI semantic')], help_text='Scoring cascade tier that decided the score', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='cascade_ai_min',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Minimum fuzzy keyword score (0-100) to run the AI semantic match', null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='cascade_legacy_min',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Minimum legacy keyword score (0-100) to run weighted scoring', null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='cascade_weighted_min',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Minimum weighted keyword score (0-100) to run fuzzy matching', null=True),
+        ),
+    ]
@@ -0,0 +1,172 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+# Built-in vocabulary as of this migration ({term: [priority, canonical]}), frozen
+# so later edits to advanced_scoring.py don't change what version 1 contains
+SEED_ENTRIES = {
+    'agile': ['medium', ''],
+    'ai': ['high', ''],
+    'amazon': ['', 'aws'],
+    'angular': ['high', ''],
+    'angularjs': ['', 'angular'],
+    'api': ['medium', ''],
+    'apis': ['', 'api'],
+    'aws': ['high', ''],
+    'azure': ['high', ''],
+    'back-end': ['', 'backend'],
+    'backend': ['medium', ''],
+    'bootstrap': ['medium', ''],
+    'c#': ['high', 'csharp'],
+    'c++': ['high', 'cpp'],
+    'cd': ['', 'cicd'],
+    'ci': ['', 'cicd'],
+    'cicd': ['medium', ''],
+    'cpp': ['high', ''],
+    'csharp': ['high', ''],
+    'css': ['medium', ''],
+    'data science': ['high', ''],
+    'database': ['medium', ''],
+    'db': ['', 'database'],
+    'deep learning': ['high', ''],
+    'django': ['high', ''],
+    'docker': ['high', ''],
+    'ec2': ['', 'aws'],
+    'ecmascript': ['', 'javascript'],
+    'elasticsearch': ['high', ''],
+    'express': ['', ''],
+    'express.js': ['', 'express'],
+    'expressjs': ['', 'express'],
+    'fastapi': ['high', ''],
+    'flask': ['high', ''],
+    'front-end': ['', 'frontend'],
+    'frontend': ['medium', ''],
+    'full stack': ['', 'fullstack'],
+    'full-stack': ['', 'fullstack'],
+    'fullstack': ['medium', ''],
+    'gcp': ['high', ''],
+    'git': ['medium', ''],
+    'github': ['', 'git'],
+    'gitlab': ['', 'git'],
+    'go': ['high', ''],
+    'golang': ['high', ''],
+    'google cloud': ['', 'gcp'],
+    'graphql': ['medium', ''],
+    'heroku': ['', ''],
+    'html': ['medium', ''],
+    'integration': ['medium', ''],
+    'java': ['high', ''],
+    'java-script': ['', 'javascript'],
+    'javascript': ['high', ''],
+    'jenkins': ['medium', ''],
+    'jest': ['', 'testing'],
+    'js': ['', 'javascript'],
+    'k8s': ['', 'kubernetes'],
+    'kotlin': ['high', ''],
+    'kubernetes': ['high', ''],
+    'linux': ['medium', ''],
+    'machine learning': ['high', ''],
+    'macos': ['medium', ''],
+    'microservices': ['medium', ''],
+    'ml': ['high', ''],
+    'mongo': ['', 'mongodb'],
+    'mongodb': ['high', ''],
+    'mysql': ['high', ''],
+    'node': ['', 'nodejs'],
+    'node.js': ['', 'nodejs'],
+    'nodejs': ['high', ''],
+    'nosql': ['medium', ''],
+    'php': ['high', ''],
+    'postgres': ['', 'postgresql'],
+    'postgresql': ['high', ''],
+    'psql': ['', 'postgresql'],
+    'py': ['', 'python'],
+    'pytest': ['', 'testing'],
+    'python': ['high', ''],
+    'python3': ['', 'python'],
+    'react': ['high', ''],
+    'react.js': ['', 'react'],
+    'reactjs': ['', 'react'],
+    'redis': ['high', ''],
+    'rest': ['medium', ''],
+    'restful': ['', 'rest'],
+    'ruby': ['high', ''],
+    'rust': ['high', ''],
+    's3': ['', 'aws'],
+    'sass': ['medium', ''],
+    'scala': ['high', ''],
+    'scrum': ['medium', 'agile'],
+    'sql': ['medium', ''],
+    'swift': ['high', ''],
+    'tailwind': ['medium', ''],
+    'tdd': ['medium', 'testing'],
+    'test': ['', 'testing'],
+    'testing': ['medium', ''],
+    'ts': ['', 'typescript'],
+    'typescript': ['high', ''],
+    'unit': ['medium', ''],
+    'unit test': ['', 'testing'],
+    'unix': ['medium', ''],
+    'vue': ['high', ''],
+    'vue.js': ['', 'vue'],
+    'vuejs': ['', 'vue'],
+    'windows': ['medium', ''],
+}
+
+
+def seed_vocabulary(apps, schema_editor):
+    """Built-in vocabulary as the editable terms and version 1; existing scores used it."""
+    VocabularyTerm = apps.get_model('ats', 'VocabularyTerm')
+    VocabularyVersion = apps.get_model('ats', 'VocabularyVersion')
+    Candidate = apps.get_model('ats', 'Candidate')
+    entries = SEED_ENTRIES
+    VocabularyTerm.objects.bulk_create(
+        VocabularyTerm(term=term, priority=priority, canonical=canonical)
+        for term, (priority, canonical) in entries.items()
+    )
+    VocabularyVersion.objects.create(number=1, entries=entries, note='Built-in vocabulary')
+    Candidate.objects.update(vocab_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0015_scoring_cascade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VocabularyTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(help_text='Lowercase word or phrase, e.g. "k8s" or "google cloud"', max_length=100, unique=True)),
+                ('priority', models.CharField(blank=True, choices=[('high', 'High (3x weight)'), ('medium', 'Medium (2x weight)'), ('', 'Normal (1x weight)')], max_length=10)),
+                ('canonical', models.CharField(blank=True, help_text='Skill the term normalizes to (synonyms); blank for the term itself', max_length=100)),
+            ],
+            options={
+                'ordering': ['term'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VocabularyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(unique=True)),
+                ('entries', models.JSONField(default=dict, help_text='{term: [priority, canonical]}')),
+                ('changed_terms', models.JSONField(default=list, help_text='Terms added, removed or changed since the previous version')),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('rescored_at', models.DateTimeField(blank=True, help_text='When the diff-driven rescore finished', null=True)),
+            ],
+            options={
+                'ordering': ['-number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='vocab_version',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Skill vocabulary version the keyword scores were computed with'),
+        ),
+        migrations.RunPython(seed_vocabulary, migrations.RunPython.noop),
+    ]
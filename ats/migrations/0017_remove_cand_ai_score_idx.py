@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0016_vocabulary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='cand_ai_score_idx',
+        ),
+    ]
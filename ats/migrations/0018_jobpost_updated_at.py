@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0017_remove_cand_ai_score_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+def stamp_terms_vocab_version(apps, schema_editor):
+    """Existing term sets were built (or refreshed by the rescorer) with the vocabulary their scores used."""
+    Candidate = apps.get_model('ats', 'Candidate')
+    Candidate.objects.exclude(terms_version=0).update(terms_vocab_version=models.F('vocab_version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0018_jobpost_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='terms_vocab_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Skill vocabulary version the term sets were built with'),
+        ),
+        migrations.RunPython(stamp_terms_vocab_version, migrations.RunPython.noop),
+    ]
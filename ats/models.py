@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.postgres.search import SearchVectorField
 
 
@@ -6,11 +8,63 @@ class JobPost(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     required_skills = models.JSONField(default=list, blank=True)
+    is_open = models.BooleanField(default=True, db_index=True, help_text='Open positions take part in multi-job matching')
+    # Hashed term vector of the scoring text for semantic pre-ranking (see ats/embeddings.py)
+    embedding = models.BinaryField(null=True, blank=True, editable=False)
+    embedding_hash = models.CharField(max_length=64, blank=True, editable=False,
+                                      help_text='Hash of the scoring text and embedding version')
+    # Scoring cascade thresholds (see advanced_scoring.cascade_score_resume); blank uses SCORE_CASCADE_THRESHOLDS
+    cascade_legacy_min = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text='Minimum legacy keyword score (0-100) to run weighted scoring')
+    cascade_weighted_min = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text='Minimum weighted keyword score (0-100) to run fuzzy matching')
+    cascade_ai_min = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text='Minimum fuzzy keyword score (0-100) to run the AI semantic match')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every save; open jobs' count and latest updated_at key the job index (ats/job_matching.py)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.title
 
+    def get_scoring_text(self):
+        """
+        Build the text candidates are scored against: the description plus
+        the required skills.
+        """
+        scoring_text = self.description
+        if self.required_skills:
+            skills_text = " ".join(self.required_skills) if isinstance(self.required_skills, list) else str(self.required_skills)
+            scoring_text = f"{scoring_text}\n\nRequired Skills: {skills_text}"
+        if not scoring_text.strip():
+            scoring_text = "General candidate evaluation"  # Fallback
+        return scoring_text
+
+    def get_cascade_thresholds(self):
+        """{tier: minimum score to run the next tier}, per-job values over the settings defaults."""
+        thresholds = dict(settings.SCORE_CASCADE_THRESHOLDS)
+        for tier, value in (('legacy', self.cascade_legacy_min),
+                            ('weighted', self.cascade_weighted_min),
+                            ('fuzzy', self.cascade_ai_min)):
+            if value is not None:
+                thresholds[tier] = value
+        return thresholds
+
+
+class JobProfile(models.Model):
+    """
+    Compiled job-side scoring data (normalized tokens, weights, fuzzy index)
+    for a JobPost, rebuilt when the job's scoring text changes. See
+    ats/job_profiles.py.
+    """
+    job = models.OneToOneField(JobPost, on_delete=models.CASCADE, related_name='scoring_profile')
+    source_hash = models.CharField(max_length=64, help_text='Hash of the scoring text and profile version')
+    data = models.JSONField(default=dict)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Profile for {self.job}"
+
 
 class Candidate(models.Model):
     STATUS_CHOICES = [
@@ -20,6 +74,23 @@ class Candidate(models.Model):
         ("hired", "Hired"),
         ("rejected", "Rejected"),
     ]
+    PROCESSING_CHOICES = [
+        ("queued", "Queued"),
+        ("extracting", "Extracting text"),
+        ("parsing", "Parsing resume"),
+        ("scoring", "Keyword scoring"),
+        ("ai_scoring", "AI analysis"),
+        ("complete", "Complete"),
+        ("failed", "Failed"),
+    ]
+    SCORE_TIER_CHOICES = [
+        ("legacy", "Legacy keyword"),
+        ("weighted", "Weighted keyword"),
+        ("fuzzy", "Fuzzy keyword"),
+        ("ai", "AI semantic"),
+    ]
+    # Pipeline stages in order, used to render progress on the detail page
+    PROCESSING_STAGES = ["queued", "extracting", "parsing", "scoring", "ai_scoring", "complete"]
     job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='candidates', null=True, blank=True)
     name = models.CharField(max_length=255)
     email = models.EmailField(blank=True, null=True)
@@ -29,6 +100,25 @@ class Candidate(models.Model):
     education = models.TextField(blank=True)
     resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
     resume_text = models.TextField(blank=True)
+    # Precomputed scoring sets of resume_text (see ats/resume_terms.py)
+    resume_terms = models.JSONField(default=list, blank=True, editable=False,
+                                    help_text='Sorted normalized terms (advanced scoring)')
+    resume_tokens = models.JSONField(default=list, blank=True, editable=False,
+                                     help_text='Sorted raw tokens (legacy scoring)')
+    terms_version = models.PositiveSmallIntegerField(default=0, editable=False,
+                                                     help_text='PROFILE_VERSION the term sets were built with')
+    terms_vocab_version = models.PositiveIntegerField(default=0, editable=False,
+                                                      help_text='Skill vocabulary version the term sets were built with')
+    embedding = models.BinaryField(null=True, blank=True, editable=False,
+                                   help_text='Hashed term vector for semantic pre-ranking (ats/embeddings.py)')
+    embedding_version = models.PositiveSmallIntegerField(default=0, editable=False,
+                                                         help_text='EMBEDDING_VERSION the vector was built with')
+    # Near-duplicate detection (see ats/duplicates.py)
+    minhash = models.BinaryField(null=True, blank=True, editable=False,
+                                 help_text='MinHash signature of the resume text shingles')
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='duplicates',
+                                     help_text='Earlier candidate with the same contact details or a near-identical resume')
     
     # Legacy scoring (kept for backward compatibility)
     score = models.FloatField(default=0)
@@ -41,14 +131,109 @@ class Candidate(models.Model):
     ai_grade = models.CharField(max_length=5, blank=True, help_text='AI match grade (A-F)')
     ai_reasoning = models.TextField(blank=True, help_text='AI analysis reasoning')
     fuzzy_matches = models.JSONField(default=dict, blank=True, help_text='Fuzzy matched keywords')
+    score_tier = models.CharField(max_length=10, choices=SCORE_TIER_CHOICES, blank=True,
+                                  help_text='Scoring cascade tier that decided the score')
+    vocab_version = models.PositiveIntegerField(default=0, db_index=True, editable=False,
+                                                help_text='Skill vocabulary version the keyword scores were computed with')
+    
+    # Full-text search over resume_text, skills and education (Postgres; see ats/search.py)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    
+    # Resume processing pipeline (see ats/tasks.py)
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_CHOICES, default='complete')
+    processing_error = models.TextField(blank=True, help_text='Last pipeline error or AI fallback message')
     
     # Status and metadata
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        # Keyset pagination and ranked listings walk these (sort key, id) indexes
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='cand_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='cand_status_created_idx'),
+            models.Index(fields=['name', 'id'], name='cand_name_idx'),
+            models.Index(fields=['-keyword_score', '-id'], name='cand_keyword_score_idx'),
+            models.Index(fields=['-score', '-id'], name='cand_score_idx'),
+            models.Index(fields=['job', '-keyword_score', '-id'], name='cand_job_keyword_score_idx'),
+            models.Index(fields=['job', 'status', '-keyword_score'], name='cand_job_status_score_idx'),
+        ]
+    
     def __str__(self):
         return self.name
 
+    @property
+    def is_processing(self):
+        return self.processing_status not in ('complete', 'failed')
+
+    @property
+    def processing_progress(self):
+        """Percentage of pipeline stages finished (0-100)."""
+        if self.processing_status == 'failed':
+            return 100
+        index = self.PROCESSING_STAGES.index(self.processing_status)
+        return int(100 * index / (len(self.PROCESSING_STAGES) - 1))
+
+
+class VocabularyTerm(models.Model):
+    """
+    Editable skill vocabulary: one row per word or phrase as it appears in
+    resumes. Changes take effect when published as a VocabularyVersion
+    (see ats/vocabulary.py).
+    """
+    PRIORITY_CHOICES = [
+        ("high", "High (3x weight)"),
+        ("medium", "Medium (2x weight)"),
+        ("", "Normal (1x weight)"),
+    ]
+    term = models.CharField(max_length=100, unique=True, help_text='Lowercase word or phrase, e.g. "k8s" or "google cloud"')
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, blank=True)
+    canonical = models.CharField(max_length=100, blank=True,
+                                 help_text='Skill the term normalizes to (synonyms); blank for the term itself')
+
+    class Meta:
+        ordering = ['term']
+
+    def __str__(self):
+        return self.term
+
+    def save(self, *args, **kwargs):
+        self.term = ' '.join(self.term.lower().split())
+        self.canonical = ' '.join(self.canonical.lower().split())
+        super().save(*args, **kwargs)
+
+
+class VocabularyVersion(models.Model):
+    """Published snapshot of the skill vocabulary; the highest number is live."""
+    number = models.PositiveIntegerField(unique=True)
+    entries = models.JSONField(default=dict, help_text='{term: [priority, canonical]}')
+    changed_terms = models.JSONField(default=list, help_text='Terms added, removed or changed since the previous version')
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rescored_at = models.DateTimeField(null=True, blank=True, help_text='When the diff-driven rescore finished')
+
+    class Meta:
+        ordering = ['-number']
+
+    def __str__(self):
+        return f"Vocabulary v{self.number}"
+
+
+class DuplicateKey(models.Model):
+    """
+    Lookup key of a candidate for duplicate detection: one row per MinHash
+    LSH band, plus normalized email and phone keys. See ats/duplicates.py.
+    """
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='duplicate_keys')
+    band = models.SmallIntegerField(help_text='LSH band number; negative for contact keys')
+    key = models.BigIntegerField(help_text='64-bit hash of the band or contact value')
+
+    class Meta:
+        indexes = [models.Index(fields=['key', 'band'], name='dupkey_key_band_idx')]
+
+    def __str__(self):
+        return f"{self.candidate_id}:{self.band}:{self.key}"
+
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -65,4 +250,41 @@ class Application(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.candidate} -> {self.job}"
\ No newline at end of file
+        return f"{self.candidate} -> {self.job}"
+
+
+class ExtractedText(models.Model):
+    """
+    Content-addressed cache of PDF text extraction, keyed by the SHA-256 of
+    the file bytes. Least recently used rows are evicted past
+    EXTRACTION_CACHE_MAX_ENTRIES (see ats/parsers.py).
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    byte_size = models.PositiveIntegerField(default=0, help_text='Size of the source file in bytes')
+    pages = models.PositiveIntegerField(default=0, help_text='Pages laid out before the text budget or page cap was reached')
+    extract_seconds = models.FloatField(default=0, help_text='Extraction wall-clock time')
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.content_hash
+
+
+
+class LLMResponse(models.Model):
+    """
+    Cached LLM completion, keyed by a fingerprint of model + prompt +
+    parameters (see ats/llm_cache.py).
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=255)
+    response = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.fingerprint[:12]}"
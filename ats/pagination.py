@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET, each page continues from the sort value and primary key
+of the last row shown: ``WHERE (key, id) < (last_key, last_id)`` under the
+matching composite index. Page 500 costs the same as page 1.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """The cursor in the query string can't be decoded."""
+
+
+class KeysetPage:
+    """A page of results with cursors to its neighbours (mirrors django.core.paginator.Page)."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset ordered by one model field plus the primary key.
+
+    Args:
+        queryset: Unordered (or any) queryset; ordering is replaced
+        order_by: Field name, optionally prefixed with "-" for descending
+        per_page: Rows per page
+    """
+
+    def __init__(self, queryset, order_by, per_page):
+        self.descending = order_by.startswith('-')
+        self.field_name = order_by.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [prefix + self.field_name, prefix + 'pk']
+
+    def _position(self, obj):
+        return getattr(obj, self.field.attname), obj.pk
+
+    def encode_cursor(self, obj):
+        value, pk = self._position(obj)
+        raw = json.dumps([self.field.value_to_string(obj) if value is not None else None, pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk = json.loads(raw)
+            return self.field.to_python(value), int(pk)
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(str(e))
+
+    def _beyond(self, value, pk, reverse=False):
+        """Rows strictly after (value, pk) in the page direction."""
+        descending = self.descending != reverse
+        op = 'lt' if descending else 'gt'
+        after = Q(**{f'{self.field_name}__{op}': value}) | Q(**{self.field_name: value, f'pk__{op}': pk})
+        # The redundant inclusive bound lets the database seek into the index
+        return Q(**{f'{self.field_name}__{op}e': value}) & after
+
+    def page(self, after=None, before=None):
+        """
+        Return the first page, the page after cursor ``after`` or the page
+        before cursor ``before``.
+        """
+        if before:
+            value, pk = self.decode_cursor(before)
+            rows = list(
+                self.queryset.filter(self._beyond(value, pk, reverse=True))
+                .order_by(*self._ordering(reverse=True))[:self.per_page + 1]
+            )
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(
+                rows,
+                next_cursor=self.encode_cursor(rows[-1]) if rows else before,
+                previous_cursor=self.encode_cursor(rows[0]) if has_more else None,
+            )
+
+        queryset = self.queryset.order_by(*self._ordering())
+        if after:
+            value, pk = self.decode_cursor(after)
+            queryset = queryset.filter(self._beyond(value, pk))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_more else None,
+            previous_cursor=self.encode_cursor(rows[0]) if after and rows else None,
+        )
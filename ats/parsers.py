@@ -1,8 +1,19 @@
-import os
-import tempfile
-from pdfminer.high_level import extract_text as pdf_extract
+import hashlib
+import io
+import threading
 from openai import OpenAI
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .circuit_breaker import CircuitOpenError, openrouter_breaker, stage_timeout
+from .extraction_service import can_use_process_pool, get_extraction_service
+from .field_extractor import FIELDS, extract_resume_fields
+from .metrics import cached_count, span
+from .models import ExtractedText
+from .pdf_extract import extract_bounded, extract_pdf
+from .llm_cache import get_cached_response, prompt_fingerprint, store_response
 
 
 # Initialize OpenRouter client with timeout
@@ -19,54 +30,227 @@ def parse_resume(file_obj, filename=None, keywords=None):
     Extracts text from a file-like object (PDF) and parses it with OpenAI.
     Returns a dict with parsed fields.
     """
-    # Save file_obj to a temporary file for pdfminer
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename or 'resume.pdf')[1]) as tmp:
-        tmp.write(file_obj.read())
-        tmp_path = tmp.name
-    text = extract_text_from_file(tmp_path)
-    os.unlink(tmp_path)
-    parsed = parse_resume_with_openai(text)
+    text = extract_text_from_upload(file_obj, filename)
+    parsed = parse_resume_text(text)
     parsed['text'] = text
     return parsed
 
 
+# Per-process extraction cache counters (see extraction_cache_stats)
+_extraction_cache_lock = threading.Lock()
+_extraction_cache_counters = {'hits': 0, 'misses': 0}
+
+
+def _count_extraction(outcome):
+    with _extraction_cache_lock:
+        _extraction_cache_counters[outcome] += 1
+
+
+def extraction_cache_stats():
+    """
+    Extraction cache hit/miss counters for this process, plus the stored
+    entry count (recounted at most every METRICS_COUNT_TTL seconds).
+    """
+    with _extraction_cache_lock:
+        stats = dict(_extraction_cache_counters)
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / total, 3) if total else 0.0
+    stats['entries'] = cached_count('extraction_cache_entries', ExtractedText.objects.all())
+    return stats
+
+
+def _evict_extraction_cache():
+    """Drop least recently used entries beyond EXTRACTION_CACHE_MAX_ENTRIES."""
+    max_entries = settings.EXTRACTION_CACHE_MAX_ENTRIES
+    overflow = ExtractedText.objects.count() - max_entries
+    if overflow > 0:
+        stale = ExtractedText.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        ExtractedText.objects.filter(pk__in=list(stale)).delete()
+
+
+def extract_text_from_upload(file_obj, filename=None):
+    """
+    Extracts text from an uploaded or stored file-like object, straight from
+    its bytes in memory.
+    """
+    return extract_text_from_bytes(file_obj.read())
+
+
+def extract_text_from_bytes(data):
+    """
+    Extracts text from PDF bytes, reusing the stored result when the same
+    file (by SHA-256) has been extracted before.
+    """
+    content_hash = hashlib.sha256(data).hexdigest()
+    return _cached_extraction(content_hash, len(data), lambda: _extract_pdf_text(data=data))
+
+
 def extract_text_from_file(path):
-# currently handles PDFs (pdfminer)
+    """
+    Extracts text from a PDF on disk (cached by content hash). The file is
+    hashed in blocks and only its path is handed to the extractor.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(block)
+            size += len(block)
+    return _cached_extraction(digest.hexdigest(), size, lambda: _extract_pdf_text(path=path))
+
+
+def _cached_extraction(content_hash, byte_size, extract):
+    with span('extract', bytes=byte_size) as stage:
+        cached = ExtractedText.objects.filter(content_hash=content_hash).only('pk', 'text').first()
+        if cached is not None:
+            stage.outcome = 'cached'
+            _count_extraction('hits')
+            ExtractedText.objects.filter(pk=cached.pk).update(last_used_at=timezone.now(), hits=F('hits') + 1)
+            return cached.text
+
+        _count_extraction('misses')
+        result = extract()
+        if result['error'] and not result['text']:
+            stage.outcome = 'error'
+    text = result['text']
+    if result['error'] and not text:
+        return text  # Don't cache failures such as timeouts; they may succeed on retry
     try:
-        text = pdf_extract(path)
-        if text and text.strip():
-            return text
-    except Exception:
-        pass
-    return ''
+        with transaction.atomic():
+            ExtractedText.objects.create(
+                content_hash=content_hash,
+                text=text,
+                byte_size=byte_size,
+                pages=result['pages'],
+                extract_seconds=result['elapsed'],
+            )
+    except IntegrityError:
+        pass  # Stored concurrently by another worker
+    else:
+        _evict_extraction_cache()
+    return text
+
+
+def _extract_pdf_text(data=None, path=None):
+    """
+    Bounded, sandboxed PDF text extraction of bytes or a file on disk (see
+    ats/pdf_extract.py): on the extraction process pool when possible,
+    otherwise in a one-off subprocess.
+
+    Returns:
+        dict: {'text', 'pages', 'truncated', 'elapsed', 'error'}
+    """
+    if settings.PDF_EXTRACT_POOL and can_use_process_pool():
+        service = get_extraction_service()
+        result = service.extract_path(path) if path is not None else service.extract_bytes(data)
+    else:
+        if data is None:
+            with open(path, 'rb') as fh:
+                data = fh.read()
+        if settings.PDF_EXTRACT_SUBPROCESS:
+            result = extract_pdf(
+                data,
+                max_chars=settings.PDF_EXTRACT_MAX_CHARS,
+                max_pages=settings.PDF_EXTRACT_MAX_PAGES,
+                timeout=settings.PDF_EXTRACT_TIMEOUT,
+                memory_mb=settings.PDF_EXTRACT_MEMORY_MB,
+            )
+        else:
+            result = extract_bounded(io.BytesIO(data), settings.PDF_EXTRACT_MAX_CHARS, settings.PDF_EXTRACT_MAX_PAGES)
+    if result['error']:
+        print(f"❌ PDF extraction failed after {result['elapsed']}s: {result['error']}")
+    else:
+        print(f"📄 Extracted {len(result['text'])} characters from {result['pages']} page(s) in {result['elapsed']}s"
+              f"{' (text budget reached)' if result['truncated'] else ''}")
+    return result
+
+
+PARSE_MODEL = 'tngtech/deepseek-r1t2-chimera:free'  # DeepSeek R1 reasoning model (FREE)
+PARSE_FIELD_PROMPTS = {
+    'email': 'email (string or null)',
+    'phone': 'phone (string or null)',
+    'skills': 'skills (list of short lowercase strings)',
+    'experience': 'experience (number of years)',
+    'education': 'education (string)',
+}
+
+
+def parse_resume_text(resume_text, use_cache=True):
+    """
+    Extract structured fields from resume text, locally where possible.
 
+    The deterministic extractor (ats/field_extractor.py) runs first; only
+    fields below LOCAL_PARSE_MIN_CONFIDENCE are requested from the LLM.
+    """
+    with span('local_parse'):
+        local, confidence = extract_resume_fields(resume_text)
+    unresolved = [field for field in FIELDS if confidence[field] < settings.LOCAL_PARSE_MIN_CONFIDENCE]
+    if not unresolved or not resume_text:
+        print(f"🔎 Resume parsed locally ({len(FIELDS)}/{len(FIELDS)} fields)")
+        return local
+
+    print(f"🔎 Resume parsed locally ({len(FIELDS) - len(unresolved)}/{len(FIELDS)} fields), "
+          f"asking the LLM for: {', '.join(unresolved)}")
+    llm_parsed = parse_resume_with_openai(resume_text, use_cache=use_cache, fields=unresolved)
+    parsed = dict(local)
+    for field in unresolved:
+        # Keep the local guess when the LLM has nothing better (or failed)
+        if llm_parsed.get(field):
+            parsed[field] = llm_parsed[field]
+    return parsed
 
-def parse_resume_with_openai(resume_text):
+
+def parse_resume_with_openai(resume_text, use_cache=True, fields=None):
+    """
+    Extract structured fields from resume text with the LLM.
+    Identical requests are answered from, and new responses stored in, the
+    LLM response cache unless use_cache is False. ``fields`` limits the request to some of
+    PARSE_FIELD_PROMPTS (default: all).
+    """
+    with span('llm_parse', fields=len(fields or PARSE_FIELD_PROMPTS)) as stage:
+        return _parse_resume_with_openai(resume_text, use_cache, fields, stage)
+
+
+def _parse_resume_with_openai(resume_text, use_cache, fields, stage):
     import json
     if not resume_text:
+        stage.outcome = 'skipped'
         return {'email': None, 'phone': None, 'skills': [], 'experience': 0, 'education': ''}
+    field_prompts = ', '.join(PARSE_FIELD_PROMPTS[field] for field in (fields or PARSE_FIELD_PROMPTS))
     prompt = f"""
-    You are a resume parser. Extract JSON with these fields: email (string or null), phone (string or null), skills (list of short lowercase strings), experience (number of years), education (string). Provide only valid JSON.
+    You are a resume parser. Extract JSON with these fields: {field_prompts}. Provide only valid JSON.
     Resume:\n""" + resume_text[:16000]
+    messages = [{'role': 'user', 'content': prompt}]
+    params = {'max_tokens': 500, 'temperature': 0}
+    fingerprint = prompt_fingerprint(PARSE_MODEL, messages, **params)
+
+    cached = get_cached_response(fingerprint) if use_cache else None
+    if cached is not None:
+        stage.outcome = 'cached'
+        return json.loads(cached)
+
     try:
-        # Use OpenRouter with DeepSeek R1 T2 Chimera (FREE version)
-        response = client.chat.completions.create(
-            model='tngtech/deepseek-r1t2-chimera:free',  # DeepSeek R1 reasoning model (FREE)
-            messages=[{'role':'user','content':prompt}],
-            max_tokens=500,
-            temperature=0,
-            timeout=25,  # 25 second timeout for parsing call
+        # Use OpenRouter with DeepSeek R1 T2 Chimera (FREE version); skipped while the circuit is open
+        response = openrouter_breaker.call(
+            client.chat.completions.create,
+            model=PARSE_MODEL,
+            messages=messages,
+            timeout=stage_timeout('parse'),  # parsing's share of the LLM latency budget
             extra_headers={
                 "HTTP-Referer": settings.OPENROUTER_APP_NAME,
                 "X-Title": settings.OPENROUTER_APP_NAME,
-            }
+            },
+            **params
         )
         text = response.choices[0].message.content
         # Parse the JSON response
         parsed = json.loads(text)
+        if use_cache:
+            store_response(fingerprint, PARSE_MODEL, text)
     except Exception as e:
         # Fallback: return default structure
         error_type = type(e).__name__
+        stage.outcome = 'skipped' if isinstance(e, CircuitOpenError) else 'fallback'
         print(f"Resume parsing error ({error_type}): {str(e)[:200]}")
         parsed = {'email': None, 'phone': None, 'skills': [], 'experience': 0, 'education': ''}
-    return parsed
\ No newline at end of file
+    return parsed
@@ -0,0 +1,189 @@
+"""
+Bounded PDF text extraction.
+
+Pages are streamed with pdfminer's ``extract_pages`` and extraction stops
+as soon as the text budget (the longest prompt slice downstream, 16,000
+characters) or the page cap is reached, so a 200-page portfolio costs no
+more than its first few pages.
+
+``extract_pdf`` runs the extraction in a child process
+(``python -m ats.pdf_extract``) with a wall-clock timeout and an address
+space limit, so a malformed or pathological PDF can only kill that child.
+``pool_extract`` is the same extraction as a task for the long-lived
+process pool in ats/extraction_service.py. This module does not import
+Django, so child processes stay lightweight.
+"""
+import argparse
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+
+
+# Directory containing the ats package, so the child can run ``-m ats.pdf_extract``
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Text-only layout analysis: no vertical text detection or figure text
+LAPARAMS = LAParams(detect_vertical=False, all_texts=False)
+
+
+def extract_bounded(source, max_chars=16000, max_pages=30):
+    """
+    Extract text page by page until max_chars or max_pages is reached.
+
+    Args:
+        source: Path or binary file object of the PDF
+        max_chars: Text budget; the result is cut to this length
+        max_pages: Maximum pages to lay out (0 for no limit)
+
+    Returns:
+        dict: {'text', 'pages', 'truncated', 'elapsed', 'error'}
+    """
+    started = time.perf_counter()
+    chunks = []
+    length = 0
+    pages = 0
+    truncated = False
+    error = None
+    try:
+        for page in extract_pages(source, maxpages=max_pages, laparams=LAPARAMS):
+            pages += 1
+            for element in page:
+                if isinstance(element, LTTextContainer):
+                    text = element.get_text() + '\n'  # same layout as pdfminer's extract_text()
+                    chunks.append(text)
+                    length += len(text)
+            chunks.append('\f')
+            if length >= max_chars:
+                truncated = True
+                break
+    except Exception as e:
+        error = f'{type(e).__name__}: {str(e)[:200]}'
+    text = ''.join(chunks)[:max_chars]
+    return {
+        'text': text if text.strip() else '',
+        'pages': pages,
+        'truncated': truncated,
+        'elapsed': round(time.perf_counter() - started, 3),
+        'error': error,
+    }
+
+
+def _limit_memory(memory_mb):
+    try:
+        import resource
+    except ImportError:  # Windows: no rlimits, the timeout still applies
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Raise TimeoutError in the main thread after ``seconds`` (POSIX only)."""
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def timed_out(signum, frame):
+        raise TimeoutError(f'Timed out after {seconds}s')
+
+    previous = signal.signal(signal.SIGALRM, timed_out)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def init_pool_worker(memory_mb):
+    """ProcessPoolExecutor initializer: cap the worker's address space."""
+    _limit_memory(memory_mb)
+
+
+def pool_extract(source, max_chars=16000, max_pages=30, timeout=20):
+    """
+    Process pool task. ``source`` is ``('path', path)`` or
+    ``('shm', name, size)`` for bytes in a SharedMemory block, so PDF bytes
+    are never pickled through the pool's pipes.
+    """
+    if source[0] == 'shm':
+        _, name, size = source
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            view = block.buf[:size]
+            pdf = io.BytesIO(view)  # one copy, in this process
+            view.release()
+        finally:
+            block.close()
+    else:
+        pdf = source[1]
+    started = time.perf_counter()
+    try:
+        with _time_limit(timeout):
+            return extract_bounded(pdf, max_chars, max_pages)
+    except TimeoutError as e:
+        # Raised outside pdfminer (e.g. while joining text); report like any other failure
+        return {'text': '', 'pages': 0, 'truncated': False,
+                'elapsed': round(time.perf_counter() - started, 3), 'error': str(e)}
+
+
+def extract_pdf(data, max_chars=16000, max_pages=30, timeout=20, memory_mb=512):
+    """
+    Extract text from PDF bytes in a resource-limited child process.
+
+    Args:
+        data: PDF file bytes
+        max_chars: Text budget
+        max_pages: Page cap
+        timeout: Wall-clock seconds before the child is killed
+        memory_mb: Address space limit of the child
+
+    Returns:
+        dict: as extract_bounded(); 'error' is set on failure, timeout or
+        memory exhaustion and 'text' is then empty
+    """
+    started = time.perf_counter()
+    command = [
+        sys.executable, '-m', 'ats.pdf_extract',
+        '--max-chars', str(max_chars), '--max-pages', str(max_pages), '--memory-mb', str(memory_mb),
+    ]
+    failure = {'text': '', 'pages': 0, 'truncated': False}
+    try:
+        completed = subprocess.run(command, input=data, capture_output=True, timeout=timeout, cwd=PROJECT_ROOT)
+    except subprocess.TimeoutExpired:
+        return {**failure, 'elapsed': round(time.perf_counter() - started, 3),
+                'error': f'Timed out after {timeout}s'}
+    if completed.returncode != 0:
+        stderr = completed.stderr.decode(errors='replace').strip().splitlines()
+        reason = 'MemoryError' if any('MemoryError' in line for line in stderr) else (stderr[-1] if stderr else '')
+        return {**failure, 'elapsed': round(time.perf_counter() - started, 3),
+                'error': f'Extractor exited with {completed.returncode}: {reason[:200]}'}
+    result = json.loads(completed.stdout)
+    result['elapsed'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extract bounded text from a PDF read on stdin; prints JSON.')
+    parser.add_argument('--max-chars', type=int, default=16000)
+    parser.add_argument('--max-pages', type=int, default=30)
+    parser.add_argument('--memory-mb', type=int, default=512)
+    args = parser.parse_args(argv)
+    data = sys.stdin.buffer.read()
+    _limit_memory(args.memory_mb)
+    result = extract_bounded(io.BytesIO(data), args.max_chars, args.max_pages)
+    sys.stdout.write(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
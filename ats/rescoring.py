@@ -0,0 +1,409 @@
+"""
+Batch rescoring of every candidate of a job.
+
+Candidates are loaded in chunks and scored together with NumPy instead of
+one fuzzy_score_resume() call each:
+
+* the job's compiled profile gives the term vector and weights once;
+* each chunk becomes a candidate x job-term boolean matrix, so exact-match
+  credit is a single matrix-vector product with the weight vector;
+* fuzzy similarities are computed once per distinct (job term, resume term)
+  pair in the chunk rather than once per candidate. A vectorized
+  character-count bound (the same bound as SequenceMatcher.quick_ratio)
+  discards almost every pair before an exact ratio() is computed, and the
+  best fuzzy credit per candidate comes from a vectorized max.
+
+Scores match fuzzy_score_resume / score_resume (weights are summed in
+integer hundredths, see keyword_percentage); only the tie-break between
+equally similar fuzzy partners may pick a different resume token. The
+job's scoring cascade thresholds are applied to the results, so a
+candidate stopped at the legacy or weighted tier gets the same
+keyword_score and score_tier as in the pipeline (cascade_score_resume).
+
+rescore_vocabulary_change() is the incremental variant for a newly
+published skill vocabulary: only candidates whose stored term sets contain
+a changed term get new term sets and scores, and only jobs whose compiled
+weights changed are rescored in full.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+
+import numpy as np
+from django.db import connection
+from django.utils import timezone
+
+from .advanced_scoring import PROFILE_VERSION, compile_job_profile, next_tier_allowed
+from .job_profiles import get_job_profile
+from .models import Candidate, JobPost, VocabularyVersion
+from .resume_terms import TERM_FIELDS, refresh_resume_terms, set_resume_terms
+from .search import index_candidates
+from .vocabulary import affected_terms, load_version, reload_vocabulary
+
+
+RESCORE_FIELDS = ['score', 'matched_keywords', 'missing_keywords', 'keyword_score', 'fuzzy_matches', 'score_tier',
+                  'vocab_version']
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CharCountIndex:
+    """
+    Character-count matrix over a vocabulary, giving quick_ratio() upper
+    bounds for one query token against every vocabulary token at once.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.lengths = np.array([len(token) for token in self.tokens], dtype=np.int32)
+        codes = np.frombuffer(''.join(self.tokens).encode('utf-32-le'), dtype=np.uint32)
+        self.alphabet, columns = np.unique(codes, return_inverse=True)
+        rows = np.repeat(np.arange(len(self.tokens)), self.lengths)
+        self.counts = np.zeros((len(self.tokens), len(self.alphabet)), dtype=np.int32)
+        np.add.at(self.counts, (rows, columns), 1)
+
+    def candidates(self, token, threshold):
+        """Vocabulary tokens whose quick_ratio() bound against token is >= threshold."""
+        if not self.tokens:
+            return []
+        codes = np.frombuffer(token.encode('utf-32-le'), dtype=np.uint32)
+        positions = np.minimum(np.searchsorted(self.alphabet, codes), len(self.alphabet) - 1)
+        known = positions[self.alphabet[positions] == codes]  # characters absent from the vocabulary add nothing
+        query = np.bincount(known, minlength=len(self.alphabet)).astype(np.int32)
+        total = self.lengths + len(token)
+        bound = 2.0 * np.minimum(self.counts, query).sum(axis=1) / total
+        return [self.tokens[k] for k in np.flatnonzero(bound >= threshold)]
+
+    def similar(self, token, threshold):
+        """
+        Yield (vocabulary_token, similarity) for every token with
+        SequenceMatcher(None, token, vocabulary_token).ratio() >= threshold.
+        """
+        for other in self.candidates(token, threshold):
+            similarity = SequenceMatcher(None, token, other).ratio()
+            if similarity >= threshold:
+                yield other, similarity
+
+
+def _membership_matrix(token_sets, columns):
+    """Boolean matrix M[i, j] = columns[j] in token_sets[i]."""
+    column_index = {token: j for j, token in enumerate(columns)}
+    column_set = set(column_index)
+    matrix = np.zeros((len(token_sets), len(columns)), dtype=bool)
+    for i, tokens in enumerate(token_sets):
+        present = [column_index[token] for token in column_set.intersection(tokens)]
+        matrix[i, present] = True
+    return matrix
+
+
+def score_token_sets(profile, term_sets, legacy_sets, fuzzy_threshold=0.85, thresholds=None):
+    """
+    Score many candidates against one compiled job profile.
+
+    Args:
+        profile: Compiled job profile (see compile_job_profile)
+        term_sets: Per candidate, the set of normalized, stop-word-filtered terms
+        legacy_sets: Per candidate, the set of raw tokens (legacy score_resume)
+        fuzzy_threshold: Minimum similarity for fuzzy credit
+        thresholds: Scoring cascade thresholds (JobPost.get_cascade_thresholds);
+            None scores every candidate through the fuzzy tier
+
+    Returns:
+        list of dicts with the Candidate fields in RESCORE_FIELDS
+    """
+    job_terms = list(profile['weights'])
+    weights = np.array([profile['weights'][term] for term in job_terms], dtype=np.int64)
+    total_weight = profile['total_weight']
+    n = len(term_sets)
+
+    # Exact matches: candidate x job-term matrix times the weight vector
+    exact = _membership_matrix(term_sets, job_terms)
+
+    # Fuzzy matches: similarities per distinct (job term, resume term) pair in the batch
+    vocabulary = set().union(*term_sets) if term_sets else set()
+    index = CharCountIndex(sorted(vocabulary))
+    fuzzy_pairs = {}
+    for j, term in enumerate(job_terms):
+        if exact[:, j].all():
+            continue
+        pairs = [(other, round(similarity, 2)) for other, similarity in index.similar(term, fuzzy_threshold)]
+        if pairs:
+            fuzzy_pairs[j] = pairs
+    fuzzy_columns = sorted({other for pairs in fuzzy_pairs.values() for other, _ in pairs})
+    fuzzy_membership = _membership_matrix(term_sets, fuzzy_columns)
+    fuzzy_column_index = {token: k for k, token in enumerate(fuzzy_columns)}
+
+    best_similarity = np.zeros((n, len(job_terms)))
+    best_partner = {}
+    for j, pairs in fuzzy_pairs.items():
+        columns = [fuzzy_column_index[other] for other, _ in pairs]
+        similarities = np.array([similarity for _, similarity in pairs])
+        candidate_scores = fuzzy_membership[:, columns] * similarities
+        best_similarity[:, j] = candidate_scores.max(axis=1)
+        best_partner[j] = (candidate_scores.argmax(axis=1), [other for other, _ in pairs])
+    best_similarity[exact] = 0
+
+    # Weights in hundredths, truncated like keyword_percentage (exact matches earn 100)
+    exact_weight = exact.astype(np.int64) @ weights * 100
+    # Similarities are already rounded to two places: rint recovers similarity_credit exactly
+    matched_weight = exact_weight + np.rint(best_similarity * 100).astype(np.int64) @ weights
+    if total_weight > 0:
+        weighted_scores = exact_weight // total_weight
+        keyword_scores = matched_weight // total_weight
+    else:
+        weighted_scores = keyword_scores = np.zeros(n, int)
+
+    # Legacy score: plain token overlap
+    legacy_terms = profile['legacy_tokens']
+    legacy = _membership_matrix(legacy_sets, legacy_terms)
+    legacy_counts = legacy.sum(axis=1)
+
+    results = []
+    for i in range(n):
+        legacy_score = int(100 * legacy_counts[i] / len(legacy_terms)) if legacy_terms else 0
+        matched = [term for term, present in zip(legacy_terms, legacy[i]) if present]
+        missing = [term for term, present in zip(legacy_terms, legacy[i]) if not present]
+        fields = {
+            'score': legacy_score,
+            'matched_keywords': ", ".join(matched[:50]),
+            'missing_keywords': ", ".join(missing[:50]),
+            'vocab_version': profile['vocab_version'],
+        }
+        # Same early exits as cascade_score_resume
+        if not next_tier_allowed('legacy', legacy_score, thresholds):
+            results.append({**fields, 'keyword_score': legacy_score, 'fuzzy_matches': {}, 'score_tier': 'legacy'})
+            continue
+        if not next_tier_allowed('weighted', int(weighted_scores[i]), thresholds):
+            results.append({**fields, 'keyword_score': int(weighted_scores[i]), 'fuzzy_matches': {},
+                            'score_tier': 'weighted'})
+            continue
+
+        fuzzy_matches = {}
+        for j in np.flatnonzero(best_similarity[i]):
+            partner_index, partners = best_partner[j]
+            fuzzy_matches[job_terms[j]] = {
+                'matched_to': partners[partner_index[i]],
+                'similarity': float(best_similarity[i, j]),
+            }
+        results.append({**fields, 'keyword_score': int(keyword_scores[i]), 'fuzzy_matches': fuzzy_matches,
+                        'score_tier': 'fuzzy'})
+    return results
+
+
+def backfill_resume_text(job_id):
+    """
+    Extract the text of a job's candidates whose resume file was never
+    extracted, concurrently on the extraction process pool.
+
+    Returns:
+        int: Candidates whose resume_text was filled in
+    """
+    from .extraction_service import get_extraction_service
+
+    candidates = list(
+        Candidate.objects
+        .filter(job_id=job_id, resume_text='')
+        .exclude(resume_file='')
+        .exclude(resume_file__isnull=True)
+        .only('id', 'resume_file')
+    )
+    if not candidates:
+        return 0
+    service = get_extraction_service()
+    with ThreadPoolExecutor(max_workers=service.max_workers) as threads:
+        texts = list(threads.map(_extract_candidate_text, [c.resume_file.name for c in candidates]))
+    filled = []
+    for candidate, text in zip(candidates, texts):
+        if text:
+            candidate.resume_text = text
+            set_resume_terms(candidate)
+            filled.append(candidate)
+    Candidate.objects.bulk_update(filled, ['resume_text', *TERM_FIELDS], batch_size=500)
+    index_candidates([c.pk for c in filled])
+    return len(filled)
+
+
+def _extract_candidate_text(stored_name):
+    from .ingest import extract_stored_text
+
+    try:
+        return extract_stored_text(stored_name)
+    except OSError:
+        return ''  # Missing file
+    finally:
+        connection.close()
+
+
+def rescore_job(job_id, chunk_size=2000, fuzzy_threshold=0.85, candidate_ids=None):
+    """
+    Recompute the keyword scores of every candidate of a job from their
+    stored term sets, first extracting any resumes that have no text yet
+    and rebuilding stale term sets.
+
+    Args:
+        job_id: JobPost primary key
+        chunk_size: Candidates loaded, scored and written per batch
+        fuzzy_threshold: Minimum similarity for fuzzy credit
+        candidate_ids: Only rescore these candidates of the job (no resume
+            text backfill)
+
+    Returns:
+        dict: {'job_id', 'extracted', 'terms_refreshed', 'candidates', 'updated', 'elapsed',
+        'candidates_per_sec'}
+    """
+    started = time.perf_counter()
+    job = JobPost.objects.get(pk=job_id)
+    profile = get_job_profile(job)
+    thresholds = job.get_cascade_thresholds()
+    candidates = Candidate.objects.filter(job_id=job_id)
+    if candidate_ids is not None:
+        candidates = candidates.filter(pk__in=candidate_ids)
+    extracted = backfill_resume_text(job_id) if candidate_ids is None else 0
+    terms_refreshed = refresh_resume_terms(candidates)
+    queryset = (
+        candidates
+        .exclude(resume_text='')
+        .only('id', 'resume_terms', 'resume_tokens', *RESCORE_FIELDS)
+        .order_by('pk')
+    )
+
+    rescored = 0
+    updated = 0
+    for chunk in _chunked(queryset.iterator(chunk_size=chunk_size), chunk_size):
+        term_sets = [set(c.resume_terms) for c in chunk]
+        legacy_sets = [set(c.resume_tokens) for c in chunk]
+        changed = []
+        results = score_token_sets(profile, term_sets, legacy_sets, fuzzy_threshold, thresholds)
+        for candidate, fields in zip(chunk, results):
+            if candidate.score_tier == 'ai' and fields['score_tier'] == 'fuzzy' and next_tier_allowed(
+                    'fuzzy', fields['keyword_score'], thresholds):
+                fields['score_tier'] = 'ai'  # the AI analysis still decides
+            # Only write rows whose scores actually moved
+            if any(getattr(candidate, field) != value for field, value in fields.items()):
+                for field, value in fields.items():
+                    setattr(candidate, field, value)
+                changed.append(candidate)
+        Candidate.objects.bulk_update(changed, RESCORE_FIELDS, batch_size=500)
+        rescored += len(chunk)
+        updated += len(changed)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'job_id': job_id,
+        'extracted': extracted,
+        'terms_refreshed': terms_refreshed,
+        'candidates': rescored,
+        'updated': updated,
+        'elapsed': round(elapsed, 3),
+        'candidates_per_sec': round(rescored / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _profile_changed(job, old_vocabulary, new_profile):
+    """Whether a job's compiled weights differ between the old vocabulary and new_profile."""
+    old_profile = compile_job_profile(job.get_scoring_text(), old_vocabulary)
+    return old_profile['weights'] != new_profile['weights']
+
+
+def _refresh_affected_terms(candidate_ids, chunk_size):
+    """Recompute the term fields of candidates from their resume_text."""
+    for chunk_ids in _chunked(candidate_ids, chunk_size):
+        chunk = list(Candidate.objects.filter(pk__in=chunk_ids).only('id', 'resume_text'))
+        for candidate in chunk:
+            set_resume_terms(candidate)
+        Candidate.objects.bulk_update(chunk, TERM_FIELDS, batch_size=500)
+
+
+def rescore_vocabulary_change(to_version=None, chunk_size=2000, fuzzy_threshold=0.85):
+    """
+    Bring every scored candidate up to a skill vocabulary version, touching
+    as few candidates as possible.
+
+    For each older version candidates are stamped with (including 0, the
+    built-in defaults, for scored candidates), the two versions are diffed
+    (affected_terms). Candidates whose stored term sets contain a term
+    affected since the vocabulary they were built with (terms_vocab_version),
+    or are from an older PROFILE_VERSION, get new term sets; the other sets
+    are unchanged by construction and are restamped. Jobs whose compiled
+    weights changed (priority edits, or their own text contains a changed
+    term) are rescored in full; elsewhere only candidates with new term sets
+    or a term affected since they were scored are rescored. Every other
+    candidate's score is unchanged and is only restamped with the new version.
+
+    Args:
+        to_version: VocabularyVersion.number (default: the latest)
+        chunk_size: Candidates loaded and written per batch
+        fuzzy_threshold: Minimum similarity for fuzzy credit
+
+    Returns:
+        dict: {'version', 'from_versions', 'candidates', 'affected', 'jobs_rescored',
+        'jobs_partial', 'restamped', 'elapsed'}
+    """
+    started = time.perf_counter()
+    new = reload_vocabulary()
+    to_version = new.version if to_version is None else to_version
+    if to_version != new.version:
+        raise ValueError(f"Vocabulary v{to_version} is not the live version (v{new.version})")
+
+    # Version 0 is also the stamp of never-scored rows: those have no term sets yet
+    stale = Candidate.objects.filter(vocab_version__lt=to_version).exclude(vocab_version=0, terms_version=0)
+    from_versions = sorted(set(stale.values_list('vocab_version', flat=True).distinct()))
+    report = {'version': to_version, 'from_versions': from_versions, 'candidates': 0, 'affected': 0,
+              'jobs_rescored': 0, 'jobs_partial': 0, 'restamped': 0}
+    diffs = {}  # old version -> affected terms, or None if the version is unknown
+
+    def affected_since(version):
+        if version not in diffs:
+            old = load_version(version)
+            diffs[version] = affected_terms(old, new) if old is not None else None
+        return diffs[version]
+
+    for from_version in from_versions:
+        old = load_version(from_version)
+        terms = affected_since(from_version)
+        candidates = stale.filter(vocab_version=from_version)
+
+        # Scan the stored term sets; None (unknown old version) affects everyone
+        refresh = []
+        affected = {}  # job_id -> [candidate ids]
+        scanned = 0
+        rows = candidates.exclude(resume_text='').values_list(
+            'id', 'job_id', 'resume_terms', 'terms_version', 'terms_vocab_version')
+        for candidate_id, job_id, resume_terms, terms_version, terms_vocab_version in (
+                rows.order_by('pk').iterator(chunk_size=chunk_size)):
+            scanned += 1
+            built_with = affected_since(terms_vocab_version) if terms_vocab_version != to_version else set()
+            if terms_version != PROFILE_VERSION or built_with is None or not built_with.isdisjoint(resume_terms):
+                refresh.append(candidate_id)
+            elif terms is not None and terms.isdisjoint(resume_terms):
+                continue
+            affected.setdefault(job_id, []).append(candidate_id)
+        _refresh_affected_terms(refresh, chunk_size)
+        # The remaining term sets are what the new vocabulary would build
+        candidates.filter(terms_version=PROFILE_VERSION).update(terms_vocab_version=to_version)
+        report['candidates'] += scanned
+        report['affected'] += sum(len(ids) for ids in affected.values())
+
+        job_ids = set(candidates.exclude(job__isnull=True).values_list('job_id', flat=True).distinct())
+        for job in JobPost.objects.filter(pk__in=job_ids).order_by('pk'):
+            profile = get_job_profile(job)
+            if old is None or _profile_changed(job, old, profile):
+                rescore_job(job.pk, chunk_size, fuzzy_threshold)
+                report['jobs_rescored'] += 1
+            elif affected.get(job.pk):
+                rescore_job(job.pk, chunk_size, fuzzy_threshold, candidate_ids=affected[job.pk])
+                report['jobs_partial'] += 1
+        report['restamped'] += candidates.update(vocab_version=to_version)
+
+    VocabularyVersion.objects.filter(number=to_version).update(rescored_at=timezone.now())
+    report['elapsed'] = round(time.perf_counter() - started, 3)
+    return report
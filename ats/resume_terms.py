@@ -0,0 +1,101 @@
+"""
+Precomputed resume term sets.
+
+Keyword scoring only needs two sets from a resume: its normalized,
+stop-word-filtered terms (extract_terms, including phrase-matched skills)
+and its raw tokens (legacy score_resume). Both are computed once, when the
+resume text is stored, and kept on the Candidate as sorted JSON lists, so
+scoring and rescoring never re-tokenize resume_text.
+
+The hashed term vector used for semantic pre-ranking (ats/embeddings.py)
+is built at the same time and stored next to the sets.
+
+Rows are stamped with PROFILE_VERSION, EMBEDDING_VERSION and the skill
+vocabulary version (terms_vocab_version): synonyms and phrases decide the
+terms, so sets built with another vocabulary are stale too. When
+tokenization, the vectors or the vocabulary change, stale rows are
+recomputed by refresh_resume_terms() or the backfill_resume_terms command;
+after a vocabulary publish rescoring.rescore_vocabulary_change() recomputes
+only the sets the change can affect and restamps the rest.
+"""
+from .advanced_scoring import PROFILE_VERSION, extract_terms
+from .embeddings import EMBEDDING_VERSION, compute_embedding
+from .models import Candidate
+from .scoring import tokenize
+from .vocabulary import get_vocabulary
+
+
+TERM_FIELDS = ['resume_terms', 'resume_tokens', 'terms_version', 'terms_vocab_version', 'embedding', 'embedding_version']
+
+
+def compute_resume_terms(resume_text):
+    """
+    Candidate field values for a resume text.
+
+    Returns:
+        dict: {'resume_terms': sorted terms, 'resume_tokens': sorted raw tokens,
+        'terms_version': PROFILE_VERSION, 'terms_vocab_version', 'embedding',
+        'embedding_version'}
+    """
+    vocabulary = get_vocabulary()
+    return {
+        'resume_terms': sorted(extract_terms(resume_text, vocabulary)),
+        'resume_tokens': sorted(set(tokenize(resume_text or ''))),
+        'terms_version': PROFILE_VERSION,
+        'terms_vocab_version': vocabulary.version,
+        **compute_embedding(resume_text),
+    }
+
+
+def set_resume_terms(candidate):
+    """Fill a Candidate's term fields from its resume_text (not saved)."""
+    for field, value in compute_resume_terms(candidate.resume_text).items():
+        setattr(candidate, field, value)
+
+
+def candidate_term_sets(candidate):
+    """
+    (terms, legacy tokens) of a candidate as sets, from the stored lists
+    when they are current (same PROFILE_VERSION and vocabulary version),
+    otherwise from resume_text.
+    """
+    if candidate.terms_version == PROFILE_VERSION and candidate.terms_vocab_version == get_vocabulary().version:
+        return set(candidate.resume_terms), set(candidate.resume_tokens)
+    fields = compute_resume_terms(candidate.resume_text)
+    return set(fields['resume_terms']), set(fields['resume_tokens'])
+
+
+def refresh_resume_terms(queryset=None, chunk_size=500):
+    """
+    Recompute term fields for candidates whose stored sets or vector are
+    missing or from another PROFILE_VERSION, EMBEDDING_VERSION or
+    vocabulary version.
+
+    Args:
+        queryset: Candidates to consider (default: all)
+        chunk_size: Rows loaded and written per batch
+
+    Returns:
+        int: Candidates updated
+    """
+    queryset = Candidate.objects.all() if queryset is None else queryset
+    stale = (
+        queryset
+        .exclude(terms_version=PROFILE_VERSION, terms_vocab_version=get_vocabulary().version,
+                 embedding_version=EMBEDDING_VERSION)
+        .exclude(resume_text='')
+        .only('id', 'resume_text')
+        .order_by('pk')
+    )
+    updated = 0
+    last_pk = 0
+    while True:
+        # Keyset batches: updated rows drop out of the stale filter
+        chunk = list(stale.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return updated
+        for candidate in chunk:
+            set_resume_terms(candidate)
+        Candidate.objects.bulk_update(chunk, TERM_FIELDS, batch_size=chunk_size)
+        updated += len(chunk)
+        last_pk = chunk[-1].pk
@@ -3,12 +3,14 @@ import re
 def tokenize(text):
     return re.findall(r'\w+', text.lower())
 
-def score_resume(resume_text, job_description):
-    job_tokens = set(tokenize(job_description))
-    resume_tokens = set(tokenize(resume_text))
+def score_resume(resume_text, job_description, job_tokens=None, resume_tokens=None):
+    # job_tokens: precomputed set(tokenize(job_description)), e.g. a job profile's legacy_tokens
+    # resume_tokens: precomputed set(tokenize(resume_text)), e.g. Candidate.resume_tokens
+    job_tokens = set(job_tokens) if job_tokens is not None else set(tokenize(job_description))
+    resume_tokens = set(resume_tokens) if resume_tokens is not None else set(tokenize(resume_text))
     matched = job_tokens & resume_tokens
     missing = job_tokens - resume_tokens
     if not job_tokens:
         return 0, [], []
     score = int(100 * len(matched) / len(job_tokens))
-    return score, list(matched), list(missing)
+    return score, sorted(matched), sorted(missing)
@@ -0,0 +1,111 @@
+"""
+Full-text candidate search over resume_text, skills and education.
+
+On PostgreSQL the index is the ``Candidate.search_vector`` tsvector column
+(GIN indexed); on SQLite it is the ``ats_candidate_fts`` FTS5 table. Both
+are created by migration 0008 and kept up to date when candidates are
+saved (signals) or bulk ingested, never at query time. Other databases
+fall back to name/email substring search.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Candidate
+
+
+SEARCH_INDEXED_FIELDS = {'resume_text', 'skills', 'education'}
+FTS_TABLE = 'ats_candidate_fts'
+# Best matches paged by offset when results are ordered by relevance
+SEARCH_RESULT_LIMIT = 500
+
+
+def _postgres_vector():
+    return (
+        SearchVector(Cast('skills', TextField()), weight='A', config='english')
+        + SearchVector('education', weight='B', config='english')
+        + SearchVector('resume_text', weight='C', config='english')
+    )
+
+
+def index_candidates(candidate_ids):
+    """
+    (Re)build the search index entries for the given candidates.
+    """
+    candidate_ids = list(candidate_ids)
+    if not candidate_ids:
+        return
+    if connection.vendor == 'postgresql':
+        Candidate.objects.filter(pk__in=candidate_ids).update(search_vector=_postgres_vector())
+    elif connection.vendor == 'sqlite':
+        placeholders = ', '.join(['%s'] * len(candidate_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', candidate_ids)
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, resume_text, skills, education) '
+                f'SELECT id, resume_text, skills, education FROM ats_candidate WHERE id IN ({placeholders})',
+                candidate_ids,
+            )
+
+
+def unindex_candidates(candidate_ids):
+    """Remove deleted candidates from the SQLite index (Postgres rows go with the table)."""
+    candidate_ids = list(candidate_ids)
+    if candidate_ids and connection.vendor == 'sqlite':
+        placeholders = ', '.join(['%s'] * len(candidate_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', candidate_ids)
+
+
+def _fts5_query(query):
+    """Quote each word so user input can't break FTS5 query syntax."""
+    terms = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def search_candidates(queryset, query):
+    """
+    Filter a Candidate queryset by a search query, best matches first.
+
+    Matches name/email substrings plus the full-text index. The queryset is
+    annotated with ``search_rank`` (higher is better).
+    """
+    name_or_email = Q(name__icontains=query) | Q(email__icontains=query)
+
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(query, search_type='websearch', config='english')
+        return (
+            queryset
+            .annotate(search_rank=SearchRank(F('search_vector'), search_query))
+            .filter(Q(search_vector=search_query) | name_or_email)
+            .order_by('-search_rank', '-created_at')
+        )
+
+    if connection.vendor == 'sqlite':
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return queryset.filter(name_or_email).annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # Matching and ranking stay in SQL, so the queryset's own filters apply to every match.
+        # bm25() is lower-is-better; columns weighted like Postgres (skills > education > text)
+        table = Candidate._meta.db_table
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query])
+        # LIMIT -1 keeps SQLite from flattening the ranked matches into the correlated
+        # subquery: they are computed once and looked up through an automatic index
+        rank = RawSQL(
+            f'SELECT hit.rank FROM (SELECT rowid AS id, -bm25({FTS_TABLE}, 1.0, 4.0, 2.0) AS rank '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT -1) AS hit WHERE hit.id = "{table}"."id"',
+            [fts_query],
+            output_field=FloatField(),
+        )
+        return (
+            queryset
+            .filter(Q(pk__in=matches) | name_or_email)
+            .annotate(search_rank=Coalesce(rank, Value(0.0)))
+            .order_by('-search_rank', '-created_at')
+        )
+
+    return queryset.filter(name_or_email).annotate(search_rank=Value(0.0, output_field=FloatField()))
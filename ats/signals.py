@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Application, Candidate, JobPost
+from .search import SEARCH_INDEXED_FIELDS, index_candidates, unindex_candidates
+from .stats import bump_stat, invalidate_recent_jobs
+
+
+@receiver(post_save, sender=Candidate)
+def update_candidate_search_index(sender, instance, update_fields=None, **kwargs):
+    # Skip saves that don't touch indexed fields (e.g. status changes)
+    if update_fields is None or SEARCH_INDEXED_FIELDS.intersection(update_fields):
+        index_candidates([instance.pk])
+
+
+@receiver(post_delete, sender=Candidate)
+def remove_candidate_search_index(sender, instance, **kwargs):
+    unindex_candidates([instance.pk])
+
+
+# Dashboard counters (ats/stats.py)
+
+@receiver(post_save, sender=Candidate)
+def count_created_candidate(sender, instance, created, **kwargs):
+    if created:
+        bump_stat('total_candidates')
+
+
+@receiver(post_delete, sender=Candidate)
+def count_deleted_candidate(sender, instance, **kwargs):
+    bump_stat('total_candidates', -1)
+
+
+@receiver(post_save, sender=JobPost)
+def count_saved_job(sender, instance, created, **kwargs):
+    if created:
+        bump_stat('total_jobs')
+    invalidate_recent_jobs()
+
+
+@receiver(post_delete, sender=JobPost)
+def count_deleted_job(sender, instance, **kwargs):
+    bump_stat('total_jobs', -1)
+    invalidate_recent_jobs()
+
+
+@receiver(post_init, sender=Application)
+def remember_application_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field isn't fetched
+    instance._saved_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Application)
+def count_application_status(sender, instance, created, **kwargs):
+    if created:
+        bump_stat(f'applications_{instance.status}')
+        invalidate_recent_jobs()
+    elif instance._saved_status and instance.status != instance._saved_status:
+        bump_stat(f'applications_{instance._saved_status}', -1)
+        bump_stat(f'applications_{instance.status}')
+    instance._saved_status = instance.status
+
+
+@receiver(post_delete, sender=Application)
+def count_deleted_application(sender, instance, **kwargs):
+    bump_stat(f'applications_{instance.status}', -1)
+    invalidate_recent_jobs()
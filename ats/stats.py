@@ -0,0 +1,83 @@
+"""
+Dashboard statistics, cached.
+
+The counters come from a count per table and one conditional aggregate
+over application statuses, and are stored as individual cache keys, so
+signals (ats/signals.py) and bulk ingest can adjust them with atomic
+``cache.incr`` calls as rows are created, deleted or change status. Keys expire after DASHBOARD_STATS_TTL seconds; a missing
+key makes the next read recompute everything, which bounds any drift (for
+example from queryset.update(), which sends no signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Application, Candidate, JobPost
+
+
+STATS_KEY_PREFIX = 'ats:dashboard:'
+RECENT_JOBS_KEY = STATS_KEY_PREFIX + 'recent_jobs'
+STAT_NAMES = ['total_jobs', 'total_candidates'] + [
+    f'applications_{status}' for status, _ in Application.STATUS_CHOICES
+]
+
+
+def _key(name):
+    return STATS_KEY_PREFIX + name
+
+
+def compute_dashboard_stats():
+    """All dashboard counters: a count per table, application statuses in one aggregate."""
+    stats = Application.objects.aggregate(**{
+        f'applications_{status}': Count('pk', filter=Q(status=status))
+        for status, _ in Application.STATUS_CHOICES
+    })
+    stats['total_jobs'] = JobPost.objects.count()
+    stats['total_candidates'] = Candidate.objects.count()
+    return {name: stats[name] for name in STAT_NAMES}
+
+
+def get_dashboard_stats():
+    """
+    Cached dashboard counters, recomputed when any key is missing.
+
+    Returns:
+        dict: total_jobs, total_candidates and applications_<status> counts
+    """
+    cached = cache.get_many([_key(name) for name in STAT_NAMES])
+    if len(cached) == len(STAT_NAMES):
+        return {name: cached[_key(name)] for name in STAT_NAMES}
+    stats = compute_dashboard_stats()
+    cache.set_many({_key(name): value for name, value in stats.items()}, settings.DASHBOARD_STATS_TTL)
+    return stats
+
+
+def get_recent_jobs(limit=5):
+    """The newest jobs with their application counts, cached until jobs or applications change."""
+    jobs = cache.get(RECENT_JOBS_KEY)
+    if jobs is None:
+        jobs = list(
+            JobPost.objects
+            .annotate(num_applications=Count('applications'))
+            .order_by('-created_at')[:limit]
+        )
+        cache.set(RECENT_JOBS_KEY, jobs, settings.DASHBOARD_STATS_TTL)
+    return jobs
+
+
+def _incr(name, delta):
+    try:
+        cache.incr(_key(name), delta)
+    except ValueError:
+        pass  # Not cached (expired or never computed); the next read recomputes it
+
+
+def bump_stat(name, delta=1):
+    """Adjust a cached counter once the current transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: _incr(name, delta))
+
+
+def invalidate_recent_jobs():
+    transaction.on_commit(lambda: cache.delete(RECENT_JOBS_KEY))
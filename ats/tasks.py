@@ -1,13 +1,305 @@
-from celery import shared_task
-from .models import Application, Candidate
-from .parsers import extract_text_from_file, parse_resume_with_openai
-from .utils import compute_score
-from django.core.files.storage import default_storage
-import tempfile
+"""
+Resume processing pipeline.
+
+Uploads are saved immediately and processed here as a Celery chain:
+
+    extract text -> parse fields -> keyword score -> AI score
+
+Every stage records its progress in ``Candidate.processing_status`` so the
+candidate detail page can show where a resume is. With no broker configured
+the chain runs eagerly in-process (see CELERY_* in settings).
+"""
+from celery import Task, chain, shared_task
+from django.conf import settings
+from django.db import transaction
+
+from .models import Application, Candidate, JobPost
+from .parsers import extract_text_from_upload, parse_resume_text
+from .advanced_scoring import ai_semantic_match, cascade_score_resume, next_tier_allowed, summarize_ai_analysis
+from .duplicates import link_duplicate, resume_matches, reusable_parse
+from .embeddings import rank_candidates
+from .ingest import format_ingest_report, ingest_stored_resumes
+from .job_profiles import get_job_profile
+from .metrics import span
+from .rescoring import rescore_job, rescore_vocabulary_change
+from .resume_terms import candidate_term_sets, compute_resume_terms
+from .search import index_candidates
+
+
+class PipelineError(Exception):
+    """A pipeline stage could not complete for this candidate."""
+
+
+class PipelineTask(Task):
+    """Marks the candidate as failed when any stage raises."""
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        candidate_id = args[0] if args else kwargs.get('candidate_id')
+        print(f"❌ Pipeline stage {self.name} failed for candidate {candidate_id}: {exc}")
+        Candidate.objects.filter(pk=candidate_id).update(
+            processing_status='failed',
+            processing_error=str(exc)[:500],
+        )
+
+
+def _set_stage(candidate_id, stage, **fields):
+    Candidate.objects.filter(pk=candidate_id).update(processing_status=stage, **fields)
+
+
+@shared_task(base=PipelineTask)
+def extract_resume_text(candidate_id):
+    """Stage 1: pull the text out of the stored resume file."""
+    _set_stage(candidate_id, 'extracting')
+    candidate = Candidate.objects.get(pk=candidate_id)
+    if not candidate.resume_file:
+        raise PipelineError('No resume file uploaded.')
+    with candidate.resume_file.open('rb') as fh:
+        text = extract_text_from_upload(fh, candidate.resume_file.name)
+    if not text:
+        raise PipelineError('Failed to extract text from resume. Please check the PDF file.')
+    with span('save', candidate_id=candidate_id):
+        Candidate.objects.filter(pk=candidate_id).update(resume_text=text, **compute_resume_terms(text))
+        index_candidates([candidate_id])  # update() sends no post_save
+    print(f"✅ Resume text extracted: {len(text)} characters")
+
+    candidate.resume_text = text
+    candidate.minhash = None  # new text, new signature
+    with span('dedup', candidate_id=candidate_id):
+        match = link_duplicate(candidate)
+    if match:
+        print(f"♻️ Candidate {candidate_id} duplicates candidate {candidate.duplicate_of_id} ({match['reason']} match)")
+    return candidate_id
+
+
+@shared_task(base=PipelineTask)
+def parse_resume_fields(candidate_id):
+    """Stage 2: parse contact details, skills, experience and education (local extractor, then LLM)."""
+    _set_stage(candidate_id, 'parsing')
+    candidate = Candidate.objects.select_related('duplicate_of').get(pk=candidate_id)
+    original = candidate.duplicate_of
+    # Only a resume match may reuse the parse: an email/phone match can be a different resume
+    parsed = reusable_parse(original.pk) if original is not None and resume_matches(candidate, original) else None
+    if parsed is not None:
+        print(f"♻️ Reusing parse results of candidate {candidate.duplicate_of_id}")
+    else:
+        parsed = parse_resume_text(candidate.resume_text)
+
+    # Use parsed data if available, otherwise keep form data
+    if not candidate.email and parsed.get('email'):
+        candidate.email = parsed['email']
+    if not candidate.phone and parsed.get('phone'):
+        candidate.phone = parsed['phone']
+    if parsed.get('skills'):
+        candidate.skills = parsed['skills']
+    if parsed.get('experience'):
+        candidate.experience_years = parsed['experience']
+    if parsed.get('education'):
+        candidate.education = parsed['education']
+    with span('save', candidate_id=candidate_id):
+        candidate.save(update_fields=['email', 'phone', 'skills', 'experience_years', 'education'])
+    # Index the parsed contact details; links by email/phone if the resume matched nothing
+    with span('dedup', candidate_id=candidate_id):
+        link_duplicate(candidate)
+    return candidate_id
+
+
+@shared_task(base=PipelineTask)
+def score_keywords(candidate_id):
+    """
+    Stage 3: keyword tiers of the scoring cascade (legacy, weighted, fuzzy),
+    stopping early below the job's thresholds.
+    """
+    _set_stage(candidate_id, 'scoring')
+    # Scored from the stored term sets; resume_text is only loaded if they are stale
+    candidate = Candidate.objects.select_related('job').defer('resume_text').get(pk=candidate_id)
+    if candidate.job is None:
+        return candidate_id
+    profile = get_job_profile(candidate.job)
+    resume_terms, resume_tokens = candidate_term_sets(candidate)
+
+    result = cascade_score_resume(
+        None, candidate.job.get_scoring_text(), candidate.job.get_cascade_thresholds(),
+        use_ai=False, profile=profile, resume_terms=resume_terms, resume_tokens=resume_tokens,
+    )
+    # Legacy scoring (backward compatibility)
+    candidate.score = result['legacy_score']
+    candidate.matched_keywords = ", ".join(result['matched_keywords'][:50])
+    candidate.missing_keywords = ", ".join(result['missing_keywords'][:50])
+    candidate.keyword_score = result['keyword_score']
+    candidate.fuzzy_matches = result['fuzzy_matches']
+    candidate.score_tier = result['score_tier']
+    candidate.vocab_version = profile['vocab_version']
+    with span('save', candidate_id=candidate_id):
+        candidate.save(update_fields=['score', 'matched_keywords', 'missing_keywords', 'keyword_score',
+                                      'fuzzy_matches', 'score_tier', 'vocab_version'])
+    print(f"✅ Legacy score: {candidate.score}% | Keyword score: {candidate.keyword_score}% ({candidate.score_tier} tier)")
+    return candidate_id
+
+
+@shared_task(base=PipelineTask)
+def score_with_ai(candidate_id):
+    """Stage 4: AI semantic match. Failures keep the keyword scores."""
+    _set_stage(candidate_id, 'ai_scoring')
+    candidate = Candidate.objects.select_related('job', 'duplicate_of').get(pk=candidate_id)
+    if candidate.job is None or not settings.OPENROUTER_API_KEY:
+        _set_stage(candidate_id, 'complete')
+        return candidate_id
+    if candidate.score_tier != 'fuzzy' or not next_tier_allowed(
+            'fuzzy', candidate.keyword_score, candidate.job.get_cascade_thresholds()):
+        # The cascade stopped at a keyword tier: not a plausible fit, no LLM call
+        print(f"⏭️ AI analysis skipped: decided by the {candidate.score_tier} tier ({candidate.keyword_score}%)")
+        _set_stage(candidate_id, 'complete')
+        return candidate_id
+
+    original = candidate.duplicate_of
+    if (original is not None and original.job_id == candidate.job_id and original.ai_grade
+            and resume_matches(candidate, original)):
+        # Same resume, same job: the earlier analysis stands
+        with span('save', candidate_id=candidate_id):
+            _set_stage(candidate_id, 'complete', ai_score=original.ai_score, ai_grade=original.ai_grade,
+                       ai_reasoning=original.ai_reasoning, score_tier='ai')
+        print(f"♻️ Reused AI analysis of candidate {original.pk}")
+        return candidate_id
+
+    ai_analysis = ai_semantic_match(candidate.resume_text, candidate.job.get_scoring_text(), candidate.name)
+    if 'error' in ai_analysis:
+        print(f"⚠️ AI analysis failed: {ai_analysis['error']}")
+        _set_stage(candidate_id, 'complete', processing_error=f"AI analysis failed: {ai_analysis['error']}")
+        return candidate_id
+
+    with span('save', candidate_id=candidate_id):
+        _set_stage(
+            candidate_id,
+            'complete',
+            ai_score=ai_analysis.get('overall_score', 0),
+            ai_grade=ai_analysis.get('grade', ''),
+            ai_reasoning=summarize_ai_analysis(ai_analysis),
+            score_tier='ai',
+        )
+    print(f"✅ AI Score: {ai_analysis.get('overall_score', 0)}%, Grade: {ai_analysis.get('grade', '')}")
+    return candidate_id
+
+
+def build_candidate_pipeline(candidate_id):
+    """Return the (unsent) Celery chain that processes one candidate."""
+    return chain(
+        extract_resume_text.si(candidate_id),
+        parse_resume_fields.s(),
+        score_keywords.s(),
+        score_with_ai.s(),
+    )
+
+
+def build_scoring_pipeline(candidate_id):
+    """Return the scoring-only chain for a candidate whose resume is already parsed."""
+    return chain(score_keywords.si(candidate_id), score_with_ai.s())
+
+
+def _start_pipeline(candidate_id, pipeline):
+    try:
+        pipeline.apply_async()
+    except Exception as e:
+        # Eager mode re-raises stage errors (already recorded by PipelineTask.on_failure);
+        # anything raised before a stage ran, e.g. an unreachable broker, is recorded here.
+        print(f"❌ Pipeline error for candidate {candidate_id}: {e}")
+        Candidate.objects.filter(pk=candidate_id, processing_status='queued').update(
+            processing_status='failed',
+            processing_error=f'Could not start resume processing: {str(e)[:200]}',
+        )
+
+
+def enqueue_candidate_pipeline(candidate_id):
+    """Mark the candidate queued and start its pipeline once the transaction commits."""
+    _set_stage(candidate_id, 'queued', processing_error='')
+    transaction.on_commit(lambda: _start_pipeline(candidate_id, build_candidate_pipeline(candidate_id)))
+
+
+def enqueue_scoring_pipeline(candidate_id):
+    """Start scoring for an already parsed (and already queued) candidate on commit."""
+    transaction.on_commit(lambda: _start_pipeline(candidate_id, build_scoring_pipeline(candidate_id)))
 
 
 @shared_task
 def parse_and_score_application(application_id):
-    app = Application.objects.get(pk=application_id)
-    # download file if using remote storage
-    path = app
\ No newline at end of file
+    """Process the resume attached to an Application through the candidate pipeline."""
+    app = Application.objects.select_related('candidate').get(pk=application_id)
+    candidate = app.candidate
+    if app.resume_file and candidate.resume_file.name != app.resume_file.name:
+        candidate.resume_file = app.resume_file.name
+        candidate.save(update_fields=['resume_file'])
+    if candidate.job_id is None:
+        candidate.job_id = app.job_id
+        candidate.save(update_fields=['job'])
+    enqueue_candidate_pipeline(candidate.pk)
+    return candidate.pk
+
+
+@shared_task
+def ingest_resumes(job_id, stored_names):
+    """Parse a batch of stored resumes for a job and create their Candidates."""
+    job = JobPost.objects.get(pk=job_id)
+    report = ingest_stored_resumes(job, stored_names)
+    for line in format_ingest_report(report):
+        print(line)
+    report.pop('candidate_ids')
+    return report
+
+
+@shared_task
+def rescore_job_candidates(job_id):
+    """Recompute keyword scores for every candidate of a job."""
+    report = rescore_job(job_id)
+    print(f"🔁 Rescored {report['candidates']} candidates for job {job_id} in {report['elapsed']}s")
+    return report
+
+
+@shared_task
+def rescore_vocabulary_candidates(version=None):
+    """Rescore the candidates affected by a newly published skill vocabulary."""
+    report = rescore_vocabulary_change(version)
+    print(f"📚 Vocabulary v{report['version']}: {report['affected']}/{report['candidates']} candidates affected, "
+          f"{report['jobs_rescored']} job(s) rescored in full, {report['jobs_partial']} partially "
+          f"in {report['elapsed']}s")
+    return report
+
+
+@shared_task
+def ai_score_candidates(candidate_ids):
+    """AI semantic match for many candidates at once through the async client."""
+    from .ai_client import semantic_match_batch
+
+    candidates = list(
+        Candidate.objects
+        .filter(pk__in=candidate_ids, job__isnull=False)
+        .select_related('job')
+        .only('id', 'name', 'resume_text', 'job__description', 'job__required_skills')
+    )
+    if not candidates or not settings.OPENROUTER_API_KEY:
+        return 0
+    results = semantic_match_batch(
+        (c.resume_text, c.job.get_scoring_text(), c.name) for c in candidates
+    )
+    scored = []
+    for candidate, ai_analysis in zip(candidates, results):
+        if 'error' in ai_analysis:
+            continue
+        candidate.ai_score = ai_analysis.get('overall_score', 0)
+        candidate.ai_grade = ai_analysis.get('grade', '')
+        candidate.ai_reasoning = summarize_ai_analysis(ai_analysis)
+        candidate.score_tier = 'ai'
+        scored.append(candidate)
+    Candidate.objects.bulk_update(scored, ['ai_score', 'ai_grade', 'ai_reasoning', 'score_tier'], batch_size=500)
+    print(f"🤖 AI scored {len(scored)}/{len(candidates)} candidates")
+    return len(scored)
+
+
+@shared_task
+def ai_score_shortlist(job_id, top_n=None):
+    """
+    Rank a job's candidates locally by semantic similarity and run the AI
+    semantic match on the top_n (default AI_SHORTLIST_SIZE) only.
+    """
+    job = JobPost.objects.get(pk=job_id)
+    ranked = rank_candidates(job, top_n or settings.AI_SHORTLIST_SIZE)
+    print(f"🧭 Semantic shortlist for job {job_id}: {len(ranked)} candidate(s)")
+    return ai_score_candidates([candidate_id for candidate_id, _ in ranked])
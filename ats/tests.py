@@ -0,0 +1,1255 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from io import BytesIO, StringIO
+from difflib import SequenceMatcher
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .advanced_scoring import (
+    PROFILE_VERSION, STOP_WORDS, ai_semantic_match, WORD_RE, FuzzyIndex, cascade_score_resume, compile_job_profile, extract_term_counts, extract_terms,
+    find_fuzzy_matches, fuzzy_score_resume, next_tier_allowed, normalize_tokens, tokenize_and_filter,
+)
+from .ai_client import semantic_match_batch
+from .benchmarks import SCORERS, benchmark_scorers, generate_corpus, naive_find_fuzzy_matches, synthetic_text
+from .circuit_breaker import openrouter_breaker
+from .duplicates import minhash_signature
+from . import ingest, resume_terms
+from .embeddings import EMBEDDING_VERSION, from_bytes, get_job_embedding, rank_candidates
+from .llm_cache import get_cached_response, store_response
+from .field_extractor import extract_resume_fields
+from .pdf_extract import extract_bounded, extract_pdf, pool_extract
+from .parsers import extract_text_from_bytes, extraction_cache_stats, parse_resume_text, parse_resume_with_openai
+from .job_matching import JobIndex, get_job_index, match_jobs
+from .models import Application, Candidate, ExtractedText, JobPost, LLMResponse, VocabularyTerm
+from .rescoring import rescore_job, rescore_vocabulary_change, score_token_sets
+from .resume_terms import candidate_term_sets, compute_resume_terms, refresh_resume_terms
+from .search import index_candidates, search_candidates
+from .stats import compute_dashboard_stats, get_dashboard_stats
+from .tasks import (
+    ai_score_shortlist, enqueue_candidate_pipeline, extract_resume_text, parse_resume_fields, score_with_ai,
+)
+from .views import JobDetailView
+from .vocabulary import CompiledVocabulary, default_entries, get_vocabulary, publish_vocabulary, reload_vocabulary
+
+
+class JobDetailQueryCountTests(TestCase):
+    """The job detail page costs a fixed number of queries, however many candidates a job has."""
+
+    # Session, user, job, status counts aggregate, candidate page
+    PAGE_QUERIES = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('recruiter', password='secret')
+        cls.job = JobPost.objects.create(title='Backend Developer', description='Python and Django', required_skills=[])
+        Candidate.objects.bulk_create(
+            Candidate(job=cls.job, name=f'Candidate {i}', email=f'c{i}@example.com', keyword_score=i % 40,
+                      status='new' if i % 3 else 'reviewed')
+            for i in range(120)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('job_detail', args=[self.job.pk])
+
+    def test_first_page(self):
+        with self.assertNumQueries(self.PAGE_QUERIES):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['candidates']), JobDetailView.candidates_per_page)
+        self.assertEqual(response.context['candidate_count'], 120)
+
+    def test_cursor_page(self):
+        first = self.client.get(self.url).context['page_obj']
+        with self.assertNumQueries(self.PAGE_QUERIES):
+            response = self.client.get(self.url, {'after': first.next_cursor})
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page_obj']
+        self.assertTrue(page.has_previous())
+        self.assertFalse({c.pk for c in page} & {c.pk for c in first})
+
+    def test_filtered_cursor_page(self):
+        first = self.client.get(self.url, {'status': 'new'}).context['page_obj']
+        with self.assertNumQueries(self.PAGE_QUERIES):
+            response = self.client.get(self.url, {'status': 'new', 'after': first.next_cursor})
+        self.assertTrue(all(c.status == 'new' for c in response.context['candidates']))
+
+
+class StubOpenRouter(ThreadingHTTPServer):
+    """
+    Local OpenAI-compatible chat completions server. Requests are answered
+    with the statuses in ``script`` (then 200s) after ``delay`` seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, script=(), delay=0.0):
+        super().__init__(('127.0.0.1', 0), StubOpenRouterHandler)
+        self.script = list(script)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = []  # arrival times
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+
+class StubOpenRouterHandler(BaseHTTPRequestHandler):
+    ANSWER = {'technical_skills_score': 80, 'experience_level_score': 70, 'overall_score': 75, 'grade': 'B',
+              'reasoning': 'Stub', 'strengths': [], 'concerns': [], 'recommendation': 'Interview'}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        with server.lock:
+            server.requests.append(time.monotonic())
+            status = server.script.pop(0) if server.script else 200
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        if status == 200:
+            body = {'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub', 'choices': [
+                {'index': 0, 'finish_reason': 'stop',
+                 'message': {'role': 'assistant', 'content': json.dumps(self.ANSWER)}},
+            ]}
+        else:
+            body = {'error': {'message': f'stub {status}', 'code': status}}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '0.05')
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class AsyncSemanticMatchClientTests(SimpleTestCase):
+    """AsyncSemanticMatchClient against a local stub server (no network, no LLM cache)."""
+
+    def setUp(self):
+        cache.clear()  # circuit breaker state
+
+    def serve(self, **kwargs):
+        server = StubOpenRouter(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def match(self, server, items, **client_kwargs):
+        client_kwargs = {'api_key': 'test', 'base_url': server.base_url, 'use_cache': False, 'timeout': 5,
+                         'requests_per_second': 0, 'retry_base_delay': 0.01, **client_kwargs}
+        return semantic_match_batch(items, **client_kwargs)
+
+    def test_retries_rate_limits_and_server_errors(self):
+        server = self.serve(script=[429, 503])
+        [result] = self.match(server, [('Python developer', 'Python job', 'Ada')], max_retries=3)
+        self.assertEqual(result['overall_score'], 75)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_gives_up_after_max_retries(self):
+        server = self.serve(script=[500, 500, 500])
+        [result] = self.match(server, [('Python developer', 'Python job', 'Ada')], max_retries=1)
+        self.assertIn('error', result)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_coalesces_identical_requests(self):
+        server = self.serve(delay=0.2)
+        results = self.match(server, [('Python developer', 'Python job', 'Ada')] * 5)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([r['grade'] for r in results], ['B'] * 5)
+
+    def test_rate_limit_and_in_flight_limit(self):
+        server = self.serve(delay=0.05)
+        items = [(f'Resume {i}', 'Python job', f'Candidate {i}') for i in range(6)]
+        results = self.match(server, items, requests_per_second=20, burst=1, max_in_flight=2)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(len(server.requests), 6)
+        self.assertLessEqual(server.max_in_flight, 2)
+        # One token every 50 ms after the first: five intervals between six requests
+        self.assertGreaterEqual(server.requests[-1] - server.requests[0], 0.2)
+
+    def test_client_errors_do_not_open_the_breaker(self):
+        server = self.serve(script=[401] * settings.AI_BREAKER_FAILURE_THRESHOLD)
+        items = [(f'Resume {i}', 'Python job', f'Candidate {i}') for i in range(settings.AI_BREAKER_FAILURE_THRESHOLD)]
+        results = self.match(server, items, max_in_flight=1)
+        self.assertTrue(all('error' in r for r in results))
+        self.assertEqual(openrouter_breaker.state, 'closed')
+
+    def test_server_errors_open_the_breaker(self):
+        server = self.serve(script=[500] * settings.AI_BREAKER_FAILURE_THRESHOLD)
+        items = [(f'Resume {i}', 'Python job', f'Candidate {i}') for i in range(settings.AI_BREAKER_FAILURE_THRESHOLD)]
+        self.match(server, items, max_in_flight=1, max_retries=0)
+        self.assertEqual(openrouter_breaker.state, 'open')
+
+    def test_retries_of_one_request_do_not_open_the_breaker(self):
+        threshold = settings.AI_BREAKER_FAILURE_THRESHOLD
+        server = self.serve(script=[500] * threshold)
+        [result] = self.match(server, [('Python developer', 'Python job', 'Ada')], max_retries=threshold)
+        self.assertEqual(result['overall_score'], 75)
+        self.assertEqual(len(server.requests), threshold + 1)
+        self.assertEqual(openrouter_breaker.state, 'closed')
+
+
+class BenchmarkIsolationTests(TestCase):
+    """benchmark_scorers stays off the database, the LLM cache and the circuit breaker."""
+
+    def test_benchmark_touches_no_shared_state(self):
+        cache.clear()
+        openrouter_breaker.record_failure()
+        corpus = generate_corpus(resume_sizes=(200,), vocabulary_sizes=(None,), job_sizes=(100,))
+        with CaptureQueriesContext(connection) as queries:
+            results = benchmark_scorers(corpus, iterations=1)
+        self.assertEqual(len(results), len(SCORERS))
+        self.assertEqual([q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']], [])
+        self.assertEqual(openrouter_breaker.status()['consecutive_failures'], 1)
+
+
+@override_settings(METRICS_TOKEN='scrape-secret', METRICS_ALLOWED_IPS=['127.0.0.1'])
+class MetricsEndpointTests(TestCase):
+    """/metrics/ is restricted and serves cached entry counts."""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('metrics')
+
+    def test_allowed_address(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'ats_llm_cache_entries 0', response.content)
+
+    def test_other_address_needs_token(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='203.0.113.9').status_code, 403)
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='203.0.113.9',
+                                         HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='203.0.113.9',
+                                         HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+
+    def test_entry_counts_are_cached(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class DashboardStatsTests(TestCase):
+    """Signal-maintained dashboard counters equal a fresh compute_dashboard_stats()."""
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCountersCurrent(self):
+        self.assertEqual(get_dashboard_stats(), compute_dashboard_stats())
+
+    def test_counters_follow_changes(self):
+        job = JobPost.objects.create(title='Backend Developer', description='Python', required_skills=[])
+        self.assertEqual(get_dashboard_stats()['total_jobs'], 1)  # cached from here on
+        with self.captureOnCommitCallbacks(execute=True):
+            other = JobPost.objects.create(title='Designer', description='Figma', required_skills=[])
+            candidates = [Candidate.objects.create(job=job, name=f'Candidate {i}') for i in range(3)]
+            applications = [
+                Application.objects.create(job=job, candidate=candidate, resume_file='resumes/a.pdf')
+                for candidate in candidates
+            ]
+            Application.objects.create(job=other, candidate=candidates[0], resume_file='resumes/b.pdf')
+        self.assertCountersCurrent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            applications[0].status = 'shortlisted'
+            applications[0].save()
+            applications[1].status = 'hired'
+            applications[1].save(update_fields=['status'])
+            # Loaded fresh: the previous status comes from the database row
+            reloaded = Application.objects.get(pk=applications[2].pk)
+            reloaded.status = 'rejected'
+            reloaded.save()
+        self.assertCountersCurrent()
+        self.assertEqual(get_dashboard_stats()['applications_new'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            candidates[1].delete()
+            other.delete()  # cascades to its application
+        self.assertCountersCurrent()
+        self.assertEqual(compute_dashboard_stats(), {
+            'total_jobs': 1, 'total_candidates': 2, 'applications_new': 0, 'applications_shortlisted': 1,
+            'applications_interview': 0, 'applications_hired': 0, 'applications_rejected': 1,
+        })
+
+
+class JobIndexTests(TestCase):
+    """The job index is reused until an open job changes."""
+
+    def setUp(self):
+        self.job = JobPost.objects.create(title='Backend Developer', description='Python and Django', required_skills=[])
+
+    def test_reused_until_a_job_changes(self):
+        index = get_job_index()
+        with self.assertNumQueries(1):
+            self.assertIs(get_job_index(), index)
+        self.assertEqual(match_jobs({'kubernetes'})[0]['keyword_score'], 0)
+
+        self.job.description = 'Kubernetes operator'
+        self.job.save()
+        self.assertGreater(match_jobs({'kubernetes'})[0]['keyword_score'], 0)
+
+        self.job.is_open = False
+        self.job.save()
+        self.assertEqual(len(get_job_index()), 0)
+
+    def test_candidate_page_matches_are_cached(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user('recruiter', password='secret'))
+        other = JobPost.objects.create(title='Platform Engineer', description='Kubernetes operators', required_skills=[])
+        candidate = Candidate.objects.create(job=other, name='Ada', resume_text='Python and Django developer',
+                                             **compute_resume_terms('Python and Django developer'))
+        url = reverse('candidate_detail', args=[candidate.pk])
+        top_k = mock.patch('ats.job_matching.JobIndex.top_k', autospec=True, side_effect=JobIndex.top_k)
+        with top_k as scored:
+            first = self.client.get(url).context['job_matches']
+            self.assertEqual(self.client.get(url).context['job_matches'], first)
+            self.assertEqual(scored.call_count, 1)
+            self.assertEqual([match['job_id'] for match in first], [self.job.pk])
+
+            self.job.description = 'Rust and Kubernetes'
+            self.job.save()
+            self.assertLess(self.client.get(url).context['job_matches'][0]['keyword_score'], first[0]['keyword_score'])
+            self.assertEqual(scored.call_count, 2)
+
+
+class ShortlistRankingTests(TestCase):
+    """The semantic shortlist is the head of a brute-force IDF cosine ranking."""
+
+    RESUMES = [
+        'Kubernetes operator engineer: Go, Kubernetes, Helm and Terraform on AWS',
+        'Python developer with Django and PostgreSQL',
+        'Site reliability engineer running Kubernetes and Prometheus',
+        'Registered nurse with intensive care experience',
+        'Go developer building gRPC services',
+        'Terraform and AWS cloud engineer',
+        '',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = JobPost.objects.create(title='Platform Engineer', description='Kubernetes, Go, Terraform and AWS',
+                                         required_skills=['kubernetes'])
+        Candidate.objects.bulk_create(
+            Candidate(job=cls.job, name=f'Candidate {i}', resume_text=text) for i, text in enumerate(cls.RESUMES)
+        )
+
+    def naive_ranking(self):
+        rows = list(Candidate.objects.filter(job=self.job).exclude(resume_text='').order_by('pk'))
+        matrix = np.array([from_bytes(c.embedding) for c in rows], dtype=np.float64)
+        idf = np.log((1 + len(rows)) / (1 + np.count_nonzero(matrix, axis=0))) + 1
+        query = get_job_embedding(self.job).astype(np.float64) * idf
+        similarities = [
+            float(v @ query / (np.linalg.norm(v) * np.linalg.norm(query) or 1)) for v in matrix * idf
+        ]
+        return sorted(((c.pk, s) for c, s in zip(rows, similarities)), key=lambda row: (-row[1], row[0]))
+
+    def test_shortlist_is_head_of_full_ranking(self):
+        ranked = rank_candidates(self.job)
+        expected = self.naive_ranking()
+        self.assertEqual([pk for pk, _ in ranked], [pk for pk, _ in expected])
+        for (_, similarity), (_, reference) in zip(ranked, expected):
+            self.assertAlmostEqual(similarity, reference, places=3)
+        self.assertEqual(ranked[0][0], Candidate.objects.get(job=self.job, name='Candidate 0').pk)
+        for k in (1, 3, len(ranked) + 2):
+            self.assertEqual(rank_candidates(self.job, k), ranked[:k])
+
+    def test_task_analyses_only_the_shortlist(self):
+        ranked = rank_candidates(self.job)
+        with mock.patch('ats.tasks.ai_score_candidates') as analyse:
+            ai_score_shortlist(self.job.pk, top_n=2)
+        analyse.assert_called_once_with([pk for pk, _ in ranked[:2]])
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_admin_action_refuses_without_broker(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        with mock.patch('ats.tasks.ai_score_shortlist.delay') as delay:
+            response = self.client.post(
+                reverse('admin:ats_jobpost_changelist'),
+                {'action': 'ai_score_shortlist', '_selected_action': [self.job.pk]}, follow=True,
+            )
+        delay.assert_not_called()
+        self.assertIn('rank_candidates', ' '.join(str(m) for m in response.context['messages']))
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_candidate_admin_action_refuses_without_broker(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        with mock.patch('ats.tasks.ai_score_candidates.delay') as delay:
+            response = self.client.post(
+                reverse('admin:ats_candidate_changelist'),
+                {'action': 'run_ai_analysis', '_selected_action': list(
+                    Candidate.objects.filter(job=self.job).values_list('pk', flat=True))},
+                follow=True,
+            )
+        delay.assert_not_called()
+        self.assertIn('CELERY_BROKER_URL', ' '.join(str(m) for m in response.context['messages']))
+
+
+class DuplicateReuseTests(TestCase):
+    """Only a resume match reuses the original's parse and AI analysis; a contact-only match does not."""
+
+    RESUME = 'Senior Python developer with Django, PostgreSQL and Kubernetes experience building APIs for payments'
+    OTHER_RESUME = 'Registered nurse with ten years of intensive care experience and paediatric certification'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = JobPost.objects.create(title='Backend Developer', description='Python and Django', required_skills=[])
+        cls.original = Candidate.objects.create(
+            job=cls.job, name='Ada', email='ada@example.com', resume_text=cls.RESUME,
+            minhash=minhash_signature(cls.RESUME).tobytes(), skills=['python', 'django'], education='BSc',
+            ai_score=88, ai_grade='A', ai_reasoning='Strong fit', score_tier='ai',
+        )
+
+    def duplicate(self, resume_text):
+        return Candidate.objects.create(
+            job=self.job, name='Ada L.', email='ada@example.com', resume_text=resume_text,
+            minhash=minhash_signature(resume_text).tobytes(), duplicate_of=self.original,
+            score_tier='fuzzy', keyword_score=100,
+        )
+
+    def test_resume_match_reuses_parse_and_analysis(self):
+        candidate = self.duplicate(self.RESUME)
+        with mock.patch('ats.tasks.parse_resume_text') as parse:
+            parse_resume_fields(candidate.pk)
+        parse.assert_not_called()
+        with override_settings(OPENROUTER_API_KEY='test'), mock.patch('ats.tasks.ai_semantic_match') as match:
+            score_with_ai(candidate.pk)
+        match.assert_not_called()
+        self.assertEqual(Candidate.objects.get(pk=candidate.pk).ai_grade, 'A')
+
+    def test_contact_match_is_parsed_and_scored(self):
+        candidate = self.duplicate(self.OTHER_RESUME)
+        with mock.patch('ats.tasks.parse_resume_text', return_value={'skills': ['nursing']}) as parse:
+            parse_resume_fields(candidate.pk)
+        parse.assert_called_once()
+        analysis = {'overall_score': 20, 'grade': 'D', 'reasoning': 'Different field'}
+        with override_settings(OPENROUTER_API_KEY='test'):
+            with mock.patch('ats.tasks.ai_semantic_match', return_value=analysis) as match:
+                score_with_ai(candidate.pk)
+        match.assert_called_once()
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.duplicate_of_id, self.original.pk)
+        self.assertEqual((candidate.skills, candidate.ai_grade), (['nursing'], 'D'))
+
+
+class VocabularyRescoreTests(TestCase):
+    """Publishing a vocabulary refreshes exactly the stale term sets and scores."""
+
+    RESUMES = {
+        'synonym': 'Backend engineer writing elixirlang services with phoenix',
+        'unaffected': 'Python developer with Django experience',
+        'defaults': 'Elixirlang and phoenix consultant',
+    }
+
+    def setUp(self):
+        reload_vocabulary()
+        self.addCleanup(reload_vocabulary)
+        self.job = JobPost.objects.create(title='Elixir Developer', description='Elixir and Phoenix developer',
+                                          required_skills=[])
+        self.candidates = {
+            name: Candidate.objects.create(job=self.job, name=name, resume_text=text, **compute_resume_terms(text))
+            for name, text in self.RESUMES.items()
+        }
+        rescore_job(self.job.pk)
+        # Scored with the built-in defaults before the vocabulary was published
+        Candidate.objects.filter(pk=self.candidates['defaults'].pk).update(vocab_version=0, terms_vocab_version=0)
+
+    def test_publish_refreshes_stale_terms_and_scores(self):
+        VocabularyTerm.objects.create(term='elixirlang', canonical='elixir')
+        version = publish_vocabulary(rescore=False)
+        stale = Candidate.objects.get(pk=self.candidates['synonym'].pk)
+        self.assertIn('elixir', candidate_term_sets(stale)[0])
+
+        rescore_vocabulary_change()
+        rescored = {c.name: c for c in Candidate.objects.filter(job=self.job)}
+        for name, candidate in rescored.items():
+            self.assertEqual(candidate.resume_terms, compute_resume_terms(candidate.resume_text)['resume_terms'])
+            self.assertEqual((candidate.vocab_version, candidate.terms_vocab_version), (version.number,) * 2)
+        self.assertIn('elixir', rescored['synonym'].resume_terms)
+        self.assertIn('elixir', rescored['defaults'].resume_terms)
+
+        # Same scores as a full rescore
+        rescore_job(self.job.pk)
+        for candidate in Candidate.objects.filter(job=self.job):
+            self.assertEqual(candidate.keyword_score, rescored[candidate.name].keyword_score)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_admin_publish_defers_rescore_without_broker(self):
+        term = VocabularyTerm.objects.create(term='elixirlang', canonical='elixir')
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(
+                reverse('admin:ats_vocabularyterm_changelist'),
+                {'action': 'publish_vocabulary', '_selected_action': [term.pk]}, follow=True,
+            )
+        self.assertEqual(callbacks, [])
+        self.assertIn('--rescore-only', ' '.join(str(m) for m in response.context['messages']))
+        version = reload_vocabulary().version
+        synonym = Candidate.objects.get(pk=self.candidates['synonym'].pk)
+        self.assertLess(synonym.vocab_version, version)
+
+        call_command('publish_vocabulary', rescore_only=True)
+        synonym.refresh_from_db()
+        self.assertEqual(synonym.vocab_version, version)
+        self.assertIn('elixir', synonym.resume_terms)
+
+
+class ExtractTermsTests(SimpleTestCase):
+    """extract_terms against the tokenize -> filter -> normalize chain it replaced."""
+
+    vocabulary = CompiledVocabulary(0, default_entries())
+
+    def setUp(self):
+        patcher = mock.patch('ats.advanced_scoring.get_vocabulary', return_value=self.vocabulary)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def old_terms(self, text):
+        return set(normalize_tokens(tokenize_and_filter(text)))
+
+    def test_phrases(self):
+        text = 'Machine learning on Google Cloud, unit test suites and full stack work in data science.'
+        terms = extract_terms(text)
+        self.assertLessEqual({'machine learning', 'gcp', 'testing', 'fullstack', 'data science'}, terms)
+        # Words consumed by a phrase are not terms of their own
+        self.assertFalse({'machine', 'learning', 'google', 'cloud', 'unit', 'full', 'stack'} & terms)
+        # A phrase may end a sentence
+        self.assertEqual(extract_terms('Research in deep learning.'), {'research', 'deep learning'})
+        self.assertEqual(extract_terms('deep sea learning'), {'deep', 'sea', 'learning'})
+
+    def test_punctuated_terms(self):
+        self.assertEqual(extract_terms('C++, C# and .NET; Node.js and React.js front-end.'),
+                         {'cpp', 'csharp', 'net', 'nodejs', 'react', 'frontend'})
+        self.assertEqual(extract_terms('c++'), extract_terms('cpp'))
+        self.assertEqual(extract_terms('C#.'), {'csharp'})
+        # Not vocabulary terms: split like the old tokenizer
+        self.assertEqual(extract_terms('end-user, foo.bar'), {'end', 'user', 'foo', 'bar'})
+
+    def test_counts_match_terms(self):
+        text = 'Python, python3 and Django. Machine learning; machine learning! C++ and c++.'
+        counts = extract_term_counts(text)
+        self.assertEqual(set(counts), extract_terms(text))
+        self.assertEqual((counts['python'], counts['machine learning'], counts['cpp']), (2, 2, 2))
+
+    def test_equivalent_to_old_chain_without_compound_terms(self):
+        compound_words = set(self.vocabulary.phrase_index)
+        for term in self.vocabulary.canonical_terms:
+            if not term.isalnum():
+                compound_words.update(WORD_RE.findall(term))
+        words = sorted(
+            {term for term in self.vocabulary.canonical_terms if term.isalnum()} | set(STOP_WORDS)
+            | {'acme', 'senior', 'engineer', 'built', 'team_lead', 'x2', 'café'}
+        )
+        words = [word for word in words if word not in compound_words]
+        separators = [' ', ' ', ' ', ', ', '. ', '; ', ' / ', ' (', ') ', ' - ', '-', ': ', '! ', '\n', ' "']
+        rng = random.Random(19)
+        for _ in range(500):
+            text = ''.join(
+                rng.choice([str.lower, str.upper, str.title])(rng.choice(words)) + rng.choice(separators)
+                for _ in range(rng.randint(1, 40))
+            )
+            self.assertEqual(extract_terms(text), self.old_terms(text), text)
+
+
+class FuzzyIndexTests(SimpleTestCase):
+    """FuzzyIndex returns what a scan of every token with SequenceMatcher returns, ties included."""
+
+    def naive_best_match(self, token, tokens, threshold):
+        best_match, best_score = None, 0
+        for candidate in tokens:
+            similarity = SequenceMatcher(None, token, candidate).ratio()
+            if similarity >= threshold and similarity > best_score:
+                best_match, best_score = candidate, similarity
+        return best_match, best_score
+
+    def test_ties_keep_the_first_token(self):
+        # Both 0.8 from 'abcd', in the same length bucket
+        index = FuzzyIndex(['zzzz', 'xyabcd', 'abxd', 'abcdxy'])
+        self.assertEqual(index.best_match('abcd', 0.7), ('xyabcd', 0.8))
+        self.assertEqual(index.best_match('abcd', 0.85), (None, 0))
+        # Both 0.8 from 'abcdef', in different length buckets
+        tokens = ['abcdefxyz', 'zz', 'abcd']
+        self.assertEqual(FuzzyIndex(tokens).best_match('abcdef', 0.7), ('abcdefxyz', 0.8))
+        self.assertEqual(FuzzyIndex(tokens[::-1]).best_match('abcdef', 0.7), ('abcd', 0.8))
+
+    def test_matches_naive_scan(self):
+        # A three-letter alphabet makes near and tied similarities common
+        rng = random.Random(6)
+        word = lambda: ''.join(rng.choice('abc') for _ in range(rng.randint(2, 9)))
+        for _ in range(200):
+            tokens = list(dict.fromkeys(word() for _ in range(rng.randint(0, 60))))
+            threshold = rng.choice([0.5, 0.7, 0.85, 0.9])
+            index = FuzzyIndex(tokens)
+            for _ in range(10):
+                token = word()
+                self.assertEqual(index.best_match(token, threshold), self.naive_best_match(token, tokens, threshold))
+
+    def test_find_fuzzy_matches_equals_reference(self):
+        rng = random.Random(60)
+        vocabulary = CompiledVocabulary(0, default_entries())
+        for size in (50, 300, 1000):
+            job_tokens = extract_terms(synthetic_text(200, rng), vocabulary)
+            resume_tokens = extract_terms(synthetic_text(size, rng), vocabulary)
+            self.assertEqual(find_fuzzy_matches(job_tokens, resume_tokens, 0.8),
+                             naive_find_fuzzy_matches(job_tokens, resume_tokens, 0.8))
+
+
+@override_settings(SCORE_CASCADE_THRESHOLDS={'legacy': 5, 'weighted': 10, 'fuzzy': 25})
+class ScoreCascadeTests(SimpleTestCase):
+    """Cascade thresholds: per-job overrides and the tier that decides."""
+
+    def test_next_tier_allowed(self):
+        thresholds = {'legacy': 5, 'weighted': 10, 'fuzzy': 25}
+        self.assertTrue(next_tier_allowed('fuzzy', 25, thresholds))
+        self.assertFalse(next_tier_allowed('fuzzy', 24, thresholds))
+        self.assertFalse(next_tier_allowed('legacy', 0, thresholds))
+        # Missing tiers and no thresholds always continue
+        self.assertTrue(next_tier_allowed('weighted', 0, {'fuzzy': 25}))
+        self.assertTrue(next_tier_allowed('legacy', 0, None))
+
+    def test_job_overrides(self):
+        self.assertEqual(JobPost().get_cascade_thresholds(), {'legacy': 5, 'weighted': 10, 'fuzzy': 25})
+        self.assertEqual(JobPost(cascade_weighted_min=40).get_cascade_thresholds(),
+                         {'legacy': 5, 'weighted': 40, 'fuzzy': 25})
+        # Zero is an override too, not "unset"
+        job = JobPost(cascade_legacy_min=0, cascade_weighted_min=0, cascade_ai_min=60)
+        self.assertEqual(job.get_cascade_thresholds(), {'legacy': 0, 'weighted': 0, 'fuzzy': 60})
+        self.assertEqual(settings.SCORE_CASCADE_THRESHOLDS, {'legacy': 5, 'weighted': 10, 'fuzzy': 25})
+
+    def test_cascade_stops_at_the_first_failing_tier(self):
+        vocabulary = CompiledVocabulary(0, default_entries())
+        resume, job = 'Python developer with Django and PostgreSQL', 'Python Django developer, Kubernetes, Go'
+        with mock.patch('ats.advanced_scoring.get_vocabulary', return_value=vocabulary):
+            for thresholds, tier in (({'legacy': 101}, 'legacy'), ({'weighted': 101}, 'weighted'),
+                                     ({'fuzzy': 101}, 'fuzzy'), (None, 'fuzzy')):
+                result = cascade_score_resume(resume, job, thresholds, use_ai=False)
+                self.assertEqual(result['score_tier'], tier, thresholds)
+            with mock.patch('ats.advanced_scoring.ai_semantic_match', return_value={'overall_score': 80, 'grade': 'A'}):
+                with override_settings(OPENROUTER_API_KEY='test'):
+                    self.assertEqual(cascade_score_resume(resume, job, {'fuzzy': 101})['score_tier'], 'fuzzy')
+                    result = cascade_score_resume(resume, job, JobPost(cascade_ai_min=0).get_cascade_thresholds())
+            self.assertEqual((result['score_tier'], result['ai_grade']), ('ai', 'A'))
+
+
+class KeywordScoreConsistencyTests(SimpleTestCase):
+    """Per-upload, batch and job-index scoring agree to the point on random resumes."""
+
+    # Seeds whose corpora used to truncate one point apart between the scorers
+    SEEDS = (17, 23, 24, 26, 42)
+
+    def test_batch_and_index_scores_equal_fuzzy_score_resume(self):
+        vocabulary = CompiledVocabulary(0, default_entries())
+        for seed in self.SEEDS:
+            rng = random.Random(seed)
+            job_text = synthetic_text(rng.choice([40, 120, 300]), rng)
+            profile = compile_job_profile(job_text, vocabulary)
+            term_sets = [extract_terms(synthetic_text(rng.randint(50, 600), rng), vocabulary) for _ in range(60)]
+            with mock.patch('ats.advanced_scoring.get_vocabulary', return_value=vocabulary):
+                expected = [fuzzy_score_resume(None, job_text, profile=profile, resume_terms=terms)[0]
+                            for terms in term_sets]
+            batch = score_token_sets(profile, term_sets, [set() for _ in term_sets])
+            self.assertEqual([row['keyword_score'] for row in batch], expected, f'seed {seed}')
+            index = JobIndex([SimpleNamespace(pk=1, title='Job')], [profile])
+            self.assertEqual([int(index.score(terms)[0]) for terms in term_sets], expected, f'seed {seed}')
+
+
+def make_pdf(lines):
+    """Minimal one-page PDF with a line of Helvetica text per entry."""
+    text = 'BT /F1 11 Tf 50 750 Td 14 TL ' + ' '.join(f"({line}) '" for line in lines) + ' ET'
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [4 0 R] /Count 1 >>',
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 5 0 R '
+        '/Resources << /Font << /F1 3 0 R >> >> >>',
+        f'<< /Length {len(text)} >>\nstream\n{text}\nendstream',
+    ]
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return out
+
+
+RESUME_LINES = [
+    'Jane Doe jane@example.com +1 555 123 4567',
+    'Senior Python Developer, 6 years of experience',
+    'Skills: Python, Django, PostgreSQL, Docker, AWS',
+    'Bachelor of Science in Computer Science',
+]
+
+
+class StubLLM:
+    """
+    Offline OpenAI client: resume parse prompts get PARSED, anything else
+    (the semantic match) gets MATCH. Every request is kept in ``requests``.
+    """
+
+    PARSED = {'email': 'jane@example.com', 'phone': '+1 555 123 4567', 'skills': ['Python', 'Django'],
+              'experience': 6, 'education': 'Bachelor of Science'}
+    MATCH = StubOpenRouterHandler.ANSWER
+
+    def __init__(self):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages)
+        answer = self.PARSED if 'resume parser' in messages[0]['content'] else self.MATCH
+        message = SimpleNamespace(content=json.dumps(answer))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    @contextmanager
+    def installed(self):
+        with mock.patch('ats.parsers.client', self), mock.patch('ats.advanced_scoring.client', self):
+            yield self
+
+
+@override_settings(OPENROUTER_API_KEY='test', LLM_CACHE_ENABLED=False, PDF_EXTRACT_POOL=False)
+class EagerPipelineTests(TestCase):
+    """With the in-memory broker the candidate pipeline runs end to end inside the request."""
+
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.job = JobPost.objects.create(title='Python Developer', required_skills=['Python', 'Django'],
+                                          description='Senior Python developer with Django and PostgreSQL')
+
+    def test_pipeline_completes(self):
+        candidate = Candidate.objects.create(job=self.job, name='Jane Doe',
+                                             resume_file=SimpleUploadedFile('jane.pdf', make_pdf(RESUME_LINES)))
+        with StubLLM().installed() as llm, self.captureOnCommitCallbacks(execute=True):
+            enqueue_candidate_pipeline(candidate.pk)
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.processing_status, 'complete', candidate.processing_error)
+        self.assertIn('Django', candidate.resume_text)
+        self.assertEqual(candidate.email, 'jane@example.com')
+        self.assertGreater(candidate.keyword_score, 0)
+        self.assertEqual((candidate.score_tier, candidate.ai_grade), ('ai', 'B'))
+        self.assertTrue(llm.requests)
+
+    def test_failing_stage_marks_candidate_failed(self):
+        candidate = Candidate.objects.create(job=self.job, name='No File')
+        with StubLLM().installed() as llm, self.captureOnCommitCallbacks(execute=True):
+            enqueue_candidate_pipeline(candidate.pk)
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.processing_status, 'failed')
+        self.assertEqual(candidate.processing_error, 'No resume file uploaded.')
+        self.assertEqual(llm.requests, [])
+
+
+@override_settings(OPENROUTER_API_KEY='test', LLM_CACHE_ENABLED=False, PDF_EXTRACT_POOL=False)
+class BulkIngestTests(TestCase):
+    """Bulk ingest: batched creation, failure reporting and the upload limits."""
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+        self.user = User.objects.create_user('recruiter', password='secret')
+        self.job = JobPost.objects.create(title='Python Developer', required_skills=['Python'],
+                                          description='Senior Python developer with Django')
+
+    def resume(self, i):
+        return make_pdf([f'Candidate {i}'] + RESUME_LINES)
+
+    def stored_files(self):
+        return sorted(os.listdir(os.path.join(self.media, 'resumes'))) if os.path.isdir(
+            os.path.join(self.media, 'resumes')) else []
+
+    def zip_upload(self, members):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, data in members.items():
+                archive.writestr(name, data)
+        return SimpleUploadedFile('resumes.zip', buffer.getvalue(), content_type='application/zip')
+
+    def upload(self, files):
+        self.client.force_login(self.user)
+        with mock.patch('ats.views.ingest_resumes.delay') as delay:
+            response = self.client.post(reverse('candidate_bulk_upload'),
+                                        {'job': self.job.pk, 'resume_files': files}, follow=True)
+        return response, delay
+
+    @staticmethod
+    def parse(stored_name):
+        # Stands in for extraction and the LLM parse, which run on the worker threads
+        if 'broken' in stored_name:
+            raise ValueError('Failed to extract text from resume')
+        name = os.path.basename(stored_name)
+        return {'text': f'Python developer {name}', 'email': f'{name}@example.com', 'skills': ['Python']}
+
+    def test_batches_and_failures(self):
+        sources = [(f'candidate_{i}.pdf', BytesIO(self.resume(i))) for i in range(5)]
+        sources.append(('broken.pdf', BytesIO(b'not a pdf')))
+        stored_names = ingest.stage_resume_files(sources)
+        save = mock.patch('ats.ingest._save_candidates', side_effect=ingest._save_candidates)
+        with mock.patch('ats.ingest._parse_stored_resume', self.parse), save as saved, \
+                mock.patch('ats.tasks.enqueue_scoring_pipeline') as enqueue:
+            report = ingest.ingest_stored_resumes(self.job, stored_names, max_workers=2, batch_size=2)
+
+        self.assertEqual([len(call.args[0]) for call in saved.call_args_list], [2, 2, 1])
+        self.assertEqual((report['total'], report['created']), (6, 5))
+        self.assertEqual(report['failed'], [('broken.pdf', 'ValueError: Failed to extract text from resume')])
+        self.assertEqual(enqueue.call_count, 5)
+        candidates = Candidate.objects.filter(job=self.job)
+        self.assertEqual(sorted(candidates.values_list('pk', flat=True)), sorted(report['candidate_ids']))
+        for candidate in candidates:
+            self.assertEqual(candidate.email, f'{os.path.basename(candidate.resume_file.name)}@example.com')
+            self.assertEqual(candidate.processing_status, 'queued')
+            self.assertIn('python', candidate.resume_terms)
+        # The failed file is removed from storage; the others stay with their candidates
+        self.assertEqual(self.stored_files(), sorted(os.path.basename(c.resume_file.name) for c in candidates))
+        self.assertIn('❌ broken.pdf: ValueError: Failed to extract text from resume',
+                      ingest.format_ingest_report(report))
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, INGEST_EAGER_MAX_FILES=2)
+    def test_eager_upload_limit(self):
+        files = [SimpleUploadedFile(f'c{i}.pdf', self.resume(i), content_type='application/pdf') for i in range(3)]
+        response, delay = self.upload(files)
+        delay.assert_not_called()
+        self.assertIn('need a Celery broker', ' '.join(str(m) for m in response.context['messages']))
+        self.assertEqual(self.stored_files(), [])
+
+        files = [SimpleUploadedFile(f'c{i}.pdf', self.resume(i), content_type='application/pdf') for i in range(2)]
+        response, delay = self.upload(files)
+        delay.assert_called_once()
+        self.assertEqual(len(self.stored_files()), 2)
+
+    @override_settings(INGEST_ZIP_MAX_MEMBER_BYTES=4096, INGEST_ZIP_MAX_TOTAL_BYTES=8192)
+    def test_zip_size_limits(self):
+        small = {f'c{i}.pdf': self.resume(i) for i in range(2)}
+        # Compresses to almost nothing, expands past the per-file limit
+        bomb = {'bomb.pdf': b'%PDF-1.4 ' + b'0' * 100000}
+        many = {f'c{i}.pdf': self.resume(i) + b'%' * 2500 for i in range(3)}
+        for members, message in ((bomb, 'bomb.pdf is 100009 bytes'), (many, 'the limit is 8192')):
+            response, delay = self.upload([SimpleUploadedFile('first.pdf', self.resume(9)), self.zip_upload(members)])
+            delay.assert_not_called()
+            self.assertIn(message, ' '.join(str(m) for m in response.context['messages']))
+            self.assertEqual(self.stored_files(), [])
+
+        response, delay = self.upload([self.zip_upload(small)])
+        delay.assert_called_once()
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_invalid_zip(self):
+        response, delay = self.upload([SimpleUploadedFile('resumes.zip', b'not a zip')])
+        delay.assert_not_called()
+        self.assertIn('Invalid ZIP archive', ' '.join(str(m) for m in response.context['messages']))
+
+
+@override_settings(LLM_CACHE_ENABLED=False, PDF_EXTRACT_POOL=False)
+class SearchIndexTests(TestCase):
+    """New and changed candidates are searchable however they were written."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.job = JobPost.objects.create(title='Python Developer', description='Python', required_skills=[])
+
+    def found(self, query):
+        return set(search_candidates(Candidate.objects.all(), query).values_list('name', flat=True))
+
+    def test_saved_candidates(self):
+        candidate = Candidate.objects.create(job=self.job, name='Ada', resume_text='Haskell compiler engineer')
+        self.assertEqual(self.found('haskell'), {'Ada'})
+        candidate.skills = ['Erlang']
+        candidate.save(update_fields=['skills'])
+        self.assertEqual(self.found('erlang'), {'Ada'})
+        candidate.delete()
+        self.assertEqual(self.found('haskell'), set())
+
+    def test_bulk_ingested_candidates(self):
+        candidates = [
+            ingest._build_candidate(self.job, f'resumes/{name}.pdf', {'text': text, 'skills': ['Fortran']})
+            for name, text in (('grace', 'COBOL compiler pioneer'), ('alan', 'Cryptanalysis and computing'))
+        ]
+        with mock.patch('ats.tasks.enqueue_scoring_pipeline'):
+            ingest._save_candidates(candidates)
+        self.assertEqual(self.found('cobol'), {'Grace'})
+        self.assertEqual(self.found('fortran'), {'Grace', 'Alan'})
+
+    def test_updated_resume_text(self):
+        candidate = Candidate.objects.create(job=self.job, name='Jane', resume_text='Visual Basic macros',
+                                             resume_file=SimpleUploadedFile('jane.pdf', make_pdf(RESUME_LINES)))
+        self.assertEqual(self.found('macros'), {'Jane'})
+        # The extract stage writes the new text with update(), which sends no post_save
+        extract_resume_text(candidate.pk)
+        self.assertEqual(self.found('macros'), set())
+        self.assertEqual(self.found('postgresql'), {'Jane'})
+
+
+class CandidateListPaginationTests(TestCase):
+    """Keyset pages of the candidate list, and offset pages for search relevance."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('recruiter', password='secret')
+        job = JobPost.objects.create(title='Backend Developer', description='Python', required_skills=[])
+        created = Candidate.objects.bulk_create(
+            Candidate(job=job, name=f'Candidate {i:02}', keyword_score=i % 7,
+                      resume_text='python ' * (i % 5 + 1) if i % 2 else 'ruby')
+            for i in range(45)
+        )
+        index_candidates([c.pk for c in created])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        response = self.client.get(reverse('candidate_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_forward_and_backward_cursors(self):
+        expected = list(Candidate.objects.order_by('-keyword_score', '-pk').values_list('pk', flat=True))
+        pages = [self.get(order_by='-keyword_score')]
+        self.assertFalse(pages[0].has_previous())
+        while pages[-1].has_next():
+            pages.append(self.get(order_by='-keyword_score', after=pages[-1].next_cursor))
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        self.assertEqual([c.pk for page in pages for c in page], expected)
+
+        # Back from the last page through the previous cursors
+        page = pages[-1]
+        for previous in reversed(pages[:-1]):
+            page = self.get(order_by='-keyword_score', before=page.previous_cursor)
+            self.assertEqual([c.pk for c in page], [c.pk for c in previous])
+        self.assertFalse(page.has_previous())
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('!!!', 'bm90IGpzb24', 'WyJ4IiwgMV0'):  # not base64, not JSON, not an integer score
+            response = self.client.get(reverse('candidate_list'), {'order_by': '-keyword_score', 'after': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_unknown_sort_key_falls_back_to_newest(self):
+        expected = list(Candidate.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)[:20])
+        for order_by in ('resume_text', '-processing_error', 'relevance'):
+            page = self.get(order_by=order_by)
+            self.assertTrue(page.is_keyset)
+            self.assertEqual([c.pk for c in page], expected, order_by)
+
+    def test_relevance_pages_by_offset(self):
+        ranked = list(search_candidates(Candidate.objects.all(), 'python').values_list('pk', flat=True))
+        self.assertEqual(len(ranked), 22)
+        first = self.get(search='python')
+        self.assertFalse(getattr(first, 'is_keyset', False))
+        self.assertEqual((first.number, first.paginator.count), (1, 22))
+        second = self.get(search='python', page=2)
+        self.assertEqual([c.pk for c in first] + [c.pk for c in second], ranked)
+        # Keyset cursors still work for other orders of the same search
+        page = self.get(search='python', order_by='name')
+        self.assertEqual([c.name for c in page], sorted(c.name for c in page))
+        self.assertTrue(page.is_keyset)
+
+
+class ExtractionCacheTests(TestCase):
+    """PDF text is extracted once per file content; failures are retried; old entries are evicted."""
+
+    def setUp(self):
+        cache.clear()  # cached entry counts
+        self.extracted = []
+
+    def fake_extract(self, data=None, path=None):
+        self.extracted.append(data)
+        if data.startswith(b'timeout'):
+            return {'text': '', 'pages': 0, 'truncated': False, 'elapsed': 5.0, 'error': 'Timed out after 5s'}
+        return {'text': data.decode().upper(), 'pages': 1, 'truncated': False, 'elapsed': 0.01, 'error': None}
+
+    def extract(self, data):
+        with mock.patch('ats.parsers._extract_pdf_text', self.fake_extract):
+            return extract_text_from_bytes(data)
+
+    def test_hit_and_miss(self):
+        before = extraction_cache_stats()
+        self.assertEqual(self.extract(b'resume one'), 'RESUME ONE')
+        self.assertEqual(self.extract(b'resume one'), 'RESUME ONE')
+        self.assertEqual(self.extract(b'resume two'), 'RESUME TWO')
+        self.assertEqual(self.extracted, [b'resume one', b'resume two'])
+        entry = ExtractedText.objects.get(text='RESUME ONE')
+        self.assertEqual((entry.hits, entry.byte_size, entry.pages), (1, 10, 1))
+        after = extraction_cache_stats()
+        self.assertEqual((after['hits'] - before['hits'], after['misses'] - before['misses']), (1, 2))
+
+    def test_failures_are_not_cached(self):
+        self.assertEqual(self.extract(b'timeout'), '')
+        self.assertEqual(self.extract(b'timeout'), '')
+        self.assertEqual(len(self.extracted), 2)
+        self.assertFalse(ExtractedText.objects.exists())
+
+    @override_settings(EXTRACTION_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_are_evicted(self):
+        self.extract(b'first')
+        self.extract(b'second')
+        self.extract(b'first')  # now more recent than 'second'
+        self.extract(b'third')
+        self.assertEqual(set(ExtractedText.objects.values_list('text', flat=True)), {'FIRST', 'THIRD'})
+        self.extract(b'second')
+        self.assertEqual(self.extracted, [b'first', b'second', b'third', b'second'])
+
+
+@override_settings(OPENROUTER_API_KEY='test', LLM_CACHE_ENABLED=True)
+class LLMResponseCacheTests(TestCase):
+    """Identical LLM requests are answered from LLMResponse until they expire or are evicted."""
+
+    RESUME = 'Jane Doe, senior Python developer'
+
+    def setUp(self):
+        cache.clear()  # circuit breaker state
+        self.llm = self.enterContext(StubLLM().installed())
+
+    def test_parse_hit_and_miss(self):
+        first = parse_resume_with_openai(self.RESUME)
+        self.assertEqual(parse_resume_with_openai(self.RESUME), first)
+        self.assertEqual(len(self.llm.requests), 1)
+        # Another field list is another prompt
+        parse_resume_with_openai(self.RESUME, fields=['email'])
+        self.assertEqual(len(self.llm.requests), 2)
+        self.assertEqual(sorted(LLMResponse.objects.values_list('hits', flat=True)), [0, 1])
+
+    def test_semantic_match_hit(self):
+        first = ai_semantic_match(self.RESUME, 'Python developer', 'Jane')
+        self.assertEqual(ai_semantic_match(self.RESUME, 'Python developer', 'Jane'), first)
+        self.assertEqual(len(self.llm.requests), 1)
+
+    def test_use_cache_false_bypasses(self):
+        parse_resume_with_openai(self.RESUME, use_cache=False)
+        self.assertFalse(LLMResponse.objects.exists())
+        parse_resume_with_openai(self.RESUME)
+        parse_resume_with_openai(self.RESUME, use_cache=False)
+        self.assertEqual(len(self.llm.requests), 3)
+        with override_settings(LLM_CACHE_ENABLED=False):
+            parse_resume_with_openai(self.RESUME)
+        self.assertEqual(len(self.llm.requests), 4)
+
+    def test_expired_entries_miss_and_are_evicted(self):
+        store_response('expired', 'model', 'old', ttl=60)
+        self.assertEqual(get_cached_response('expired'), 'old')
+        LLMResponse.objects.filter(fingerprint='expired').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(get_cached_response('expired'))
+        store_response('fresh', 'model', 'new')
+        self.assertEqual(list(LLMResponse.objects.values_list('fingerprint', flat=True)), ['fresh'])
+
+    @override_settings(LLM_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_are_evicted(self):
+        store_response('first', 'model', '1')
+        store_response('second', 'model', '2')
+        get_cached_response('first')  # now more recent than 'second'
+        store_response('third', 'model', '3')
+        self.assertEqual(set(LLMResponse.objects.values_list('fingerprint', flat=True)), {'first', 'third'})
+
+
+@override_settings(LOCAL_PARSE_MIN_CONFIDENCE=0.8)
+class FieldExtractorTests(SimpleTestCase):
+    """Local field extraction confidences, and the LLM asked only for what stays unresolved."""
+
+    COMPLETE = """Jane Doe
+jane.doe@example.com | +1 (555) 123-4567
+Senior backend engineer with 7+ years of professional experience.
+Skills: Python, Django, PostgreSQL, Docker, AWS, Go
+Bachelor of Science in Computer Science
+Stanford University
+"""
+
+    def setUp(self):
+        vocabulary = CompiledVocabulary(0, default_entries())
+        for target in ('ats.field_extractor.get_vocabulary', 'ats.advanced_scoring.get_vocabulary'):
+            self.enterContext(mock.patch(target, return_value=vocabulary))
+
+    def test_complete_resume(self):
+        fields, confidence = extract_resume_fields(self.COMPLETE)
+        self.assertEqual(fields['email'], 'jane.doe@example.com')
+        self.assertEqual(fields['phone'], '+1 (555) 123-4567')
+        self.assertEqual(fields['skills'], ['backend', 'python', 'django', 'postgresql', 'docker', 'aws', 'go'])
+        self.assertEqual(fields['experience'], 7.0)
+        self.assertEqual(fields['education'], 'Bachelor of Science in Computer Science, Stanford University')
+        self.assertEqual(confidence, {'email': 1.0, 'phone': 0.95, 'skills': 0.9, 'experience': 0.9, 'education': 0.9})
+        with mock.patch('ats.parsers.parse_resume_with_openai') as llm:
+            self.assertEqual(parse_resume_text(self.COMPLETE), fields)
+        llm.assert_not_called()
+
+    def test_lower_confidences(self):
+        text = """Contact: a@example.com or b@example.org
+Developer who likes to go hiking
+Acme Corp 2016 - 2020
+Globex 2019 - 2022
+Springfield College
+"""
+        fields, confidence = extract_resume_fields(text)
+        self.assertEqual((fields['email'], confidence['email']), ('a@example.com', 0.9))
+        self.assertEqual((fields['phone'], confidence['phone']), (None, 0.0))
+        # 'go' outside a skill list is an everyday word
+        self.assertEqual((fields['skills'], confidence['skills']), ([], 0.0))
+        # Overlapping employment ranges count once: 2016-2022
+        self.assertEqual((fields['experience'], confidence['experience']), (6.0, 0.8))
+        self.assertEqual((fields['education'], confidence['education']), ('Springfield College', 0.6))
+
+    def test_llm_asked_for_unresolved_fields_only(self):
+        text = self.COMPLETE.replace('jane.doe@example.com | +1 (555) 123-4567\n', '').replace(
+            'Skills: Python, Django, PostgreSQL, Docker, AWS, Go', 'Python developer')
+        answer = {'email': 'jane@llm.example', 'phone': None, 'skills': ['python', 'flask'], 'experience': 99}
+        with mock.patch('ats.parsers.parse_resume_with_openai', return_value=answer) as llm:
+            parsed = parse_resume_text(text)
+        llm.assert_called_once_with(text, use_cache=True, fields=['email', 'phone', 'skills'])
+        # LLM values for the unresolved fields; local values where it had none or was not asked
+        self.assertEqual(parsed['email'], 'jane@llm.example')
+        self.assertIsNone(parsed['phone'])
+        self.assertEqual(parsed['skills'], ['python', 'flask'])
+        self.assertEqual(parsed['experience'], 7.0)
+        self.assertEqual(parsed['education'], 'Bachelor of Science in Computer Science, Stanford University')
+
+
+class PdfExtractTests(SimpleTestCase):
+    """Bounded extraction, and the child process / pool worker failure paths."""
+
+    def test_text_budget(self):
+        result = extract_bounded(BytesIO(make_pdf(RESUME_LINES)), max_chars=20)
+        self.assertTrue(result['truncated'])
+        self.assertEqual(result['text'], 'Jane Doe jane@exampl')
+        self.assertIsNone(result['error'])
+
+    def test_subprocess_extraction(self):
+        result = extract_pdf(make_pdf(RESUME_LINES))
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['pages'], 1)
+        self.assertFalse(result['truncated'])
+        self.assertIn('Senior Python Developer', result['text'])
+
+    def test_subprocess_timeout(self):
+        result = extract_pdf(make_pdf(RESUME_LINES), timeout=0.01)
+        self.assertEqual(result['error'], 'Timed out after 0.01s')
+        self.assertEqual((result['text'], result['pages']), ('', 0))
+
+    def test_subprocess_memory_limit(self):
+        pdf = make_pdf([f'Hello world {i}' for i in range(300)])
+        result = extract_pdf(pdf, memory_mb=1)
+        self.assertIn('MemoryError', result['error'])
+        self.assertEqual((result['text'], result['pages']), ('', 0))
+        # The same document extracts fine under the default limit
+        self.assertIsNone(extract_pdf(pdf)['error'])
+
+    def test_pool_task_timeout(self):
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as handle:
+            handle.write(make_pdf(RESUME_LINES))
+            handle.flush()
+            self.assertIn('Jane Doe', pool_extract(('path', handle.name))['text'])
+            result = pool_extract(('path', handle.name), timeout=1e-6)
+        # Either raised inside pdfminer (prefixed with the exception type) or around it
+        self.assertIn('Timed out after 1e-06s', result['error'])
+        self.assertEqual(result['text'], '')
+
+
+class ResumeTermsBackfillTests(TestCase):
+    """Version stamps on stored term sets, and the backfill of stale rows."""
+
+    TEXT = 'Senior Python developer with Django, PostgreSQL and Docker'
+
+    def setUp(self):
+        reload_vocabulary()
+        self.addCleanup(reload_vocabulary)
+        self.job = JobPost.objects.create(title='Python Developer', description='Python and Django', required_skills=[])
+        self.other_job = JobPost.objects.create(title='Designer', description='Figma', required_skills=[])
+
+    def stamps(self, candidate):
+        candidate.refresh_from_db()
+        return candidate.terms_version, candidate.terms_vocab_version, candidate.embedding_version
+
+    def test_compute_stamps_versions(self):
+        fields = compute_resume_terms(self.TEXT)
+        self.assertEqual(fields['terms_version'], PROFILE_VERSION)
+        self.assertEqual(fields['terms_vocab_version'], get_vocabulary().version)
+        self.assertEqual(fields['embedding_version'], EMBEDDING_VERSION)
+        self.assertIn('django', fields['resume_terms'])
+        self.assertEqual(fields['resume_terms'], sorted(fields['resume_terms']))
+
+    def test_term_sets_read_only_current_rows(self):
+        current = Candidate(job=self.job, name='Current', resume_text=self.TEXT, **compute_resume_terms(self.TEXT))
+        current.resume_terms, current.resume_tokens = ['stored'], ['stored']
+        self.assertEqual(candidate_term_sets(current), ({'stored'}, {'stored'}))
+
+        expected = candidate_term_sets(Candidate(resume_text=self.TEXT))
+        self.assertIn('django', expected[0])
+        for stale in ({'terms_version': PROFILE_VERSION - 1},
+                      {'terms_vocab_version': get_vocabulary().version + 1}):
+            with self.subTest(**stale):
+                for field, value in stale.items():
+                    setattr(current, field, value)
+                self.assertEqual(candidate_term_sets(current), expected)
+                current.terms_version, current.terms_vocab_version = PROFILE_VERSION, get_vocabulary().version
+
+    def test_refresh_updates_only_stale_rows(self):
+        current_stamps = (PROFILE_VERSION, get_vocabulary().version, EMBEDDING_VERSION)
+        current = Candidate.objects.create(job=self.job, name='Current', resume_text=self.TEXT,
+                                           **compute_resume_terms(self.TEXT))
+        missing = [Candidate.objects.create(job=self.job, name=f'Missing {i}', resume_text=f'{self.TEXT} {i}')
+                   for i in range(4)]
+        old_embedding = Candidate.objects.create(job=self.job, name='Old vector', resume_text=self.TEXT,
+                                                 **{**compute_resume_terms(self.TEXT), 'embedding_version': 0})
+        empty = Candidate.objects.create(job=self.job, name='No resume')
+
+        # Small chunks: keyset batches must still visit every stale row once
+        with mock.patch('ats.resume_terms.set_resume_terms', wraps=resume_terms.set_resume_terms) as computed:
+            self.assertEqual(refresh_resume_terms(chunk_size=2), 5)
+        self.assertEqual(computed.call_count, 5)
+        for candidate in [current, old_embedding, *missing]:
+            self.assertEqual(self.stamps(candidate), current_stamps)
+        missing[0].refresh_from_db()
+        self.assertEqual(missing[0].resume_terms, compute_resume_terms(missing[0].resume_text)['resume_terms'])
+        self.assertEqual(self.stamps(empty), (0, 0, 0))
+        self.assertEqual(refresh_resume_terms(), 0)
+
+    def test_backfill_command(self):
+        mine = Candidate.objects.create(job=self.job, name='Mine', resume_text=self.TEXT)
+        other = Candidate.objects.create(job=self.other_job, name='Other', resume_text=self.TEXT)
+        out = StringIO()
+        call_command('backfill_resume_terms', job=self.job.pk, chunk_size=1, stdout=out)
+        self.assertIn('Built term sets for 1 candidate(s)', out.getvalue())
+        self.assertEqual(self.stamps(mine)[0], PROFILE_VERSION)
+        self.assertEqual(self.stamps(other), (0, 0, 0))
+
+        call_command('backfill_resume_terms', stdout=StringIO())
+        self.assertEqual(self.stamps(other)[0], PROFILE_VERSION)
+        with self.assertRaisesMessage(CommandError, 'does not exist'):
+            call_command('backfill_resume_terms', job=0)
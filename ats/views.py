@@ -1,13 +1,25 @@
+import hmac
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
-from django.views.generic import TemplateView, ListView, CreateView, DetailView, View
+from django.views.generic import TemplateView, ListView, CreateView, DetailView, FormView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from .models import JobPost, Candidate, Application
-from .forms import JobCreateForm, CandidateUploadForm
-from .parsers import parse_resume
-from .scoring import score_resume
-from .advanced_scoring import advanced_score_resume
+from .circuit_breaker import openrouter_breaker
+from .metrics import render_prometheus, span
+from .forms import JobCreateForm, CandidateUploadForm, BulkUploadForm
+from .job_matching import cached_match_jobs
+from .ingest import iter_uploaded_resumes, stage_resume_files
+from .pagination import InvalidCursor, KeysetPaginator
+from .resume_terms import candidate_term_sets
+from .search import SEARCH_RESULT_LIMIT, search_candidates
+from .stats import get_dashboard_stats, get_recent_jobs
+from .tasks import enqueue_candidate_pipeline, ingest_resumes
 from django.db.models import Count, Q
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -15,11 +27,13 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
-		context['total_jobs'] = JobPost.objects.count()
-		context['total_candidates'] = Candidate.objects.count()
-		context['shortlisted'] = Application.objects.filter(status='shortlisted').count()
-		context['rejected'] = Application.objects.filter(status='rejected').count()
-		context['recent_jobs'] = JobPost.objects.annotate(num_applications=Count('applications')).order_by('-created_at')[:5]
+		# Cached counters, kept current by signals (see ats/stats.py)
+		stats = get_dashboard_stats()
+		context['total_jobs'] = stats['total_jobs']
+		context['total_candidates'] = stats['total_candidates']
+		context['shortlisted'] = stats['applications_shortlisted']
+		context['rejected'] = stats['applications_rejected']
+		context['recent_jobs'] = get_recent_jobs()
 		return context
 
 class JobListView(LoginRequiredMixin, ListView):
@@ -50,29 +64,90 @@ class JobDetailView(LoginRequiredMixin, DetailView):
 	model = JobPost
 	template_name = 'jobs/detail.html'
 	context_object_name = 'job'
+	candidates_per_page = 25
+	# Columns the candidate table renders; resume_text, ai_reasoning etc. stay in the database
+	CANDIDATE_COLUMNS = ['id', 'name', 'email', 'phone', 'keyword_score', 'ai_grade', 'status', 'resume_file', 'created_at']
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		candidates = Candidate.objects.filter(job=self.object)
+
+		# Totals per status in a single aggregate query
+		counts = candidates.aggregate(
+			total=Count('id'),
+			**{key: Count('id', filter=Q(status=key)) for key, _ in Candidate.STATUS_CHOICES}
+		)
+		context['candidate_count'] = counts.pop('total')
+		context['status_counts'] = [
+			(key, label, counts[key]) for key, label in Candidate.STATUS_CHOICES
+		]
+
+		# Best keyword matches first, one keyset page at a time
+		status = self.request.GET.get('status', '')
+		if status in counts:
+			candidates = candidates.filter(status=status)
+			context['current_status'] = status
+		paginator = KeysetPaginator(candidates.only(*self.CANDIDATE_COLUMNS), '-keyword_score', self.candidates_per_page)
+		try:
+			page = paginator.page(
+				after=self.request.GET.get('after'),
+				before=self.request.GET.get('before'),
+			)
+		except InvalidCursor:
+			raise Http404('Invalid page cursor.')
+		context['candidates'] = page.object_list
+		context['page_obj'] = page
+		return context
 
 class CandidateListView(LoginRequiredMixin, ListView):
 	model = Candidate
 	template_name = 'candidates/list.html'
 	context_object_name = 'candidates'
 	paginate_by = 20
+	# Sort keys backed by a (key, id) index; anything else falls back to newest first
+	SORT_KEYS = ['-created_at', 'name', '-name', '-keyword_score', 'keyword_score', '-score', 'score']
 
 	def get_queryset(self):
-		qs = super().get_queryset().select_related('job')
-		search = self.request.GET.get('search', '')
+		qs = super().get_queryset().select_related('job').defer(
+			'resume_text', 'resume_terms', 'resume_tokens', 'embedding', 'minhash', 'search_vector', 'job__embedding'
+		)
+		search = self.request.GET.get('search', '').strip()
 		status = self.request.GET.get('status', '')
-		order_by = self.request.GET.get('order_by', '-created_at')
-		if search:
-			qs = qs.filter(Q(name__icontains=search) | Q(email__icontains=search))
+		order_by = self.request.GET.get('order_by', 'relevance')
 		if status:
 			qs = qs.filter(status=status)
-		if order_by:
-			qs = qs.order_by(order_by)
+		if search:
+			# Ranked full-text search over resume text, skills and education
+			qs = search_candidates(qs, search)
+		if order_by == 'relevance' and search:
+			# Rank order is paged by offset over the bounded set of best matches
+			self.order_by = order_by
+			return qs[:SEARCH_RESULT_LIMIT]
+		self.order_by = order_by if order_by in self.SORT_KEYS else '-created_at'
 		return qs
 
+	def paginate_queryset(self, queryset, page_size):
+		if self.order_by == 'relevance':
+			return super().paginate_queryset(queryset, page_size)
+		# Keyset pagination: every page is an index range scan, however deep
+		paginator = KeysetPaginator(queryset, self.order_by, page_size)
+		try:
+			page = paginator.page(
+				after=self.request.GET.get('after'),
+				before=self.request.GET.get('before'),
+			)
+		except InvalidCursor:
+			raise Http404('Invalid page cursor.')
+		return (paginator, page, page.object_list, page.has_other_pages())
+
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
 		context['status_choices'] = Candidate.STATUS_CHOICES
+		# Current filters, carried over by the pagination links
+		params = self.request.GET.copy()
+		for key in ('page', 'after', 'before'):
+			params.pop(key, None)
+		context['filter_query'] = params.urlencode()
 		return context
 
 class CandidateUploadView(LoginRequiredMixin, CreateView):
@@ -93,137 +168,70 @@ class CandidateUploadView(LoginRequiredMixin, CreateView):
 		return context
 
 	def form_valid(self, form):
-		# Parse the uploaded resume file
-		if 'resume_file' in self.request.FILES:
-			file = self.request.FILES['resume_file']
-			filename = file.name
-			job = form.cleaned_data['job']
-			
-			print(f"📄 Processing resume: {filename} for job: {job.title}")
-			
-			try:
-				# Parse resume with AI
-				parsed = parse_resume(file, filename, None)
-				form.instance.resume_text = parsed.get('text', '')
-				
-				print(f"✅ Resume text extracted: {len(form.instance.resume_text)} characters")
-				
-				# Use parsed data if available, otherwise use form data
-				if not form.instance.email and parsed.get('email'):
-					form.instance.email = parsed['email']
-				if not form.instance.phone and parsed.get('phone'):
-					form.instance.phone = parsed['phone']
-				
-				# Update skills and experience if available
-				if parsed.get('skills'):
-					form.instance.skills = parsed['skills']
-					print(f"✅ Skills extracted: {parsed['skills']}")
-				if parsed.get('experience'):
-					form.instance.experience_years = parsed['experience']
-					print(f"✅ Experience: {parsed['experience']} years")
-				if parsed.get('education'):
-					form.instance.education = parsed['education']
-				
-			except Exception as e:
-				print(f"❌ Resume parsing error: {e}")
-				import traceback
-				traceback.print_exc()
-				messages.error(self.request, f'Resume parsing failed: {str(e)}')
-				form.instance.resume_text = "Error parsing resume"
-			
-			# Only proceed with scoring if we have resume text
-			if form.instance.resume_text and form.instance.resume_text != "Error parsing resume":
-				try:
-					# Build scoring context from description AND required skills
-					scoring_text = job.description
-					if job.required_skills:
-						# Add required skills to scoring context
-						skills_text = " ".join(job.required_skills) if isinstance(job.required_skills, list) else str(job.required_skills)
-						scoring_text = f"{scoring_text}\n\nRequired Skills: {skills_text}"
-					
-					if not scoring_text.strip():
-						scoring_text = "General candidate evaluation"  # Fallback
-					
-					print(f"📊 Scoring Context Length: {len(scoring_text)} chars")
-					
-					# Legacy scoring (backward compatibility)
-					score, matched, missing = score_resume(form.instance.resume_text, scoring_text)
-					form.instance.score = score
-					form.instance.matched_keywords = ", ".join(matched[:50])
-					form.instance.missing_keywords = ", ".join(missing[:50])
-					
-					print(f"✅ Legacy score: {score}%")
-					
-					# Advanced scoring with all enhancements
-					advanced_results = advanced_score_resume(
-						form.instance.resume_text,
-						scoring_text,
-						candidate_name=form.instance.name,
-						use_ai=True
-					)
-					
-					# Store enhanced keyword score
-					form.instance.keyword_score = advanced_results.get('keyword_score', 0)
-					print(f"✅ Keyword score: {form.instance.keyword_score}%")
-					
-					# Store fuzzy matches
-					form.instance.fuzzy_matches = advanced_results.get('fuzzy_matches', {})
-					
-					# Store AI analysis results
-					ai_analysis = advanced_results.get('ai_analysis', {})
-					if ai_analysis and 'error' not in ai_analysis:
-						form.instance.ai_score = ai_analysis.get('overall_score', 0)
-						form.instance.ai_grade = ai_analysis.get('grade', '')
-						
-						print(f"✅ AI Score: {form.instance.ai_score}%, Grade: {form.instance.ai_grade}")
-						
-						# Create readable reasoning summary
-						reasoning_parts = []
-						if ai_analysis.get('reasoning'):
-							reasoning_parts.append(ai_analysis['reasoning'])
-						if ai_analysis.get('strengths'):
-							reasoning_parts.append(f"Strengths: {', '.join(ai_analysis['strengths'][:3])}")
-						if ai_analysis.get('concerns'):
-							reasoning_parts.append(f"Concerns: {', '.join(ai_analysis['concerns'][:3])}")
-						if ai_analysis.get('recommendation'):
-							reasoning_parts.append(f"Recommendation: {ai_analysis['recommendation']}")
-						
-						form.instance.ai_reasoning = " | ".join(reasoning_parts)
-						
-						messages.success(
-							self.request,
-							f'✅ Candidate uploaded! Keyword Score: {form.instance.keyword_score}% | AI Grade: {form.instance.ai_grade}'
-						)
-					else:
-						# AI analysis failed but keyword score worked
-						error_msg = ai_analysis.get('error', 'Unknown error') if ai_analysis else 'No AI analysis returned'
-						print(f"⚠️ AI analysis failed: {error_msg}")
-						messages.warning(
-							self.request,
-							f'Candidate uploaded with keyword score ({form.instance.keyword_score}%). AI analysis failed: {error_msg}'
-						)
-					
-				except Exception as e:
-					# Fallback to basic scoring if advanced fails
-					print(f"❌ Advanced scoring error: {e}")
-					import traceback
-					traceback.print_exc()
-					messages.error(
-						self.request,
-						f'Scoring failed: {str(e)}. Candidate saved but without scores.'
-					)
-			else:
-				messages.error(
-					self.request,
-					'Failed to extract text from resume. Please check the PDF file.'
-				)
-		else:
+		# Save the upload right away; parsing and scoring run in the Celery pipeline
+		if 'resume_file' not in self.request.FILES:
 			messages.error(self.request, 'No resume file uploaded.')
-		
+			return super().form_valid(form)
+
+		form.instance.processing_status = 'queued'
+		with span('save', upload=True):
+			response = super().form_valid(form)
+		print(f"📄 Queued resume: {self.object.resume_file.name} for candidate: {self.object.name}")
+		enqueue_candidate_pipeline(self.object.pk)
+		messages.success(
+			self.request,
+			'✅ Candidate uploaded! Resume analysis is running in the background.'
+		)
+		return response
+
+	def get_success_url(self):
+		return reverse('candidate_detail', args=[self.object.pk])
+
+class CandidateBulkUploadView(LoginRequiredMixin, FormView):
+	form_class = BulkUploadForm
+	template_name = 'candidates/bulk_upload.html'
+
+	def get_initial(self):
+		initial = super().get_initial()
+		job_id = self.request.GET.get('job')
+		if job_id:
+			initial['job'] = job_id
+		return initial
+
+	def form_valid(self, form):
+		# Stream files to storage now; parsing and Candidate creation run in the background
+		self.job = form.cleaned_data['job']
+		try:
+			stored_names = stage_resume_files(iter_uploaded_resumes(form.cleaned_data['resume_files']))
+		except ValueError as e:
+			# Invalid or oversized ZIP archive; nothing was kept
+			messages.error(self.request, str(e))
+			return self.form_invalid(form)
+		if not stored_names:
+			messages.error(self.request, 'No PDF resumes found in the upload.')
+			return self.form_invalid(form)
+
+		if settings.CELERY_TASK_ALWAYS_EAGER and len(stored_names) > settings.INGEST_EAGER_MAX_FILES:
+			# Eager tasks would extract and parse every file inside this request
+			for name in stored_names:
+				default_storage.delete(name)
+			messages.error(
+				self.request,
+				f'Bulk uploads of more than {settings.INGEST_EAGER_MAX_FILES} resumes need a Celery broker '
+				f'(CELERY_BROKER_URL); use the ingest_resumes command instead.'
+			)
+			return self.form_invalid(form)
+
+		print(f"📦 Queued bulk ingest of {len(stored_names)} resumes for job: {self.job.title}")
+		ingest_resumes.delay(self.job.pk, stored_names)
+		messages.success(
+			self.request,
+			f'✅ {len(stored_names)} resumes uploaded! Candidates will appear as they are processed.'
+		)
 		return super().form_valid(form)
 
 	def get_success_url(self):
-		return reverse('job_detail', args=[self.object.job.pk])
+		return reverse('job_detail', args=[self.job.pk])
 
 class CandidateDetailView(LoginRequiredMixin, DetailView):
 	model = Candidate
@@ -233,6 +241,11 @@ class CandidateDetailView(LoginRequiredMixin, DetailView):
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
 		context['status_choices'] = Candidate.STATUS_CHOICES
+		# Other open positions this resume fits (keyword scores from the job index, cached)
+		resume_terms, _ = candidate_term_sets(self.object)
+		if resume_terms:
+			exclude = [self.object.job_id] if self.object.job_id else []
+			context['job_matches'] = cached_match_jobs(resume_terms, top_k=5, exclude_job_ids=exclude)
 		return context
 
 class CandidateStatusUpdateView(LoginRequiredMixin, View):
@@ -241,6 +254,40 @@ class CandidateStatusUpdateView(LoginRequiredMixin, View):
 		status = request.POST.get('status')
 		if status in dict(Candidate.STATUS_CHOICES):
 			candidate.status = status
-			candidate.save()
+			candidate.save(update_fields=['status'])
 			messages.success(request, 'Status updated.')
-		return redirect('candidate_detail', pk=pk)
\ No newline at end of file
+		return redirect('candidate_detail', pk=pk)
+
+def health_check(request):
+	"""Public JSON health endpoint: database reachability and OpenRouter breaker state."""
+	try:
+		connection.ensure_connection()
+		database = 'ok'
+	except Exception as e:
+		database = f'error: {type(e).__name__}'
+	breaker = openrouter_breaker.status()
+	healthy = database == 'ok'
+	return JsonResponse(
+		{
+			'status': 'ok' if healthy and breaker['state'] == 'closed' else ('degraded' if healthy else 'error'),
+			'database': database,
+			'openrouter': breaker,
+		},
+		status=200 if healthy else 503,
+	)
+
+def _metrics_allowed(request):
+	"""A request bearing METRICS_TOKEN, or from one of METRICS_ALLOWED_IPS."""
+	if settings.METRICS_TOKEN:
+		scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+		if scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+			return True
+	return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+def metrics(request):
+	"""Prometheus scrape endpoint: pipeline stage timings, cache counters and breaker state of this process."""
+	if not settings.METRICS_ENABLED:
+		raise Http404('Metrics are disabled')
+	if not _metrics_allowed(request):
+		return HttpResponseForbidden('Metrics require METRICS_TOKEN or an address in METRICS_ALLOWED_IPS')
+	return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
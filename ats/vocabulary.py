@@ -0,0 +1,242 @@
+"""
+Versioned skill vocabulary.
+
+Synonyms (k8s -> kubernetes) and skill priorities (3x/2x weights) used to be
+module constants in advanced_scoring.py, so every change needed a deploy
+and silently made old scores incomparable with new ones. They now live in
+the database:
+
+* VocabularyTerm rows are edited in the admin (term, priority, canonical);
+* publish_vocabulary() snapshots them into VocabularyVersion N+1 together
+  with the terms that changed since version N;
+* every process compiles the latest version into a CompiledVocabulary
+  (canonical term map, phrase index, weights) and checks for a newer one
+  at most every VOCABULARY_RELOAD_INTERVAL seconds, so edits take effect
+  without a restart;
+* compiled job profiles and Candidate.vocab_version record which version a
+  score was computed with (Candidate.terms_vocab_version: its term sets),
+  and rescoring.rescore_vocabulary_change() only rebuilds and rescores the
+  candidates whose term sets contain a changed term.
+
+The constants in advanced_scoring.py remain the built-in defaults: they
+seed version 1 and are used (as version 0) while the tables are empty or
+not migrated yet.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .models import VocabularyTerm, VocabularyVersion
+
+
+def build_phrase_index(terms):
+    """{first word: [(remaining words, canonical term)]}, longest phrase first."""
+    index = {}
+    for term, canonical in terms.items():
+        words = term.split()
+        if len(words) > 1:
+            index.setdefault(words[0], []).append((tuple(words[1:]), canonical))
+    for phrases in index.values():
+        phrases.sort(key=lambda phrase: -len(phrase[0]))
+    return index
+
+
+class CompiledVocabulary:
+    """
+    Lookup structures for one vocabulary version.
+
+    Args:
+        version: VocabularyVersion.number (0 for the built-in defaults)
+        entries: {term: [priority, canonical]}; priority is 'high', 'medium'
+            or '', canonical is '' for the term itself
+    """
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.entries = entries
+        self.high = frozenset(term for term, (priority, _) in entries.items() if priority == 'high')
+        self.medium = frozenset(term for term, (priority, _) in entries.items() if priority == 'medium')
+        # Every vocabulary term mapped to its canonical skill; plain words map to themselves
+        self.canonical_terms = {term: canonical or term for term, (_, canonical) in entries.items()}
+        # Multi-word vocabulary terms ('google cloud', 'machine learning') by first word
+        self.phrase_index = build_phrase_index(self.canonical_terms)
+        # Skill names reported by field_extractor: prioritized skills keep their own name
+        self.skill_names = {
+            term: term if priority else (canonical or term) for term, (priority, canonical) in entries.items()
+        }
+        self.max_phrase_words = max((len(term.split()) for term in entries), default=1)
+
+    def __repr__(self):
+        return f'<CompiledVocabulary v{self.version}: {len(self.entries)} terms>'
+
+    def weight(self, term):
+        """Weight multiplier of a normalized term (3, 2, or 1)."""
+        if term in self.high:
+            return 3
+        elif term in self.medium:
+            return 2
+        return 1
+
+
+def default_entries():
+    """{term: [priority, canonical]} of the built-in advanced_scoring vocabularies."""
+    from .advanced_scoring import HIGH_PRIORITY_SKILLS, MEDIUM_PRIORITY_SKILLS, SKILL_SYNONYMS
+
+    entries = {}
+    for term in sorted(set(SKILL_SYNONYMS) | HIGH_PRIORITY_SKILLS | MEDIUM_PRIORITY_SKILLS):
+        if term in HIGH_PRIORITY_SKILLS:
+            priority = 'high'
+        elif term in MEDIUM_PRIORITY_SKILLS:
+            priority = 'medium'
+        else:
+            priority = ''
+        canonical = SKILL_SYNONYMS.get(term, term)
+        entries[term] = [priority, '' if canonical == term else canonical]
+    return entries
+
+
+def table_entries():
+    """{term: [priority, canonical]} of the current VocabularyTerm rows."""
+    return {
+        term: [priority, '' if canonical == term else canonical]
+        for term, priority, canonical in VocabularyTerm.objects.order_by('term').values_list('term', 'priority', 'canonical')
+    }
+
+
+def changed_terms(old_entries, new_entries):
+    """Sorted terms added, removed or changed between two entry dicts."""
+    return sorted(
+        term for term in old_entries.keys() | new_entries.keys()
+        if old_entries.get(term) != new_entries.get(term)
+    )
+
+
+def affected_terms(old, new, terms=None):
+    """
+    Resume terms whose presence means a resume may tokenize differently
+    under vocabulary new than under old.
+
+    A term only changes resume term sets when its canonical mapping changes
+    (priority changes only move job weights). For each such term the result
+    holds the term itself, its words and word parts (a new phrase or
+    punctuated name used to split into them), and their canonical forms in
+    both versions (a removed synonym used to map to them). It deliberately
+    over-approximates: an extra candidate is rescored for nothing, a missing
+    one would keep a stale score.
+
+    Args:
+        old, new: CompiledVocabulary
+        terms: Terms to consider (default: changed_terms of the two)
+
+    Returns:
+        set
+    """
+    from .advanced_scoring import WORD_RE
+
+    terms = changed_terms(old.entries, new.entries) if terms is None else terms
+    affected = set()
+    for term in terms:
+        if old.canonical_terms.get(term) == new.canonical_terms.get(term):
+            continue
+        parts = {term}
+        for word in term.split():
+            parts.add(word)
+            parts.add(word.strip('.-'))
+            parts.update(WORD_RE.findall(word))
+        for part in parts:
+            affected.add(part)
+            for vocabulary in (old, new):
+                if part in vocabulary.canonical_terms:
+                    affected.add(vocabulary.canonical_terms[part])
+    return affected
+
+
+_vocabulary = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _latest_version_number():
+    return VocabularyVersion.objects.order_by('-number').values_list('number', flat=True).first()
+
+
+def _load(now):
+    global _vocabulary, _checked_at
+    with _lock:
+        current = _vocabulary
+        try:
+            number = _latest_version_number() or 0
+            if current is None or current.version != number:
+                # Version 0: nothing published yet, use the built-in defaults
+                entries = VocabularyVersion.objects.get(number=number).entries if number else default_entries()
+                current = CompiledVocabulary(number, entries)
+                print(f"📚 Loaded skill vocabulary v{number} ({len(entries)} terms)")
+        except DatabaseError:
+            # Not migrated yet, or a database outage: keep what is loaded
+            if current is None:
+                current = CompiledVocabulary(0, default_entries())
+        _vocabulary, _checked_at = current, now
+        return current
+
+
+def get_vocabulary():
+    """
+    CompiledVocabulary of the latest published version, reloaded when a newer
+    version exists (checked at most every VOCABULARY_RELOAD_INTERVAL seconds).
+    """
+    vocabulary = _vocabulary
+    now = time.monotonic()
+    if vocabulary is not None and now - _checked_at < settings.VOCABULARY_RELOAD_INTERVAL:
+        return vocabulary
+    return _load(now)
+
+
+def reload_vocabulary():
+    """Check for a newer version now instead of at the next interval."""
+    return _load(time.monotonic())
+
+
+def load_version(number):
+    """CompiledVocabulary of a published version, or None if it does not exist (0 is the defaults)."""
+    if number == 0:
+        return CompiledVocabulary(0, default_entries())
+    entries = VocabularyVersion.objects.filter(number=number).values_list('entries', flat=True).first()
+    return CompiledVocabulary(number, entries) if entries is not None else None
+
+
+def publish_vocabulary(note='', rescore=True):
+    """
+    Publish the VocabularyTerm table as a new VocabularyVersion.
+
+    Args:
+        note: Short description of the change
+        rescore: Queue rescore_vocabulary_candidates (ats/tasks.py) for the new
+            version once the transaction commits. With CELERY_TASK_ALWAYS_EAGER
+            the rescore runs in the calling process, so request handlers pass
+            False there
+
+    Returns:
+        VocabularyVersion, or None if nothing changed since the latest version
+    """
+    with transaction.atomic():
+        entries = table_entries()
+        latest = VocabularyVersion.objects.select_for_update().order_by('-number').first()
+        previous = latest.entries if latest is not None else default_entries()
+        changed = changed_terms(previous, entries)
+        if latest is not None and not changed:
+            return None
+        version = VocabularyVersion.objects.create(
+            number=latest.number + 1 if latest is not None else 1,
+            entries=entries,
+            changed_terms=changed,
+            note=note,
+        )
+        print(f"📚 Published skill vocabulary v{version.number} ({len(changed)} changed terms)")
+        if rescore:
+            from .tasks import rescore_vocabulary_candidates
+
+            transaction.on_commit(lambda: rescore_vocabulary_candidates.delay(version.number))
+    reload_vocabulary()
+    return version
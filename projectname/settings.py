@@ -25,12 +25,97 @@ SECRET_KEY = env('SECRET_KEY', default='dev-secret-key')
 DEBUG = env('DEBUG', default=True)
 ALLOWED_HOSTS = ['*']
 
+# Uploaded resumes are read by the Celery worker, which may run on another machine:
+# with a bucket configured they are stored in S3 (django-storages), else in MEDIA_ROOT
+AWS_STORAGE_BUCKET_NAME = env('AWS_STORAGE_BUCKET_NAME', default='')
+if AWS_STORAGE_BUCKET_NAME:
+	STORAGES = {
+		'default': {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'},
+		'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+	}
+
 # OpenRouter API Configuration (must be after env is defined)
 OPENROUTER_API_KEY = env('OPENROUTER_API_KEY', default='')
-OPENROUTER_BASE_URL = 'https://openrouter.ai/api/v1'
+OPENROUTER_BASE_URL = env('OPENROUTER_BASE_URL', default='https://openrouter.ai/api/v1')
 # Optional: Your app name/url for OpenRouter rankings
 OPENROUTER_APP_NAME = env('OPENROUTER_APP_NAME', default='ATS-Application')
 
+# OpenRouter circuit breaker and latency budget (ats/circuit_breaker.py)
+AI_BREAKER_FAILURE_THRESHOLD = env.int('AI_BREAKER_FAILURE_THRESHOLD', default=5)  # consecutive failures
+AI_BREAKER_RESET_TIMEOUT = env.int('AI_BREAKER_RESET_TIMEOUT', default=60)  # seconds open before probing
+LLM_LATENCY_BUDGET = env.float('LLM_LATENCY_BUDGET', default=40.0)  # seconds of LLM time per upload
+LLM_STAGE_BUDGET_SHARES = {'parse': 0.35, 'semantic_match': 0.65}
+
+# Concurrent AI scoring (ats/ai_client.py)
+AI_MAX_IN_FLIGHT = env.int('AI_MAX_IN_FLIGHT', default=8)  # simultaneous requests
+AI_REQUESTS_PER_SECOND = env.float('AI_REQUESTS_PER_SECOND', default=2.0)  # token bucket refill rate
+AI_RATE_BURST = env.int('AI_RATE_BURST', default=4)  # token bucket capacity
+AI_MAX_RETRIES = env.int('AI_MAX_RETRIES', default=4)  # retries on 429/5xx/connection errors
+AI_RETRY_BASE_DELAY = env.float('AI_RETRY_BASE_DELAY', default=1.0)  # seconds, doubled per attempt
+AI_RETRY_MAX_DELAY = env.float('AI_RETRY_MAX_DELAY', default=30.0)
+# Candidates per job sent to the LLM after local semantic pre-ranking (ats/embeddings.py)
+AI_SHORTLIST_SIZE = env.int('AI_SHORTLIST_SIZE', default=20)
+# Estimated resume similarity (0-1) above which a new candidate is linked to an earlier one (ats/duplicates.py)
+DUPLICATE_SIMILARITY_THRESHOLD = env.float('DUPLICATE_SIMILARITY_THRESHOLD', default=0.8)
+# Scoring cascade (ats/advanced_scoring.cascade_score_resume): minimum score at each
+# tier to run the next, more expensive one. Per-job values on JobPost override these.
+SCORE_CASCADE_THRESHOLDS = {
+	'legacy': env.int('SCORE_CASCADE_LEGACY_MIN', default=0),
+	'weighted': env.int('SCORE_CASCADE_WEIGHTED_MIN', default=10),
+	'fuzzy': env.int('SCORE_CASCADE_FUZZY_MIN', default=25),  # fuzzy keyword score needed for the LLM
+}
+# Seconds between checks for a newly published skill vocabulary (ats/vocabulary.py)
+VOCABULARY_RELOAD_INTERVAL = env.float('VOCABULARY_RELOAD_INTERVAL', default=5.0)
+
+# Celery: resume parsing/scoring runs in ats/tasks.py. Without a broker URL the
+# in-memory transport is used and tasks run eagerly in-process (tests, local dev);
+# deployments set CELERY_BROKER_URL and run a worker (see render.yaml).
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default=env('REDIS_URL', default='memory://'))
+CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='cache+memory://')
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=CELERY_BROKER_URL.startswith('memory://'))
+CELERY_TASK_EAGER_PROPAGATES = False
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Bulk resume ingestion (ats/ingest.py): concurrent extract + parse workers
+INGEST_MAX_WORKERS = env.int('INGEST_MAX_WORKERS', default=4)
+# Without a broker (eager tasks) a bulk upload is extracted and parsed inside the
+# web request; larger uploads are refused and need CELERY_BROKER_URL or the
+# ingest_resumes command
+INGEST_EAGER_MAX_FILES = env.int('INGEST_EAGER_MAX_FILES', default=10)
+# Uncompressed size limits for the resumes inside one ZIP archive (zip bombs),
+# checked before anything is extracted
+INGEST_ZIP_MAX_MEMBER_BYTES = env.int('INGEST_ZIP_MAX_MEMBER_BYTES', default=20 * 1024 * 1024)
+INGEST_ZIP_MAX_TOTAL_BYTES = env.int('INGEST_ZIP_MAX_TOTAL_BYTES', default=1024 * 1024 * 1024)
+
+# Bounded PDF text extraction (ats/pdf_extract.py). The text budget matches the
+# longest prompt slice (parse_resume_with_openai); extraction runs in a child
+# process killed after PDF_EXTRACT_TIMEOUT seconds or PDF_EXTRACT_MEMORY_MB.
+PDF_EXTRACT_MAX_CHARS = env.int('PDF_EXTRACT_MAX_CHARS', default=16000)
+PDF_EXTRACT_MAX_PAGES = env.int('PDF_EXTRACT_MAX_PAGES', default=30)
+PDF_EXTRACT_TIMEOUT = env.int('PDF_EXTRACT_TIMEOUT', default=20)
+PDF_EXTRACT_MEMORY_MB = env.int('PDF_EXTRACT_MEMORY_MB', default=512)
+PDF_EXTRACT_SUBPROCESS = env.bool('PDF_EXTRACT_SUBPROCESS', default=True)
+# Extraction process pool (ats/extraction_service.py); 0 workers = one per available core.
+# Off by default so web processes don't each start a pool; enable it in the Celery
+# worker's environment. Where no pool can be started (daemonic prefork workers) the
+# subprocess extractor is used.
+PDF_EXTRACT_POOL = env.bool('PDF_EXTRACT_POOL', default=False)
+PDF_EXTRACT_POOL_WORKERS = env.int('PDF_EXTRACT_POOL_WORKERS', default=0)
+PDF_EXTRACT_POOL_MAX_TASKS_PER_CHILD = env.int('PDF_EXTRACT_POOL_MAX_TASKS_PER_CHILD', default=50)
+
+# PDF text extraction cache (ats.models.ExtractedText), LRU-evicted past this many entries
+EXTRACTION_CACHE_MAX_ENTRIES = env.int('EXTRACTION_CACHE_MAX_ENTRIES', default=10000)
+
+# Local resume field extraction (ats/field_extractor.py): fields below this
+# confidence (0-1) are sent to the LLM; set above 1 to always use the LLM
+LOCAL_PARSE_MIN_CONFIDENCE = env.float('LOCAL_PARSE_MIN_CONFIDENCE', default=0.8)
+
+# LLM response cache (ats/llm_cache.py) for resume parsing and AI semantic matching
+LLM_CACHE_ENABLED = env.bool('LLM_CACHE_ENABLED', default=True)
+LLM_CACHE_TTL = env.int('LLM_CACHE_TTL', default=30 * 24 * 3600)  # seconds
+LLM_CACHE_MAX_ENTRIES = env.int('LLM_CACHE_MAX_ENTRIES', default=20000)
+
 INSTALLED_APPS = [
 	'django.contrib.admin',
 	'django.contrib.auth',
@@ -72,4 +157,40 @@ WSGI_APPLICATION = 'projectname.wsgi.application'
 # Use DATABASE_URL if set, else fallback to SQLite for local development
 DATABASES = {
 	'default': env.db('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}')
-}
\ No newline at end of file
+}
+# Shared cache (dashboard statistics, see ats/stats.py). Point CACHE_URL at
+# Redis/Memcached in production so every worker sees the same counters.
+CACHES = {
+	'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+# Dashboard counters are recomputed from the database at least this often (seconds)
+DASHBOARD_STATS_TTL = env.int('DASHBOARD_STATS_TTL', default=60)
+# Candidate page job matches; keys change with the jobs and terms, so this only bounds their lifetime
+JOB_MATCHES_TTL = env.int('JOB_MATCHES_TTL', default=24 * 3600)
+
+# Pipeline stage timings (ats/metrics.py), served at /metrics/ and logged as JSON
+# lines by the 'ats.metrics' logger (set METRICS_LOG_LEVEL=WARNING to silence them)
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+# /metrics/ answers requests from these addresses, or with "Authorization: Bearer <METRICS_TOKEN>"
+# (behind a reverse proxy REMOTE_ADDR is the proxy's, so set a token)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1'])
+# Stored cache entry counts in the metrics are recounted at most this often (seconds)
+METRICS_COUNT_TTL = env.int('METRICS_COUNT_TTL', default=60)
+LOGGING = {
+	'version': 1,
+	'disable_existing_loggers': False,
+	'formatters': {
+		'message': {'format': '%(message)s'},
+	},
+	'handlers': {
+		'metrics_console': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+	},
+	'loggers': {
+		'ats.metrics': {
+			'handlers': ['metrics_console'],
+			'level': env('METRICS_LOG_LEVEL', default='INFO'),
+			'propagate': False,
+		},
+	},
+}